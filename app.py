@@ -1,19 +1,50 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-import json
+from tkinter import ttk, messagebox
+import argparse
 import os
+import sys
 import time
-import threading
-import datetime
-from win10toast import ToastNotifier
-import winsound
-from PIL import Image, ImageTk
+from pomodoro.alerts import completion_alert, warning_alert
+from pomodoro.engine import IntervalRecord, PomodoroSession
+from pomodoro.instrumentation import metrics
+from pomodoro.journal import StateJournal
+from pomodoro.mailbox import Mailbox, MainLoopDriver
+from pomodoro.persistence import SettingsStore
+from pomodoro.scheduler import SessionScheduler
+from pomodoro.settings import Settings, SettingsError
+from pomodoro.view_model import TimerViewModel
+
+MERGE_INTERVAL_MS = 60_000  # how often to pick up other devices' sessions
+MERGE_POLL_MS = 50  # how often the main loop looks for a finished merge (or statistics build)
+
+RING_SIZE = 260  # progress ring diameter, in pixels
+RING_THICKNESS = 14
+
+
+def _session_attr(name):
+    """Expose a PomodoroSession attribute on the window for convenience"""
+    return property(
+        lambda self: getattr(self.session, name),
+        lambda self, value: setattr(self.session, name, value)
+    )
+
 
 class PomodoroTimer:
-    def __init__(self, root):
+    # Longest gap between main loop polls, in seconds (None: only when something is due)
+    poll_interval = None
+    
+    # Timer state lives in the UI-free session
+    time_left = _session_attr("time_left")
+    current_mode = _session_attr("current_mode")
+    completed_cycles = _session_attr("completed_cycles")
+    warning_shown = _session_attr("warning_shown")
+    timer_running = _session_attr("timer_running")
+    timer_paused = _session_attr("timer_paused")
+
+    def __init__(self, root, scheduler=None):
         self.root = root
         self.root.title("ADHD-Friendly Pomodoro Timer")
-        self.root.geometry("500x600")
+        self.root.geometry("500x760")
         self.root.resizable(False, False)
         self.root.configure(bg="#2E2E2E")
         
@@ -24,60 +55,213 @@ class PomodoroTimer:
         except:
             pass  # Skip if no icon is available
         
-        # Initialize toast notifier
-        self.toaster = ToastNotifier()
+        # Toasts/sounds and history are set up on first use, after the
+        # window is already on screen (see the notifier and history properties)
+        self._notifier = None
+        self._history = None
+        self._stats = None  # FocusStats, built when the dashboard first opens
+        self._stats_pending = None  # intervals finished while it is built (then a list), or "stale"
+        self._merging = False  # a merge is importing other devices' intervals
+        self._tasks = None  # TaskIndex, built when the task box is first typed in
+        self.dashboard_window = None
+        self.settings_window = None  # built the first time settings are opened
         
         # Default settings
-        self.settings = {
-            "work_time": 25,
-            "short_break": 5,
-            "long_break": 15,
-            "cycles_before_long_break": 4,
-            "sound_enabled": True,
-            "notification_enabled": True,
-            "warning_time": 1,  # minutes before end to show warning
-            "theme": "dark",
-            "completed_sessions": 0
-        }
+        self.settings = Settings()
         
-        # Timer state variables
-        self.time_left = self.settings["work_time"] * 60
-        self.timer_running = False
-        self.timer_paused = False
-        self.current_mode = "work"  # "work", "short_break", "long_break"
-        self.completed_cycles = 0
-        self.warning_shown = False
         self.settings_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
-        
-        # Load settings if exist
+        self.history_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.sqlite3")
+        self.journal_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "journal.log")
+        self.stats_cache_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history-cache.pcol")
+        
+        # Running statistics behind the suggested interval lengths
+        self.recommendations_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recommendations.json")
+        from pomodoro.recommend import Recommender
+        self.recommender = Recommender.load(self.recommendations_file)
+        # Saved after every interval, so written behind like the settings
+        self.recommendation_store = SettingsStore(self.recommendations_file, name="interval suggestions")
+        self.suggestion = None
+        
+        # Local HTTP status endpoint, when started with --http (see serve_status())
+        self.status_server = None
+        
+        # Installed plugins, run on their own worker threads (found after the first frame)
+        from pomodoro.plugins import PluginRegistry
+        self.plugins = PluginRegistry()
+        
+        # Session count and history shared with this user's other devices
+        from pomodoro.sync import DeviceSync
+        self.sync = DeviceSync(os.path.join(os.path.dirname(os.path.abspath(__file__)), "devices"))
+        
+        # Load settings if exist; saves are written behind on a background thread
+        self.settings_store = SettingsStore(self.settings_file)
         self.load_settings()
         
+        self.week_sessions = 0
+        self.plan = None  # IntervalSchedule, built the first time the timer runs
+        
+        # Timer state. The main loop owns the session: commands, ticks and the
+        # events they raise all run on it, queued in one mailbox and drained
+        # by one poll
+        self.mailbox = Mailbox()
+        self.session = self.create_session(scheduler)
+        self.driver = MainLoopDriver(
+            self.root.after, self.root.after_cancel, self.scheduler, self.mailbox, interval=self.poll_interval
+        )
+        
         # Create UI components
         self.create_ui()
         
+        # Pick up where a crashed or closed run left off
+        self.restore_state()
+        
         # Update timer display
         self.update_timer_display()
+        self.update_button_states()
+        self.driver.start()
         
-        # Create a thread for the timer
-        self.timer_thread = None
+        # Write out pending settings and history before the window goes away
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Pick up other devices' sessions (and fill in the weekly count)
+        # once the first frame is up, then every minute
+        self.root.after_idle(self.merge_devices)
+        self.root.after_idle(self.update_recommendation)
+        self.root.after_idle(self.load_ring_images)
+        self.root.after_idle(self.load_plugins)
+        
+        # Redraw less often (or not at all) while the window can't be seen
+        self.redraw = "second"
+        for sequence in ("<Map>", "<Unmap>", "<Visibility>"):
+            self.root.bind(sequence, self.on_visibility_change, add="+")
+        
+        # Ctrl+Shift+M writes the timing histograms (when POMODORO_METRICS=1)
+        self.root.bind("<Control-M>", lambda event: self.export_metrics())
+
+    def create_session(self, scheduler):
+        """Create the session this window shows and controls
+
+        The scheduler (which may be shared with other sessions in the
+        process) is driven from this window's main loop, not its worker
+        thread, so the session is only ever touched on the Tk thread.
+        """
+        session = PomodoroSession(self.settings, listener=self.on_session_event)
+        if scheduler is None:
+            scheduler = SessionScheduler()
+        self.scheduler = scheduler
+        self.scheduler.add(session)
+        self.journal = StateJournal(self.journal_file)
+        return session
+
+    def restore_state(self):
+        """Rebuild the timer state from the journal, counting time spent closed"""
+        try:
+            saved = self.journal.load()
+            if saved:
+                state, recorded_at = saved
+                self.session.restore(state, elapsed=time.time() - recorded_at)
+                self.task_var.set(self.session.task)
+        except Exception as e:
+            print(f"Error restoring timer state: {e}")
+
+    @property
+    def notifier(self):
+        """Notification dispatcher, created on first alert"""
+        if self._notifier is None:
+            from pomodoro.notifications import Notifier
+            self._notifier = Notifier()
+        return self._notifier
+
+    @property
+    def history(self):
+        """Interval history store, opened on first use"""
+        if self._history is None:
+            from pomodoro.history import HistoryStore
+            self._history = HistoryStore(self.history_file)
+        return self._history
+
+    @property
+    def tasks(self):
+        """Index of task names for autocomplete, built from the history on first use"""
+        if self._tasks is None:
+            from pomodoro.tasks import TaskIndex
+            self._tasks = TaskIndex.from_uses(self.history.task_uses())
+        return self._tasks
+
+    def load_week_sessions(self):
+        """Show the number of work sessions completed this week"""
+        self.week_sessions = self.history.sessions_this_week()
+        self.week_counter.config(text=f"({self.week_sessions} this week)")
+
+    def merge_devices(self):
+        """Add what other devices recorded since the last merge, off the main loop
+
+        Reading the other devices' files and importing their intervals can
+        take a while with a big history, so it runs on a thread of its own;
+        the main loop picks up the result and updates the window.
+        """
+        import threading  # only needed here; keeps app start-up lean
+        history = self.history  # opened on the main loop
+        self._merging = True
+        merged = [[], 0]  # new records, how many of them were not stored yet
+        
+        def merge():
+            try:
+                new = self.sync.merge()
+                merged[:] = new, 0
+                if new:
+                    merged[1] = history.import_records(new)[1]
+            except (OSError, ValueError) as e:
+                print(f"Error merging other devices' sessions: {e}")
+            except RuntimeError:
+                pass  # the window closed (and the sync with it) mid-merge; the next start merges again
+        thread = threading.Thread(target=merge, name="pomodoro-merge", daemon=True)
+        thread.start()
+        
+        def collect():
+            # Tk may only be used from the main loop, so it looks for the result
+            if thread.is_alive():
+                self.root.after(MERGE_POLL_MS, collect)
+            else:
+                self.show_merged(*merged)
+        self.root.after(MERGE_POLL_MS, collect)
+
+    def show_merged(self, new, added):
+        """Bring the window up to date with a merge, then check again in a minute"""
+        self._merging = False
+        if new:
+            if self._tasks is not None:
+                for record in new:
+                    if record.task and record.mode == "work":
+                        self._tasks.add(record.task, record.started_at)
+            if added == len(new):
+                self.count_in_stats(new)
+            elif self._stats_pending is not None:
+                self._stats_pending = "stale"  # some were already stored; recount once built
+            else:
+                self._stats = None  # some were already stored; recount
+        # A dashboard opened during the merge waited for it to build the statistics
+        if new or self._stats is None:
+            self.refresh_dashboard()
+        self.sessions_counter.config(text=str(self.sync.sessions))
+        self.publish_status("sessions")
+        self.load_week_sessions()
+        self.root.after(MERGE_INTERVAL_MS, self.merge_devices)
 
     def load_settings(self):
-        """Load settings from JSON file if it exists"""
+        """Load settings from JSON file if it exists (upgrading older files)"""
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    saved_settings = json.load(f)
-                    self.settings.update(saved_settings)
+            saved_settings = self.settings_store.load()
+            if saved_settings:
+                # Files from before the per-device counter still hold the count
+                self.sync.adopt_count(saved_settings.get("completed_sessions", 0))
+                self.settings.restore(saved_settings)
         except Exception as e:
             print(f"Error loading settings: {e}")
 
     def save_settings(self):
-        """Save current settings to JSON file"""
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        """Queue current settings for an atomic write to the JSON file"""
+        self.settings_store.save(self.settings.to_json())
 
     def create_ui(self):
         """Create all UI components"""
@@ -105,30 +289,85 @@ class PomodoroTimer:
         )
         self.mode_label.pack(pady=(0, 10))
         
-        # Timer display
+        # Progress frame
+        progress_frame = tk.Frame(self.main_frame, bg="#2E2E2E")
+        progress_frame.pack(fill="x", pady=(0, 20))
+        
+        # Progress ring, in the mode's colour; drawn with plain arcs until
+        # load_ring_images() swaps in anti-aliased Pillow frames
+        ring_canvas = tk.Canvas(progress_frame)
+        ring_canvas.pack(pady=(0, 10))
+        from pomodoro.ring import RingCanvas
+        self.ring = RingCanvas(ring_canvas, RING_SIZE, RING_THICKNESS, theme=self.settings.theme)
+        
+        # Timer display, in the middle of the ring
         self.timer_display = tk.Label(
-            self.main_frame,
+            ring_canvas,
             text="25:00",
-            font=("Arial", 72, "bold"),
+            font=("Arial", 48, "bold"),
             fg="#FFFFFF",
             bg="#2E2E2E"
         )
-        self.timer_display.pack(pady=(0, 20))
+        self.timer_display.place(relx=0.5, rely=0.5, anchor="center")
         
-        # Progress frame
-        progress_frame = tk.Frame(self.main_frame, bg="#2E2E2E")
-        progress_frame.pack(fill="x", pady=(0, 20))
-        
-        # Progress bar
-        self.progress_var = tk.DoubleVar(value=0)
-        self.progress_bar = ttk.Progressbar(
+        # When the next long break is due if the timer keeps going
+        self.plan_label = tk.Label(
             progress_frame,
-            orient="horizontal",
-            length=400,
-            mode="determinate",
-            variable=self.progress_var
+            text="",
+            font=("Arial", 10),
+            fg="#AAAAAA",
+            bg="#2E2E2E"
+        )
+        self.plan_label.pack()
+        
+        # Widgets above are only touched through the view model, which skips unchanged values
+        self.view = TimerViewModel(self.timer_display, self.mode_label, None, ring=self.ring)
+        
+        # What the next work interval is for, with earlier tasks suggested while typing
+        task_frame = tk.Frame(self.main_frame, bg="#2E2E2E")
+        task_frame.pack(pady=(0, 5))
+        
+        task_label = tk.Label(
+            task_frame,
+            text="Task:",
+            font=("Arial", 12),
+            fg="#AAAAAA",
+            bg="#2E2E2E"
+        )
+        task_label.pack(side="left", padx=(0, 5))
+        
+        self.task_var = tk.StringVar(value=self.session.task)
+        self.task_entry = tk.Entry(
+            task_frame,
+            textvariable=self.task_var,
+            font=("Arial", 12),
+            width=30,
+            fg="#FFFFFF",
+            bg="#3E3E3E",
+            insertbackground="#FFFFFF",
+            relief="flat"
+        )
+        self.task_entry.pack(side="left")
+        self.task_entry.bind("<KeyRelease>", self.show_task_suggestions)
+        self.task_entry.bind("<Down>", lambda event: self.move_task_selection(1))
+        self.task_entry.bind("<Up>", lambda event: self.move_task_selection(-1))
+        self.task_entry.bind("<Return>", self.accept_task_suggestion)
+        self.task_entry.bind("<Escape>", lambda event: self.hide_task_suggestions())
+        # Wait a moment so a click on a suggestion lands before the list goes
+        self.task_entry.bind("<FocusOut>", lambda event: self.root.after(150, self.hide_task_suggestions))
+        
+        # Drop-down of suggestions, placed under the entry while there are any
+        self.task_suggestions = tk.Listbox(
+            self.main_frame,
+            font=("Arial", 11),
+            fg="#FFFFFF",
+            bg="#3E3E3E",
+            selectbackground="#4ECDC4",
+            activestyle="none",
+            relief="flat",
+            highlightthickness=0
         )
-        self.progress_bar.pack(pady=10)
+        self.task_suggestions.bind("<ButtonRelease-1>", self.accept_task_suggestion)
         
         # Create a style for buttons
         style = ttk.Style()
@@ -194,13 +433,22 @@ class PomodoroTimer:
         
         self.sessions_counter = tk.Label(
             sessions_frame,
-            text=str(self.settings["completed_sessions"]),
+            text=str(self.sync.sessions),
             font=("Arial", 12, "bold"),
             fg="#FF6B6B",
             bg="#2E2E2E"
         )
         self.sessions_counter.pack(side="left", padx=(5, 0))
         
+        self.week_counter = tk.Label(
+            sessions_frame,
+            text="",  # filled in by load_week_sessions()
+            font=("Arial", 10),
+            fg="#AAAAAA",
+            bg="#2E2E2E"
+        )
+        self.week_counter.pack(side="left", padx=(5, 0))
+        
         # Settings button
         settings_button = ttk.Button(
             bottom_frame,
@@ -210,6 +458,27 @@ class PomodoroTimer:
         )
         settings_button.pack(side="right", padx=20)
         
+        # Statistics button
+        stats_button = ttk.Button(
+            bottom_frame,
+            text="📊 Stats",
+            command=self.open_dashboard,
+            style="TButton"
+        )
+        stats_button.pack(side="right")
+        
+        # Profile picker: switches all interval lengths at once
+        self.profile_var = tk.StringVar(value=self.settings.profile)
+        self.profile_picker = ttk.Combobox(
+            bottom_frame,
+            textvariable=self.profile_var,
+            values=list(self.settings.profiles),
+            state="readonly",
+            width=12
+        )
+        self.profile_picker.pack(side="right")
+        self.profile_picker.bind("<<ComboboxSelected>>", lambda event: self.switch_profile(self.profile_var.get()))
+        
         # Timer interval buttons
         interval_frame = tk.Frame(self.main_frame, bg="#2E2E2E")
         interval_frame.pack(pady=(20, 0))
@@ -238,189 +507,268 @@ class PomodoroTimer:
                 style="TButton"
             )
             btn.grid(row=0, column=i+1, padx=5)
+        
+        # What recent sessions point to; click to use it
+        self.suggestion_label = tk.Label(
+            interval_frame,
+            text="",  # filled in by update_recommendation()
+            font=("Arial", 10),
+            fg="#4ECDC4",
+            bg="#2E2E2E",
+            cursor="hand2",
+            wraplength=460
+        )
+        self.suggestion_label.grid(row=1, column=0, columnspan=len(intervals) + 1, pady=(8, 0))
+        self.suggestion_label.bind("<Button-1>", self.apply_suggestion)
+
+    def load_plugins(self):
+        """Subscribe the plugins installed through entry points"""
+        try:
+            count = self.plugins.load_entry_points()
+        except Exception as e:
+            print(f"Error loading plugins: {e}")
+            return
+        if count:
+            print(f"Loaded {count} plugin hook{'s' if count != 1 else ''}")
+
+    def load_ring_images(self):
+        """Draw the progress ring from anti-aliased Pillow frames, if Pillow is installed"""
+        from pomodoro.ring import RingRenderer
+        try:
+            from PIL import ImageTk
+            renderer = RingRenderer(RING_SIZE, RING_THICKNESS, convert=ImageTk.PhotoImage)
+        except ImportError:
+            return  # keep the plain Canvas arcs
+        self.ring.use_renderer(renderer)
 
     def update_timer_display(self):
         """Update the timer display with current time left"""
-        minutes, seconds = divmod(self.time_left, 60)
-        time_string = f"{minutes:02d}:{seconds:02d}"
-        self.timer_display.config(text=time_string)
-        
-        # Update progress bar
-        if self.current_mode == "work":
-            total_time = self.settings["work_time"] * 60
-        elif self.current_mode == "short_break":
-            total_time = self.settings["short_break"] * 60
-        else:  # long_break
-            total_time = self.settings["long_break"] * 60
-        
-        progress_value = 100 - (self.time_left / total_time * 100)
-        self.progress_var.set(progress_value)
-        
-        # Update mode label
-        if self.current_mode == "work":
-            self.mode_label.config(text="WORK TIME", fg="#FF6B6B")
-        elif self.current_mode == "short_break":
-            self.mode_label.config(text="SHORT BREAK", fg="#4CAF50")
-        else:  # long_break
-            self.mode_label.config(text="LONG BREAK", fg="#2196F3")
-
-    def timer_function(self):
-        """The main timer function that runs in a separate thread"""
-        while self.timer_running and not self.timer_paused:
-            if self.time_left <= 0:
-                self.handle_timer_completion()
-                break
-            
-            # Check if we need to show a warning
-            warning_seconds = self.settings["warning_time"] * 60
-            if not self.warning_shown and self.time_left <= warning_seconds:
-                self.show_warning()
-                
-            time.sleep(1)
-            self.time_left -= 1
-            
-            # Update UI from the main thread
-            self.root.after(0, self.update_timer_display)
+        session = self.session
+        self.view.render(session.time_left, session.current_mode, session.timer.duration)
+
+    def on_session_event(self, session, event, data):
+        """Session listener (runs on the main loop, from a command or a due tick)"""
+        if event != "tick":
+            # Journal every transition (never ticks) so a restart can resume it
+            try:
+                self.journal.record(event, session.snapshot())
+            except OSError as e:
+                print(f"Error writing timer journal: {e}")
+        
+        if event == "tick":
+            # Redraw once this batch of ticks and commands is done. The status
+            # endpoint keeps ticks coming every second while the window is
+            # hidden; the window itself only redraws as often as it asked to
+            if self.status_server is None or self.redraw == "second":
+                self.post_to_ui(self.update_timer_display)
+            elif self.redraw == "minute" and session.time_left % 60 == 0:
+                self.post_to_ui(self.update_timer_display)
+        elif event == "warning":
+            self.show_warning()
+        elif event == "complete":
+            self.record_interval(data)
+            self.handle_timer_completion(data.mode)
+        elif event in ("skip", "reset") and data is not None:
+            self.record_interval(data)
+        elif event == "skip":
+            # Skipped before it started; the session has already moved past it
+            self.recommender.add_skip("short_break" if session.current_mode == "work" else "work")
+        elif event == "pause":
+            self.recommender.add_pause(session.current_mode, session.timer.remaining_exact(), self.settings.warning_seconds)
+        
+        # Plugins subscribed to this event (the table is empty without any)
+        if event in self.plugins.table:
+            self.plugins.dispatch(session, event, data)
+        
+        if self.status_server is not None:
+            self.publish_status(event)
 
-    def handle_timer_completion(self):
+    def serve_status(self, port):
+        """Serve the timer's status over HTTP on localhost, from a thread of its own"""
+        from pomodoro.http_status import StatusServer
+        server = StatusServer(port)
+        server.start_in_thread()
+        self.status_server = server
+        self.session.set_redraw("second")  # status and /events?ticks=1 stay current while hidden
+        self.publish_status()
+        print(f"Timer status at http://127.0.0.1:{server.port}/status and /events")
+
+    def publish_status(self, event="status"):
+        """Hand the current status to the HTTP endpoint (which pushes it if it changed)"""
+        if self.status_server is not None:
+            from pomodoro.http_status import status_of
+            self.status_server.publish_threadsafe(status_of(self.session, self.sync.sessions), event)
+
+    def record_interval(self, record):
+        """Store a finished interval and count it in the statistics"""
+        self.history.append(record)
+        try:
+            self.sync.record(record)
+        except OSError as e:
+            print(f"Error writing device history: {e}")
+        self.count_in_stats([record])
+        if self._stats is not None and self.dashboard_window is not None:
+            self.post_to_ui(self.refresh_dashboard)
+        self.learn_from(record)
+
+    def learn_from(self, record):
+        """Update the suggested interval lengths with a finished interval"""
+        self.recommender.add(record)
+        self.recommendation_store.save(self.recommender.to_json())
+        self.post_to_ui(self.update_recommendation)
+
+    def on_visibility_change(self, event):
+        """Pick the redraw rate from whether the window is shown, covered or hidden"""
+        if event.widget is not self.root:
+            return
+        if event.type == tk.EventType.Unmap:
+            redraw = "none"  # minimized or withdrawn
+        elif event.type == tk.EventType.Visibility and event.state == "VisibilityFullyObscured":
+            redraw = "minute"
+        else:
+            redraw = "second"
+        
+        if redraw != self.redraw:
+            self.redraw = redraw
+            # The status endpoint keeps the ticks coming while the window is hidden
+            self.session.set_redraw("second" if self.status_server is not None else redraw)
+            if redraw == "second":
+                # Catch up on the redraws skipped while hidden
+                self.update_timer_display()
+
+    def post_to_ui(self, callback):
+        """Queue callback for the next main loop poll, timing the wait when metrics are on"""
+        if not metrics.enabled:
+            self.driver.post(callback)
+            return
+        posted = time.perf_counter()
+        
+        def run():
+            metrics.ui_dispatch_delay.observe(time.perf_counter() - posted)
+            callback()
+        self.driver.post(run)
+
+    def handle_timer_completion(self, finished_mode):
         """Handle what happens when a timer completes"""
-        self.timer_running = False
+        completed_at = self.session.clock()
         
         # Play sound if enabled
-        if self.settings["sound_enabled"]:
-            winsound.PlaySound("SystemExclamation", winsound.SND_ASYNC)
+        sound = "complete" if self.settings.sound_enabled else None
         
         # Show notification if enabled
-        if self.settings["notification_enabled"]:
-            if self.current_mode == "work":
-                self.toaster.show_toast(
-                    "Work session complete!",
-                    "Time to take a break! Great job focusing!",
-                    duration=5,
-                    threaded=True
-                )
-            else:
-                self.toaster.show_toast(
-                    "Break time over!",
-                    "Ready to focus again?",
-                    duration=5,
-                    threaded=True
-                )
+        if self.settings.notification_enabled:
+            title, message = completion_alert(finished_mode)
+            self.notifier.notify(title, message, duration=5, sound=sound, since=completed_at)
+        elif sound:
+            self.notifier.notify(sound=sound, since=completed_at)
         
         # Update session counter if work session completed
-        if self.current_mode == "work":
-            self.settings["completed_sessions"] += 1
-            self.sessions_counter.config(text=str(self.settings["completed_sessions"]))
-            self.save_settings()
-        
-        # Move to next interval
-        self.move_to_next_interval()
+        if finished_mode == "work":
+            try:
+                self.sync.count_session()
+            except OSError as e:
+                print(f"Error saving session count: {e}")
+            self.week_sessions += 1
+            self.sessions_counter.config(text=str(self.sync.sessions))
+            self.week_counter.config(text=f"({self.week_sessions} this week)")
         
         # Update UI
-        self.root.after(0, self.update_timer_display)
-        self.root.after(0, self.update_button_states)
+        self.post_to_ui(self.update_timer_display)
+        self.post_to_ui(self.update_button_states)
 
     def show_warning(self):
         """Show warning notification before timer ends"""
         self.warning_shown = True
-        
-        if self.settings["notification_enabled"]:
-            if self.current_mode == "work":
-                self.toaster.show_toast(
-                    "Almost done!",
-                    f"{self.settings['warning_time']} minute(s) left in work session",
-                    duration=3,
-                    threaded=True
-                )
-            else:
-                self.toaster.show_toast(
-                    "Break ending soon",
-                    f"{self.settings['warning_time']} minute(s) left in break",
-                    duration=3,
-                    threaded=True
-                )
-        
-        if self.settings["sound_enabled"]:
-            winsound.Beep(440, 200)  # Gentle beep
-
-    def move_to_next_interval(self):
-        """Decide what the next interval should be"""
-        if self.current_mode == "work":
-            self.completed_cycles += 1
-            
-            if self.completed_cycles >= self.settings["cycles_before_long_break"]:
-                self.current_mode = "long_break"
-                self.time_left = self.settings["long_break"] * 60
-                self.completed_cycles = 0
-            else:
-                self.current_mode = "short_break"
-                self.time_left = self.settings["short_break"] * 60
-        else:
-            # If coming from a break, move to work mode
-            self.current_mode = "work"
-            self.time_left = self.settings["work_time"] * 60
-            
-        # Reset warning flag for next interval
-        self.warning_shown = False
+        warned_at = self.session.clock()
+        sound = "warning" if self.settings.sound_enabled else None  # Gentle beep
+        
+        if self.settings.notification_enabled:
+            title, message = warning_alert(self.current_mode, self.settings.warning_time)
+            self.notifier.notify(title, message, duration=3, sound=sound, since=warned_at)
+        elif sound:
+            self.notifier.notify(sound=sound, since=warned_at)
 
     def start_timer(self):
         """Start or resume the timer"""
-        if self.timer_paused:
-            # Resume the timer
-            self.timer_paused = False
-            self.update_button_states()
-        else:
-            # Start a new timer
-            self.timer_running = True
-            self.timer_paused = False
-            
-            # Start a new thread for the timer
-            self.timer_thread = threading.Thread(target=self.timer_function)
-            self.timer_thread.daemon = True  # Allow the thread to be terminated when the main program exits
-            self.timer_thread.start()
-            
-            # Update button states
-            self.update_button_states()
+        # A fresh interval is tagged with the task in the box (work intervals keep it)
+        task = None
+        if self.session.interval_started_at is None:
+            task = self.task_var.get().strip()
+            if task and self.current_mode == "work" and self._tasks is not None:
+                self._tasks.add(task)
+        self.hide_task_suggestions()
+        self.driver.post(self.session.start, task)
+        
+        # Update button states
+        self.driver.post(self.update_button_states)
     
     def pause_timer(self):
         """Pause the current timer"""
-        if self.timer_running and not self.timer_paused:
-            self.timer_paused = True
-            self.update_button_states()
+        self.driver.post(self.session.pause)
+        self.driver.post(self.update_button_states)
     
     def reset_timer(self):
         """Reset the current interval timer"""
-        # Stop the timer if it's running
-        self.timer_running = False
-        self.timer_paused = False
-        
-        # Reset the time based on current mode
-        if self.current_mode == "work":
-            self.time_left = self.settings["work_time"] * 60
-        elif self.current_mode == "short_break":
-            self.time_left = self.settings["short_break"] * 60
-        else:  # long_break
-            self.time_left = self.settings["long_break"] * 60
-            
-        # Reset warning flag
-        self.warning_shown = False
+        # Stop the timer and rewind the current interval
+        self.driver.post(self.session.reset)
         
         # Update the display
-        self.update_timer_display()
-        self.update_button_states()
+        self.driver.post(self.update_timer_display)
+        self.driver.post(self.update_button_states)
     
     def skip_interval(self):
         """Skip to the next interval"""
-        # Stop the current timer
-        self.timer_running = False
-        self.timer_paused = False
-        
-        # Move to the next interval
-        self.move_to_next_interval()
+        # Stop the current timer and move to the next interval
+        self.driver.post(self.session.skip)
         
         # Update the display
-        self.update_timer_display()
-        self.update_button_states()
+        self.driver.post(self.update_timer_display)
+        self.driver.post(self.update_button_states)
+    
+    def show_task_suggestions(self, event=None):
+        """List earlier tasks starting with what has been typed, most used and recent first"""
+        if event is not None and event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        typed = self.task_var.get()
+        names = self.tasks.suggest(typed)
+        if not names or names == [typed.strip()]:
+            self.hide_task_suggestions()
+            return
+        box = self.task_suggestions
+        box.delete(0, "end")
+        box.insert("end", *names)
+        box.config(height=len(names))
+        box.place(in_=self.task_entry, x=0, rely=1.0, relwidth=1.0)
+        box.lift()
+    
+    def hide_task_suggestions(self):
+        self.task_suggestions.place_forget()
+    
+    def move_task_selection(self, step):
+        """Move the highlighted suggestion up or down (opening the list if needed)"""
+        box = self.task_suggestions
+        if not box.winfo_ismapped():
+            self.show_task_suggestions()
+            return "break"
+        selection = box.curselection()
+        if selection:
+            index = max(0, min(box.size() - 1, selection[0] + step))
+        else:
+            index = 0 if step > 0 else box.size() - 1
+        box.selection_clear(0, "end")
+        box.selection_set(index)
+        box.see(index)
+        return "break"
+    
+    def accept_task_suggestion(self, event=None):
+        """Put the highlighted suggestion in the task box"""
+        box = self.task_suggestions
+        selection = box.curselection()
+        if box.winfo_ismapped() and selection:
+            self.task_var.set(box.get(selection[0]))
+            self.task_entry.icursor("end")
+        self.hide_task_suggestions()
+        return "break"
     
     def update_button_states(self):
         """Update the states of control buttons based on timer state"""
@@ -434,72 +782,167 @@ class PomodoroTimer:
         else:
             self.start_button.config(text="Start", state="normal")
             self.pause_button.config(state="disabled")
+        
+        # The plan only moves when the timer state does
+        self.update_plan_label()
+
+    def update_plan_label(self):
+        """Show when the current long break ends or the next one starts"""
+        if not self.timer_running or self.timer_paused:
+            self.plan_label.config(text="")
+            return
+        
+        if self.plan is None:
+            from pomodoro.schedule import IntervalSchedule
+            self.plan = IntervalSchedule(self.settings)
+        now = time.time()
+        self.plan.update(self.session, now)
+        if self.current_mode == "long_break":
+            interval = self.plan.at(now)
+            when = interval.end if interval is not None else None
+            prefix = "Long break until "
+        else:
+            when = self.plan.next_start("long_break", now)
+            prefix = "Next long break at "
+        # Past the plan's horizon (long intervals, many cycles) there is no time to show
+        if when is None:
+            self.plan_label.config(text="")
+            return
+        self.plan_label.config(text=prefix + time.strftime("%H:%M", time.localtime(when)))
     
     def set_custom_work_time(self, minutes):
         """Set a custom work time interval"""
         # Only allow changing if timer is not running
         if not self.timer_running:
-            self.settings["work_time"] = minutes
+            self.settings.work_time = minutes
             
             # If in work mode, update the current timer
             if self.current_mode == "work":
                 self.time_left = minutes * 60
                 self.update_timer_display()
+                self.publish_status("settings")
                 
-            # Show feedback to user
-            messagebox.showinfo("Work Time Updated", f"Work interval set to {minutes} minutes")
+            # Show feedback to user, with what recent sessions point to
+            message = f"Work interval set to {minutes} minutes"
+            suggestion = self.recommender.suggest(self.settings)
+            if suggestion is not None and suggestion.work_time != minutes:
+                message += f"\n\nYour recent sessions suggest {suggestion.work_time} minutes ({suggestion.reason})"
+            messagebox.showinfo("Work Time Updated", message)
             
             # Save settings
             self.save_settings()
+            self.update_recommendation()
+    
+    def update_recommendation(self):
+        """Show the interval lengths suggested by how recent sessions ended"""
+        store = self.recommendation_store
+        if self.recommender.work_seen == 0 and not store.saves and not os.path.exists(store.path):
+            # First run with suggestions: start from the most recent history
+            from pomodoro.recommend import SEED_INTERVALS
+            for record in self.history.records(offset=max(0, len(self.history) - SEED_INTERVALS)):
+                self.recommender.add(record)
+            store.save(self.recommender.to_json())
+        
+        settings = self.settings
+        self.suggestion = suggestion = self.recommender.suggest(settings)
+        if suggestion is None:
+            text = ""
+        elif (suggestion.work_time, suggestion.short_break, suggestion.long_break) == (
+                settings.work_time, settings.short_break, settings.long_break):
+            text = f"Your current lengths suit you: {suggestion.reason}"
+        else:
+            text = (f"Suggested: {suggestion.work_time} min work, {suggestion.short_break}/"
+                    f"{suggestion.long_break} min breaks ({suggestion.reason}) - click to use")
+        if self.suggestion_label.cget("text") != text:
+            self.suggestion_label.config(text=text)
+    
+    def apply_suggestion(self, event=None):
+        """Use the suggested interval lengths"""
+        suggestion = self.suggestion
+        if suggestion is None:
+            return
+        try:
+            self.settings.update({
+                "work_time": suggestion.work_time,
+                "short_break": suggestion.short_break,
+                "long_break": suggestion.long_break,
+            })
+        except SettingsError as e:
+            messagebox.showerror("Invalid Setting", str(e))
+            return
+        self.save_settings()
+        
+        # As with the settings dialog, a running interval keeps its length
+        if not self.timer_running:
+            self.time_left = self.session.seconds_for(self.current_mode)
+            self.update_timer_display()
+        self.publish_status("settings")
+        self.update_plan_label()
+        self.update_recommendation()
     
     def open_settings(self):
-        """Open the settings dialog"""
+        """Open the settings dialog (built on first use, then reused)"""
+        if self.settings_window is None:
+            self.build_settings_dialog()
+        self.sync_settings_dialog()
+        
+        self.settings_window.deiconify()
+        self.settings_window.lift()
+        self.settings_window.grab_set()  # Make the window modal
+    
+    def build_settings_dialog(self):
+        """Create the settings window and its controls, hidden"""
         # Create a toplevel window for settings
         settings_window = tk.Toplevel(self.root)
+        settings_window.withdraw()
         settings_window.title("Pomodoro Settings")
         settings_window.geometry("400x500")
         settings_window.configure(bg="#2E2E2E")
         settings_window.resizable(False, False)
-        settings_window.grab_set()  # Make the window modal
+        settings_window.protocol("WM_DELETE_WINDOW", self.close_settings)
+        self.settings_window = settings_window
         
         # Create a frame for settings
         settings_frame = tk.Frame(settings_window, bg="#2E2E2E")
         settings_frame.pack(pady=20, padx=20, fill="both", expand=True)
         
         # Title
-        title_label = tk.Label(
+        self.settings_title = tk.Label(
             settings_frame,
             text="Timer Settings",
             font=("Arial", 18, "bold"),
             fg="#FF6B6B",
             bg="#2E2E2E"
         )
-        title_label.pack(pady=(0, 20))
-        
-        # Create variables for settings
-        work_time_var = tk.IntVar(value=self.settings["work_time"])
-        short_break_var = tk.IntVar(value=self.settings["short_break"])
-        long_break_var = tk.IntVar(value=self.settings["long_break"])
-        cycles_var = tk.IntVar(value=self.settings["cycles_before_long_break"])
-        warning_time_var = tk.IntVar(value=self.settings["warning_time"])
-        sound_var = tk.BooleanVar(value=self.settings["sound_enabled"])
-        notif_var = tk.BooleanVar(value=self.settings["notification_enabled"])
+        self.settings_title.pack(pady=(0, 20))
+        
+        # One Tk variable per setting, filled in by sync_settings_dialog()
+        self.settings_vars = {
+            "work_time": tk.IntVar(),
+            "short_break": tk.IntVar(),
+            "long_break": tk.IntVar(),
+            "cycles_before_long_break": tk.IntVar(),
+            "warning_time": tk.IntVar(),
+            "sound_enabled": tk.BooleanVar(),
+            "notification_enabled": tk.BooleanVar(),
+        }
+        variables = self.settings_vars
         
         # Create settings controls
         # Work time
-        self.create_setting_control(settings_frame, "Work Time (minutes)", work_time_var, 1, 60)
+        self.create_setting_control(settings_frame, "Work Time (minutes)", variables["work_time"], 1, 60)
         
         # Short break time
-        self.create_setting_control(settings_frame, "Short Break (minutes)", short_break_var, 1, 30)
+        self.create_setting_control(settings_frame, "Short Break (minutes)", variables["short_break"], 1, 30)
         
         # Long break time
-        self.create_setting_control(settings_frame, "Long Break (minutes)", long_break_var, 5, 60)
+        self.create_setting_control(settings_frame, "Long Break (minutes)", variables["long_break"], 5, 60)
         
         # Cycles before long break
-        self.create_setting_control(settings_frame, "Work Cycles Before Long Break", cycles_var, 1, 10)
+        self.create_setting_control(settings_frame, "Work Cycles Before Long Break", variables["cycles_before_long_break"], 1, 10)
         
         # Warning time
-        self.create_setting_control(settings_frame, "Warning Time (minutes before end)", warning_time_var, 0, 5)
+        self.create_setting_control(settings_frame, "Warning Time (minutes before end)", variables["warning_time"], 0, 5)
         
         # Checkboxes for toggles
         # Sound toggle
@@ -509,7 +952,7 @@ class PomodoroTimer:
         sound_check = ttk.Checkbutton(
             sound_frame,
             text="Enable Sound Alerts",
-            variable=sound_var
+            variable=variables["sound_enabled"]
         )
         sound_check.pack(side="left")
         
@@ -520,7 +963,7 @@ class PomodoroTimer:
         notif_check = ttk.Checkbutton(
             notif_frame,
             text="Enable Desktop Notifications",
-            variable=notif_var
+            variable=variables["notification_enabled"]
         )
         notif_check.pack(side="left")
         
@@ -542,26 +985,34 @@ class PomodoroTimer:
         cancel_button = ttk.Button(
             button_frame,
             text="Cancel",
-            command=settings_window.destroy
+            command=self.close_settings
         )
         cancel_button.pack(side="left", padx=10)
         
         save_button = ttk.Button(
             button_frame,
             text="Save Settings",
-            command=lambda: self.save_settings_from_dialog(
-                settings_window,
-                work_time_var.get(),
-                short_break_var.get(),
-                long_break_var.get(),
-                cycles_var.get(),
-                warning_time_var.get(),
-                sound_var.get(),
-                notif_var.get()
-            )
+            command=self.save_settings_from_dialog
         )
         save_button.pack(side="right", padx=10)
     
+    def sync_settings_dialog(self):
+        """Load the current settings into the dialog's variables"""
+        for name, variable in self.settings_vars.items():
+            value = self.settings[name]
+            try:
+                unchanged = variable.get() == value
+            except tk.TclError:
+                unchanged = False  # left holding something that isn't a number
+            if not unchanged:
+                variable.set(value)
+        self.settings_title.config(text=f"Timer Settings ({self.settings.profile})")
+    
+    def close_settings(self):
+        """Hide the settings dialog until it is opened again"""
+        self.settings_window.grab_release()
+        self.settings_window.withdraw()
+    
     def create_setting_control(self, parent, label_text, variable, min_val, max_val):
         """Helper to create a labeled spinner control for settings"""
         frame = tk.Frame(parent, bg="#2E2E2E")
@@ -585,47 +1036,464 @@ class PomodoroTimer:
         )
         spinner.pack(side="right")
     
-    def save_settings_from_dialog(self, window, work, short, long, cycles, warning, sound, notif):
-        """Save settings from the dialog values"""
-        # Update settings dict
-        self.settings["work_time"] = work
-        self.settings["short_break"] = short
-        self.settings["long_break"] = long
-        self.settings["cycles_before_long_break"] = cycles
-        self.settings["warning_time"] = warning
-        self.settings["sound_enabled"] = sound
-        self.settings["notification_enabled"] = notif
-        
-        # Save to file
+    def save_settings_from_dialog(self):
+        """Apply the dialog's values that differ from the current settings"""
+        try:
+            values = {name: variable.get() for name, variable in self.settings_vars.items()}
+        except tk.TclError:
+            messagebox.showerror("Invalid Setting", "Please enter whole numbers of minutes", parent=self.settings_window)
+            return
+        changes = {name: value for name, value in values.items() if value != self.settings[name]}
+        
+        if changes:
+            # Update the settings (the timing values go to the active profile)
+            try:
+                self.settings.update(changes)
+            except SettingsError as e:
+                messagebox.showerror("Invalid Setting", str(e), parent=self.settings_window)
+                return
+            
+            # Save to file
+            self.save_settings()
+            
+            # If timer is not running, update time_left to match new settings
+            if not self.timer_running:
+                self.time_left = self.session.seconds_for(self.current_mode)
+                self.update_timer_display()
+            self.publish_status("settings")
+            self.update_plan_label()
+            self.update_recommendation()
+        
+        # Hide the window
+        self.close_settings()
+        
+        # Show confirmation
+        if changes:
+            messagebox.showinfo("Settings Saved", "Your settings have been updated")
+    
+    def switch_profile(self, name):
+        """Use the interval lengths of another profile"""
+        self.settings.use_profile(name)
         self.save_settings()
         
-        # If timer is not running, update time_left to match new settings
+        # As with the settings dialog, a running interval keeps its length
         if not self.timer_running:
-            if self.current_mode == "work":
-                self.time_left = self.settings["work_time"] * 60
-            elif self.current_mode == "short_break":
-                self.time_left = self.settings["short_break"] * 60
-            else:  # long_break
-                self.time_left = self.settings["long_break"] * 60
-            
+            self.time_left = self.session.seconds_for(self.current_mode)
             self.update_timer_display()
+        self.publish_status("settings")
+        self.update_plan_label()
+        self.update_recommendation()
+    
+    def count_in_stats(self, records):
+        """Add finished intervals to the statistics, if they are built or being built"""
+        if self._stats is not None:
+            for record in records:
+                self._stats.add(record)
+        elif isinstance(self._stats_pending, list):
+            self._stats_pending.extend(records)
+
+    def build_stats(self):
+        """Build the focus statistics from the history on a thread of its own
+
+        A first build over a long history (with no cache yet) takes a good
+        fraction of a second. It counts the intervals stored when it
+        starts; the ones finished or merged in meanwhile are kept aside and
+        added once it is done. It never starts during a merge, which could
+        otherwise be counted twice.
+        """
+        import threading  # only needed here; keeps app start-up lean
+        from pomodoro.analytics import FocusStats
+        history = self.history
+        history.flush()
+        rows = len(history)
+        self._stats_pending = []
+        built = []
+        
+        def build():
+            try:
+                built.append(FocusStats.from_history(history, self.stats_cache_file, rows=rows))
+            except (OSError, ValueError) as e:
+                print(f"Error reading the history for statistics: {e}")
+        thread = threading.Thread(target=build, name="pomodoro-stats", daemon=True)
+        thread.start()
+        
+        def collect():
+            if thread.is_alive():
+                self.root.after(MERGE_POLL_MS, collect)
+                return
+            pending, self._stats_pending = self._stats_pending, None
+            if not built:
+                if self.dashboard_window is not None:
+                    self.dashboard_summary.config(text="The history couldn't be read")
+                return
+            if pending == "stale":
+                self.refresh_dashboard()  # builds again once no merge is running
+                return
+            self._stats = built[0]
+            self.count_in_stats(pending)
+            self.refresh_dashboard()
+        self.root.after(MERGE_POLL_MS, collect)
+    
+    def open_dashboard(self):
+        """Open (or bring up) the statistics window"""
+        if self.dashboard_window is not None:
+            self.dashboard_window.lift()
+            self.refresh_dashboard()
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("Focus Statistics")
+        window.configure(bg="#2E2E2E")
+        window.resizable(False, False)
+        window.protocol("WM_DELETE_WINDOW", self.close_dashboard)
+        self.dashboard_window = window
+        
+        frame = tk.Frame(window, bg="#2E2E2E")
+        frame.pack(pady=20, padx=20, fill="both", expand=True)
+        
+        tk.Label(
+            frame,
+            text="Focus Statistics",
+            font=("Arial", 18, "bold"),
+            fg="#FF6B6B",
+            bg="#2E2E2E"
+        ).pack(pady=(0, 10))
         
-        # Close the window
-        window.destroy()
+        # Streak, outcome rates and lengths as text
+        self.dashboard_summary = tk.Label(
+            frame,
+            font=("Arial", 11),
+            fg="#FFFFFF",
+            bg="#2E2E2E",
+            justify="left"
+        )
+        self.dashboard_summary.pack(anchor="w")
         
-        # Show confirmation
-        messagebox.showinfo("Settings Saved", "Your settings have been updated")
+        tk.Label(
+            frame,
+            text="Focus minutes, last 14 days",
+            font=("Arial", 12, "bold"),
+            fg="#AAAAAA",
+            bg="#2E2E2E"
+        ).pack(anchor="w", pady=(15, 5))
+        self.focus_chart = tk.Canvas(frame, width=480, height=140, bg="#3E3E3E", highlightthickness=0)
+        self.focus_chart.pack()
+        
+        tk.Label(
+            frame,
+            text="When you focus (weekday by hour)",
+            font=("Arial", 12, "bold"),
+            fg="#AAAAAA",
+            bg="#2E2E2E"
+        ).pack(anchor="w", pady=(15, 5))
+        self.focus_heatmap = tk.Canvas(frame, width=480, height=150, bg="#2E2E2E", highlightthickness=0)
+        self.focus_heatmap.pack()
+        
+        self.refresh_dashboard()
+    
+    def close_dashboard(self):
+        self.dashboard_window.destroy()
+        self.dashboard_window = None
+    
+    def refresh_dashboard(self):
+        """Redraw the statistics window from the cached totals"""
+        if self.dashboard_window is None:
+            return
+        if self._stats is None:
+            if self._stats_pending is None and not self._merging:
+                self.build_stats()
+            self.dashboard_summary.config(text="Counting your history...")
+            return
+        from pomodoro.analytics import WEEKDAYS
+        summary = self._stats.summary()
+        
+        rates = summary["rates"]
+        lines = [
+            f"Completed work sessions: {summary['sessions']}",
+            f"Streak: {summary['streak']} day(s), longest {summary['longest_streak']}",
+            f"Work intervals: {rates['completed']:.0%} completed, "
+            f"{rates['skipped']:.0%} skipped, {rates['reset']:.0%} reset",
+        ]
+        for mode, (planned, actual) in summary["lengths"].items():
+            lines.append(f"{mode.replace('_', ' ').capitalize()}: {actual:.1f} of {planned:.1f} min on average")
+        
+        # Where the focus time of the days in the chart went
+        first_day, last_day = summary["focus"][0][0], summary["focus"][-1][0]
+        tasks = [(task, seconds) for task, seconds, _ in self.history.task_totals(first_day, last_day) if task]
+        if tasks:
+            lines.append("Top tasks: " + ", ".join(f"{task} {seconds / 60:.0f} min" for task, seconds in tasks[:5]))
+        self.dashboard_summary.config(text="\n".join(lines))
+        
+        # Bar per day
+        chart = self.focus_chart
+        chart.delete("all")
+        focus = summary["focus"]
+        peak = max([minutes for _, minutes in focus] + [25])
+        bar_width = 480 / len(focus)
+        for index, (day, minutes) in enumerate(focus):
+            x = index * bar_width
+            height = minutes / peak * 110
+            chart.create_rectangle(x + 4, 120 - height, x + bar_width - 4, 120, fill="#4ECDC4", width=0)
+            chart.create_text(x + bar_width / 2, 131, text=day.strftime("%d"), fill="#AAAAAA", font=("Arial", 8))
+        
+        # Heatmap cells, brighter for more minutes
+        heatmap = self.focus_heatmap
+        heatmap.delete("all")
+        cells = summary["heatmap"]
+        hottest = max(max(row) for row in cells) or 1
+        for weekday, row in enumerate(cells):
+            y = weekday * 20 + 5
+            heatmap.create_text(15, y + 8, text=WEEKDAYS[weekday], fill="#AAAAAA", font=("Arial", 8))
+            for hour, minutes in enumerate(row):
+                level = int(0x3E + (0xFF - 0x3E) * minutes / hottest)
+                color = f"#{0x3E:02X}{level:02X}{0x3E + (level - 0x3E) // 2:02X}"
+                x = 35 + hour * 18
+                heatmap.create_rectangle(x, y, x + 16, y + 16, fill=color, width=0)
     
     def reset_sessions_counter(self):
         """Reset the completed sessions counter"""
-        self.settings["completed_sessions"] = 0
-        self.sessions_counter.config(text="0")
-        self.save_settings()
+        self.sync.reset_sessions()
+        self.sessions_counter.config(text=str(self.sync.sessions))
+        self.publish_status("sessions")
         messagebox.showinfo("Counter Reset", "Completed sessions counter has been reset to 0")
 
+    def export_metrics(self):
+        """Write the timing histograms as JSON and Prometheus text next to the settings"""
+        if not metrics.enabled:
+            return
+        directory = os.path.dirname(self.settings_file)
+        try:
+            for path in metrics.export(directory):
+                print(f"Metrics written to {path}")
+        except OSError as e:
+            print(f"Error exporting metrics: {e}")
+
+    def on_close(self):
+        """Flush settings and history, then close the window"""
+        self.driver.stop()
+        self.export_metrics()
+        self.settings_store.close()
+        self.recommendation_store.close()
+        self.sync.close()
+        self.plugins.close()
+        if self.status_server is not None:
+            self.status_server.stop_thread()
+        if self._history is not None:
+            self._history.close()
+        if self._notifier is not None:
+            self._notifier.close()
+        self.journal.close()
+        self.root.destroy()
+
+class RemotePomodoroTimer(PomodoroTimer):
+    """The same window, showing and controlling the timer run by the daemon
+
+    The daemon (python -m pomodoro.daemon) owns the timer, settings, history,
+    journal and notifications; this window only mirrors its state and sends
+    commands.
+    """
+
+    # Daemon events arrive on the client's reader thread, which can't wake
+    # the main loop itself, so the mailbox is polled at least this often
+    poll_interval = 0.1
+
+    def __init__(self, root, socket_path=None):
+        self.socket_path = socket_path
+        super().__init__(root)
+        self.root.title("ADHD-Friendly Pomodoro Timer (shared)")
+
+    def create_session(self, scheduler):
+        from pomodoro.client import RemoteSession
+        self.scheduler = SessionScheduler()  # nothing to tick here; the daemon runs the timer
+        return RemoteSession(
+            self.socket_path, settings=self.settings, listener=self.on_session_event, post=self.mailbox.post
+        )
+
+    def restore_state(self):
+        pass  # the daemon restores its own journal
+
+    def load_plugins(self):
+        pass  # plugins run in the daemon, which owns the timer
+
+    def save_settings(self):
+        """Send the settings to the daemon, which saves them"""
+        self.session.update_settings(self.settings.to_dict())
+
+    def switch_profile(self, name):
+        """Ask the daemon to use another profile"""
+        self.session.use_profile(name)
+        self.refresh()
+
+    def merge_devices(self):
+        """The daemon merges other devices' sessions; just recount the week"""
+        self.load_week_sessions()
+
+    def reset_sessions_counter(self):
+        """Ask the daemon to reset the completed sessions counter"""
+        self.session.reset_sessions()
+        self.refresh()
+        messagebox.showinfo("Counter Reset", "Completed sessions counter has been reset to 0")
+
+    def on_session_event(self, session, event, data):
+        """Daemon event listener: count the event and redraw
+
+        The client posts each pushed event through the mailbox, so this and
+        the update of the mirrored state before it run on the main loop.
+        """
+        if event == "tick":
+            # Only the time moved; the rest of the window stays as it is
+            self.update_timer_display()
+            return
+        mode = session.current_mode
+        if event == "complete" and data["mode"] == "work":
+            self.week_sessions += 1
+        if event in ("complete", "skip", "reset") and data is not None:
+            record = IntervalRecord(**data)  # the daemon stores it in the history
+            self.count_in_stats([record])
+            self.learn_from(record)
+        elif event == "skip":
+            self.recommender.add_skip("short_break" if mode == "work" else "work")
+        elif event == "pause":
+            self.recommender.add_pause(mode, session.timer.remaining_exact(), self.settings.warning_seconds)
+        self.refresh()
+
+    def refresh(self):
+        """Redraw everything from the mirrored daemon state"""
+        self.update_timer_display()
+        self.update_button_states()
+        self.sessions_counter.config(text=str(self.session.sessions))
+        self.profile_picker.config(values=list(self.settings.profiles))
+        self.profile_var.set(self.settings.profile)
+        self.week_counter.config(text=f"({self.week_sessions} this week)")
+        self.refresh_dashboard()
+        self.update_recommendation()
+
+    def on_close(self):
+        """Disconnect from the daemon (which keeps running) and close the window"""
+        self.driver.stop()
+        self.export_metrics()
+        self.session.close()
+        self.recommendation_store.close()
+        if self._history is not None:
+            self._history.close()
+        self.root.destroy()
+
+
+def parse_day(text):
+    """argparse type for a YYYY-MM-DD day"""
+    import datetime
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a YYYY-MM-DD date: {text!r}")
+
+
+def export_history(args):
+    """Stream the interval history to a CSV, JSONL or columnar file"""
+    from pomodoro.history import HistoryStore
+    from pomodoro.history_io import export_history
+    
+    store = HistoryStore(args.history)
+    try:
+        count = export_history(store, args.path, args.format, args.first_day, args.last_day)
+    finally:
+        store.close()
+    print(f"Exported {count} intervals to {args.path}")
+
+
+def task_report(args):
+    """Print the work time spent on each task"""
+    from pomodoro.history import HistoryStore
+    
+    store = HistoryStore(args.history)
+    try:
+        totals = store.task_totals(args.first_day, args.last_day)
+    finally:
+        store.close()
+    for task, seconds, count in totals:
+        print(f"{seconds / 3600:7.1f} h  {count:5d} intervals  {task or '(no task)'}")
+
+
+def import_history(args):
+    """Add the intervals from an exported file to the history"""
+    from pomodoro.history import HistoryStore
+    from pomodoro.history_io import import_history
+    
+    store = HistoryStore(args.history)
+    try:
+        read, added = import_history(store, args.path, args.format)
+    finally:
+        store.close()
+    print(f"Read {read} intervals from {args.path}, added {added} new ones")
+
+
 # Main function to start the application
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ADHD-Friendly Pomodoro Timer")
+    parser.add_argument(
+        "--connect",
+        nargs="?",
+        const="",
+        metavar="SOCKET",
+        help="show the timer run by the Pomodoro daemon instead of a local one"
+    )
+    parser.add_argument(
+        "--http",
+        nargs="?",
+        const=8765,
+        type=int,
+        metavar="PORT",
+        help="serve the timer status on http://127.0.0.1:PORT/status (default port 8765)"
+    )
+    from pomodoro.history_io import FORMATS
+    commands = parser.add_subparsers(dest="command")
+    history_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.sqlite3")
+    
+    export_parser = commands.add_parser("export", help="write the interval history to a file")
+    export_parser.add_argument("path", help="output file (.csv, .jsonl or .pcol)")
+    export_parser.add_argument("--format", choices=FORMATS, help="file format (default: from the extension)")
+    export_parser.add_argument("--from", dest="first_day", type=parse_day, metavar="YYYY-MM-DD", help="first day to export")
+    export_parser.add_argument("--to", dest="last_day", type=parse_day, metavar="YYYY-MM-DD", help="last day to export")
+    export_parser.add_argument("--history", default=history_file, help="history database (default: %(default)s)")
+    export_parser.set_defaults(run=export_history)
+    
+    import_parser = commands.add_parser("import", help="add intervals from an exported file to the history")
+    import_parser.add_argument("path", help="input file (.csv, .jsonl or .pcol)")
+    import_parser.add_argument("--format", choices=FORMATS, help="file format (default: from the extension)")
+    import_parser.add_argument("--history", default=history_file, help="history database (default: %(default)s)")
+    import_parser.set_defaults(run=import_history)
+    
+    tasks_parser = commands.add_parser("tasks", help="show the work time spent on each task")
+    tasks_parser.add_argument("--from", dest="first_day", type=parse_day, metavar="YYYY-MM-DD", help="first day to count")
+    tasks_parser.add_argument("--to", dest="last_day", type=parse_day, metavar="YYYY-MM-DD", help="last day to count")
+    tasks_parser.add_argument("--history", default=history_file, help="history database (default: %(default)s)")
+    tasks_parser.set_defaults(run=task_report)
+    
+    args = parser.parse_args()
+    
+    if args.command is not None:
+        try:
+            args.run(args)
+        except (OSError, ValueError) as e:
+            sys.exit(f"{args.command.capitalize()} failed: {e}")
+        sys.exit(0)
+    
+    if args.http is not None and args.connect is not None:
+        parser.error("--http serves a local timer; start the daemon with --http instead")
+    
     root = tk.Tk()
-    app = PomodoroTimer(root)
+    if args.connect is None:
+        app = PomodoroTimer(root)
+        if args.http is not None:
+            try:
+                app.serve_status(args.http)
+            except OSError as e:
+                print(f"Cannot serve the status on port {args.http}: {e}")
+    else:
+        try:
+            app = RemotePomodoroTimer(root, args.connect or None)
+        except OSError as e:
+            root.destroy()
+            sys.exit(f"Cannot reach the Pomodoro daemon (start it with python -m pomodoro.daemon): {e}")
     root.mainloop()
 
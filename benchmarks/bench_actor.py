@@ -0,0 +1,242 @@
+"""Stress test of the main loop's mailbox: commands from many threads, one owner.
+
+A stub root (after()/after_cancel() on a ManualClock, run by hand in place
+of the Tk main loop) drives one PomodoroSession through a MainLoopDriver
+while PRODUCERS threads post COMMANDS start/pause/reset/skip commands each
+to its mailbox, and the main loop posts some of its own between ticks.
+Checks that:
+
+* every command ran exactly once, in the order its thread posted it
+* no tick was lost or duplicated: while the timer runs, each tick shows
+  one second less than the one before, at most a second later, and every
+  command or completion comes at most a second after the last tick
+* replaying the owner's steps (commands and tick dispatches, at the clock
+  times they ran) on a fresh session, with no threads, gives the same
+  events
+
+Then times post() from PRODUCERS threads at once while the owner drains.
+Fails if a check fails or a post takes longer than LIMIT.
+
+Usage: python benchmarks/bench_actor.py [commands_per_thread]
+"""
+import heapq
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import PomodoroSession
+from pomodoro.mailbox import MainLoopDriver, Mailbox
+from pomodoro.scheduler import SessionScheduler
+from pomodoro.timer_core import ManualClock
+
+PRODUCERS = 4
+COMMANDS = 2500
+POSTS = 200_000  # per thread, for the timing
+POLL = 0.25  # seconds between polls for other threads' posts
+LIMIT = 5e-6  # seconds per post()
+
+SETTINGS = {
+    "work_time": 2,
+    "short_break": 1,
+    "long_break": 2,
+    "cycles_before_long_break": 4,
+    "warning_time": 1,
+}
+
+# How often each command is picked
+WEIGHTS = {"start": 5, "pause": 3, "reset": 1, "skip": 1}
+
+
+class StubRoot:
+    """after() and after_cancel() on a ManualClock, run one callback at a time"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._timers = []
+        self._ids = itertools.count()
+        self._cancelled = set()
+
+    def after(self, milliseconds, callback):
+        timer_id = next(self._ids)
+        heapq.heappush(self._timers, (self.clock() + milliseconds / 1000, timer_id, callback))
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        self._cancelled.add(timer_id)
+
+    def run_one(self):
+        """Move the clock to the earliest callback and run it; False if none is set"""
+        while self._timers:
+            when, timer_id, callback = heapq.heappop(self._timers)
+            if timer_id in self._cancelled:
+                self._cancelled.discard(timer_id)
+                continue
+            self.clock.now = max(self.clock.now, when)
+            callback()
+            return True
+        return False
+
+
+class RecordingScheduler(SessionScheduler):
+    """SessionScheduler that notes when each batch of due ticks ran"""
+
+    def __init__(self, clock, steps):
+        super().__init__(clock=clock)
+        self.steps = steps
+
+    def run_pending(self, now=None):
+        self.steps.append((self.clock(), "ticks"))
+        return super().run_pending(now)
+
+
+def new_session(clock, steps):
+    """Session on a ManualClock; returns (session, scheduler, event log)"""
+    events = []
+
+    def listener(session, event, data):
+        active = session.active or event == "complete"
+        events.append((clock(), "event", event, session.time_left, active))
+    scheduler = RecordingScheduler(clock, steps)
+    session = PomodoroSession(SETTINGS, clock=clock, listener=listener, wall_clock=clock)
+    scheduler.add(session)
+    return session, scheduler, events
+
+
+def stress(commands):
+    """Run the threaded stress test; returns (event log, owner steps, command order per thread)"""
+    clock = ManualClock()
+    steps = []
+    session, scheduler, events = new_session(clock, steps)
+    root = StubRoot(clock)
+    driver = MainLoopDriver(root.after, root.after_cancel, scheduler, interval=POLL)
+    ran = {}
+
+    def run_command(source, number, name):
+        ran.setdefault(source, []).append(number)
+        steps.append((clock(), name))
+        events.append((clock(), "command", name, session.time_left, session.active))
+        getattr(session, name)()
+
+    names, weights = list(WEIGHTS), list(WEIGHTS.values())
+
+    def produce(source):
+        rng = random.Random(source)
+        for number in range(commands):
+            driver.mailbox.post(run_command, source, number, rng.choices(names, weights)[0])
+            if number % 8 == 0:
+                time.sleep(0.0002)  # let the main loop (and so the clock) move on
+
+    # The main loop clicks buttons too, every so often between ticks
+    clicks = itertools.count()
+    rng = random.Random(-1)
+    listener = session.listener
+
+    def clicking_listener(session, event, data):
+        listener(session, event, data)
+        if event == "tick" and rng.random() < 0.05:
+            driver.post(run_command, "main", next(clicks), rng.choices(names, weights)[0])
+    session.listener = clicking_listener
+
+    threads = [threading.Thread(target=produce, args=(source,)) for source in range(PRODUCERS)]
+    driver.start()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads) or driver.mailbox:
+        root.run_one()
+    for thread in threads:
+        thread.join()
+    root.run_one()  # the last posts
+    driver.stop()
+    return events, steps, ran, driver.polls
+
+
+def check_ticks(events):
+    """Problems with the ticks in an event log (empty if none was lost or duplicated)"""
+    problems = []
+    last = None  # (time, time left) of the last tick while running
+    for when, kind, name, left, active in events:
+        if name == "tick":
+            if last is not None and (last[1] - left != 1 or when - last[0] > 1 + 1e-9):
+                problems.append(f"tick showing {left} s at {when:.3f} after one showing {last[1]} s at {last[0]:.3f}")
+            last = (when, left)
+        elif kind == "command" or name == "complete":
+            if active and last is not None and when - last[0] > 1 + 1e-9:
+                problems.append(f"{name} at {when:.3f} more than a second after the last tick at {last[0]:.3f}")
+            last = None
+    return problems
+
+
+def replay(steps):
+    """Event log of the owner's steps run again serially on a fresh session"""
+    clock = ManualClock()
+    session, scheduler, events = new_session(clock, [])
+    for when, step in steps:
+        clock.now = when
+        if step == "ticks":
+            scheduler.run_pending()
+        else:
+            events.append((clock(), "command", step, session.time_left, session.active))
+            getattr(session, step)()
+    return events
+
+
+def time_posts(posts):
+    """Seconds per post() with PRODUCERS threads posting at once"""
+    mailbox = Mailbox()
+    counted = []
+
+    def produce():
+        for _ in range(posts):
+            mailbox.post(counted.append, 1)
+
+    threads = [threading.Thread(target=produce) for _ in range(PRODUCERS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        mailbox.drain()
+    elapsed = time.perf_counter() - started
+    while mailbox.drain():
+        pass
+    assert len(counted) == posts * PRODUCERS, "posts were lost"
+    return elapsed / (posts * PRODUCERS)
+
+
+def main(commands=COMMANDS):
+    started = time.perf_counter()
+    events, steps, ran, polls = stress(commands)
+    elapsed = time.perf_counter() - started
+    counts = {name: sum(1 for entry in events if entry[1] == "event" and entry[2] == name)
+              for name in ("tick", "warning", "complete")}
+    posted = PRODUCERS * commands + len(ran.get("main", []))
+    print(f"{PRODUCERS} threads x {commands} commands (+{len(ran.get('main', []))} from the main loop) "
+          f"in {elapsed:.2f} s over {events[-1][0]:.0f} simulated s: {polls} polls, "
+          f"{counts['tick']} ticks, {counts['warning']} warnings, {counts['complete']} completions")
+
+    for source, numbers in ran.items():
+        assert numbers == list(range(len(numbers))), f"commands from {source} lost, repeated or reordered"
+    assert sum(len(numbers) for numbers in ran.values()) == posted
+    assert all(len(ran[source]) == commands for source in range(PRODUCERS))
+    print(f"  all {posted} commands ran once, in the order they were posted")
+
+    problems = check_ticks(events)
+    assert not problems, "\n".join(problems[:10])
+    print("  no lost or duplicated ticks")
+
+    assert replay(steps) == events, "a serial replay gave different events"
+    print(f"  a serial replay of the {len(steps)} owner steps gives the same events")
+
+    per_post = time_posts(POSTS)
+    status = "ok" if per_post <= LIMIT else "TOO SLOW"
+    print(f"  post() from {PRODUCERS} threads at once: {per_post * 1e6:.2f} us each "
+          f"(limit {LIMIT * 1e6:.0f} us) {status}")
+    return 0 if per_post <= LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,99 @@
+"""Time to open the statistics dashboard over a large history.
+
+Fills a history with N intervals, then times what opening the dashboard
+does: load the column arrays (first without the columnar cache, then with
+it), aggregate them into FocusStats and compute the summary. That is done
+once vectorized (NumPy, when installed) and once row by row, and both must
+agree. Then times add() for new intervals and checks that the incremental
+totals match a rebuild, also for totals built from the first N intervals
+only (as the app builds them while more arrive) plus the rest. Fails if a warm open takes longer than LIMIT.
+
+Usage: python benchmarks/bench_analytics.py [records]
+"""
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_export import synthetic_records
+
+from pomodoro import analytics
+from pomodoro.analytics import FocusStats
+from pomodoro.history import HistoryStore
+
+RECORDS = 100_000
+LIMIT = 0.100  # seconds for a warm open with the cache in place
+ADDED = 1000
+
+
+def same(a, b):
+    """Summaries equal, floats to within rounding"""
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def open_dashboard(store, cache_path, vectorized):
+    started = time.perf_counter()
+    stats = FocusStats.from_history(store, cache_path, vectorized)
+    summary = stats.summary()
+    return time.perf_counter() - started, stats, summary
+
+
+def main(count=RECORDS):
+    with tempfile.TemporaryDirectory() as directory:
+        store = HistoryStore(os.path.join(directory, "history.sqlite3"))
+        start = time.time() - count * 1800
+        store.import_records(synthetic_records(count, start))
+        cache_path = os.path.join(directory, "history-cache.pcol")
+
+        vectorized = analytics.numpy is not None
+        print(f"{count} intervals, NumPy {'available' if vectorized else 'not installed (row by row only)'}")
+        cold, _, _ = open_dashboard(store, cache_path, vectorized)
+        print(f"  first open, building the cache: {cold * 1000:7.1f} ms")
+
+        timings = {}
+        summaries = {}
+        for label, flag in (("vectorized", True), ("row by row", False)):
+            if flag and not vectorized:
+                continue
+            best = min(open_dashboard(store, cache_path, flag)[0] for _ in range(3))
+            _, stats, summaries[label] = open_dashboard(store, cache_path, flag)
+            timings[label] = best
+            print(f"  warm open, {label:>10}: {best * 1000:7.1f} ms")
+        if len(summaries) == 2:
+            assert same(summaries["vectorized"], summaries["row by row"]), "vectorized and row-by-row totals differ"
+
+        # New intervals arrive one at a time while the dashboard is open
+        new = list(synthetic_records(ADDED, start + count * 1800))
+        started = time.perf_counter()
+        for record in new:
+            stats.add(record)
+            store.append(record)
+        per_add = (time.perf_counter() - started) / ADDED
+        incremental = stats.summary()
+        _, _, rebuilt = open_dashboard(store, cache_path, vectorized)
+        assert same(incremental, rebuilt), "incremental totals differ from a rebuild"
+        print(f"  add() per new interval: {per_add * 1e6:.1f} us (totals match a rebuild)")
+
+        first = FocusStats.from_history(store, cache_path, vectorized, rows=count)
+        for record in new:
+            first.add(record)
+        assert same(first.summary(), rebuilt), "the first intervals plus the rest differ from a rebuild"
+        store.close()
+
+    warm = min(timings.values())
+    status = "ok" if warm <= LIMIT else "TOO SLOW"
+    print(f"  fastest warm open {warm * 1000:.1f} ms (limit {LIMIT * 1000:.0f} ms) {status}")
+    return 0 if warm <= LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
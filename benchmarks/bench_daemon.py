@@ -0,0 +1,139 @@
+"""Event fan-out latency of the timer daemon.
+
+Starts the daemon in its own process on a temporary socket, connects
+SUBSCRIBERS clients that subscribe to events, then sends start/pause/skip
+commands from a control connection. For each command it measures how long
+after sending it every subscriber had the event in hand. Fails if the
+median fan-out to all subscribers takes longer than LIMIT.
+
+The broadcast itself (encode once, write to every socket) is also timed
+in-process, without any client reads in the way.
+
+Usage: python benchmarks/bench_daemon.py [subscribers]
+"""
+import json
+import os
+import selectors
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.client import DaemonClient
+from pomodoro.daemon import TimerDaemon
+
+SUBSCRIBERS = 40
+ROUNDS = 200
+LIMIT = 0.001  # median seconds for an event to reach every subscriber
+
+
+class FakeTransport:
+    def get_write_buffer_size(self):
+        return 0
+
+
+class FakeWriter:
+    transport = FakeTransport()
+
+    def write(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+def broadcast_cost(subscribers):
+    """Seconds per broadcast() to subscribers writers that accept everything"""
+    data_dir = tempfile.mkdtemp()
+    daemon = TimerDaemon(os.path.join(data_dir, "pomodoro.sock"), data_dir)
+    for _ in range(subscribers):
+        daemon.subscribers[FakeWriter()] = True
+    started = time.perf_counter()
+    for _ in range(ROUNDS * 10):
+        daemon.broadcast("tick")
+    elapsed = (time.perf_counter() - started) / (ROUNDS * 10)
+    daemon.close()
+    return elapsed
+
+
+def connect(socket_path, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return DaemonClient(socket_path)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.02)
+
+
+def fanout_latency(subscribers):
+    data_dir = tempfile.mkdtemp()
+    socket_path = os.path.join(data_dir, "pomodoro.sock")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "pomodoro.daemon", "--socket", socket_path, "--data-dir", data_dir],
+        cwd=root,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        control = connect(socket_path)
+        control.request("settings", settings={"notification_enabled": False, "sound_enabled": False})
+        clients = [DaemonClient(socket_path) for _ in range(subscribers)]
+        for client in clients:
+            client.request("subscribe", ticks=False)
+
+        # Read raw bytes as they arrive on any socket, so the timing is when
+        # the last subscriber got its event, not how fast we parse JSON
+        selector = selectors.DefaultSelector()
+        for client in clients:
+            client.sock.setblocking(False)
+            selector.register(client.sock, selectors.EVENT_READ)
+
+        fanout = []
+        for round_number in range(ROUNDS):
+            command = ("start", "pause", "skip")[round_number % 3]
+            pending = {client.sock: b"" for client in clients}
+            received = []
+            sent = time.perf_counter()
+            control.send(command)
+            while pending:
+                for key, _ in selector.select(timeout=5):
+                    data = pending[key.fileobj] + key.fileobj.recv(65536)
+                    if data.endswith(b"\n"):
+                        del pending[key.fileobj]
+                        received.append(data)
+                    else:
+                        pending[key.fileobj] = data
+            fanout.append(time.perf_counter() - sent)
+            control.receive()  # the command's own reply
+            for data in received:
+                assert json.loads(data)["event"] == command, data
+
+        selector.close()
+        for client in clients + [control]:
+            client.close()
+    finally:
+        daemon.terminate()
+        daemon.wait()
+    return sorted(fanout)
+
+
+def main(subscribers=SUBSCRIBERS):
+    cost = broadcast_cost(subscribers)
+    fanout = fanout_latency(subscribers)
+    median = statistics.median(fanout)
+    p99 = fanout[int(len(fanout) * 0.99) - 1]
+    status = "ok" if median <= LIMIT else "TOO SLOW"
+    print(f"{subscribers} subscribers, {ROUNDS} events")
+    print(f"  broadcast() in the daemon:  {cost * 1e6:.1f} us")
+    print(f"  command -> all subscribers: median {median * 1000:.3f} ms, p99 {p99 * 1000:.3f} ms "
+          f"(limit {LIMIT * 1000:.1f} ms) {status}")
+    return 0 if median <= LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
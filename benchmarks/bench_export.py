@@ -0,0 +1,119 @@
+"""Export/import throughput, peak memory and round trips for history files.
+
+Fills a history database with N synthetic intervals (several years at
+about 16 a day), then for each format exports it and imports the file into
+an empty database. Each step runs in its own process so its peak RSS is
+its own. Reports rows per second and peak RSS, and checks that the
+imported history matches the original (float32 lengths in the columnar
+format to within a millisecond, and without task names) and that a second
+import adds nothing.
+
+Usage: python benchmarks/bench_export.py [records]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import IntervalRecord
+from pomodoro.history import HistoryStore
+from pomodoro.history_io import FORMATS, export_history, import_history
+
+RECORDS = 200_000
+EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "columnar": ".pcol"}
+MODES = ["work", "short_break", "work", "short_break", "work", "short_break", "work", "long_break"]
+
+
+def synthetic_records(count, start):
+    for index in range(count):
+        mode = MODES[index % len(MODES)]
+        outcome = "skipped" if index % 11 == 0 else "completed"
+        started_at = start + index * 1800 + 0.123
+        actual = 1500.0 - (index % 7) * 0.25 if outcome == "completed" else 312.456
+        task = f"project {index % 37}, part {index % 5}" if mode == "work" else ""
+        yield IntervalRecord(mode, outcome, started_at, started_at + actual, 1500.0, actual, task)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)
+
+
+def child(operation, database, path):
+    """Run one export or import and print its timing as JSON"""
+    store = HistoryStore(database)
+    started = time.perf_counter()
+    if operation == "export":
+        rows = export_history(store, path)
+        added = None
+    else:
+        rows, added = import_history(store, path)
+    elapsed = time.perf_counter() - started
+    store.close()
+    print(json.dumps({"rows": rows, "added": added, "seconds": elapsed, "peak_rss_mb": peak_rss_mb()}))
+
+
+def run_child(operation, database, path):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", operation, database, path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def same_history(original, imported, tolerance, tasks=True):
+    count = 0
+    for a, b in zip(original.records(), imported.records()):
+        assert a.mode == b.mode and a.outcome == b.outcome, (a, b)
+        assert a.task == b.task or not tasks, (a, b)
+        for x, y in zip(a[2:6], b[2:6]):
+            assert abs(x - y) <= tolerance, (a, b)
+        count += 1
+    return count
+
+
+def main(count=RECORDS):
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "history.sqlite3")
+        store = HistoryStore(source)
+        store.import_records(synthetic_records(count, time.time() - count * 1800))
+        store.close()
+
+        # Baseline: what the interpreter plus the modules cost on their own
+        baseline = run_child("export", os.path.join(directory, "empty.sqlite3"), os.path.join(directory, "empty.csv"))
+        print(f"{count} intervals (baseline process peak RSS {baseline['peak_rss_mb']:.1f} MB)")
+
+        for format_name in FORMATS:
+            path = os.path.join(directory, "history" + EXTENSIONS[format_name])
+            target = os.path.join(directory, f"imported-{format_name}.sqlite3")
+            exported = run_child("export", source, path)
+            imported = run_child("import", target, path)
+            again = run_child("import", target, path)
+            assert exported["rows"] == imported["rows"] == imported["added"] == count, (exported, imported)
+            assert again["added"] == 0, again
+
+            original, copy = HistoryStore(source), HistoryStore(target)
+            tolerance = 1e-3 if format_name == "columnar" else 0.0
+            assert same_history(original, copy, tolerance, tasks=format_name != "columnar") == count
+            original.close()
+            copy.close()
+
+            size = os.path.getsize(path) / count
+            print(f"{format_name:>9}: {size:5.1f} bytes/row")
+            for label, result in (("export", exported), ("import", imported)):
+                print(f"           {label} {result['rows'] / result['seconds']:>10,.0f} rows/s, "
+                      f"peak RSS {result['peak_rss_mb']:.1f} MB")
+        print("round trips ok; re-imports added nothing")
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(*sys.argv[2:5])
+    else:
+        sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,70 @@
+"""Append latency and indexed-query benchmark for HistoryStore.
+
+Appends N synthetic intervals spread over a year, reporting the time each
+append() takes for the caller (the part that would run on the Tk main loop
+or the scheduler thread), how long the writer needs to persist them, and
+how long "sessions this week" takes against the full table.
+
+Usage: python benchmarks/bench_history.py [records]
+"""
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import IntervalRecord
+from pomodoro.history import HistoryStore
+
+MODES = ["work", "short_break", "work", "short_break", "work", "short_break", "work", "long_break"]
+
+
+def synthetic_records(count, start):
+    for index in range(count):
+        mode = MODES[index % len(MODES)]
+        outcome = "skipped" if index % 11 == 0 else "completed"
+        started_at = start + index * 1800
+        yield IntervalRecord(mode, outcome, started_at, started_at + 1500, 1500.0, 1500.0)
+
+
+def main(count):
+    with tempfile.TemporaryDirectory() as directory:
+        store = HistoryStore(os.path.join(directory, "history.sqlite3"))
+        start = time.time() - count * 1800
+        latencies = []
+        for record in synthetic_records(count, start):
+            began = time.perf_counter()
+            store.append(record)
+            latencies.append(time.perf_counter() - began)
+
+        began = time.perf_counter()
+        store.flush()
+        flush_time = time.perf_counter() - began
+
+        latencies_us = sorted(value * 1e6 for value in latencies)
+        print(f"append(): {count} records, mean {statistics.mean(latencies_us):.2f} us, "
+              f"p99 {latencies_us[int(len(latencies_us) * 0.99)]:.2f} us, max {latencies_us[-1]:.2f} us")
+        print(f"writer: remaining backlog persisted in {flush_time * 1000:.1f} ms after the last append")
+
+        today = datetime.date.fromtimestamp(start + count * 1800)
+        runs = 200
+        began = time.perf_counter()
+        for _ in range(runs):
+            week = store.sessions_this_week(today)
+        query_time = (time.perf_counter() - began) / runs
+        print(f"sessions_this_week(): {week} sessions in {query_time * 1e6:.1f} us")
+
+        plan = store._reader.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM intervals "
+            "WHERE day BETWEEN ? AND ? AND mode = ? AND outcome = ?",
+            ("2024-01-01", "2024-01-07", "work", "completed"),
+        ).fetchall()
+        print("query plan:", "; ".join(row[-1] for row in plan))
+        store.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
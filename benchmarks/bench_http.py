@@ -0,0 +1,173 @@
+"""Load test of the HTTP status endpoint: idle event streams, ticks and polling.
+
+Runs a StatusServer on its own thread (as the app does with --http) and
+talks to it over real sockets:
+
+* streams: opens IDLE event streams plus TICKERS that ask for ticks, then
+  publishes a running timer's status once a second for SECONDS seconds and
+  a pause; ticks must reach only the TICKERS, the pause every stream.
+  The server thread's CPU time (time.thread_time() on that thread) is
+  measured while the streams sit idle and while the timer ticks
+* polling: GET /status over one keep-alive connection, with and without
+  the current ETag in If-None-Match (304 and 200 answers); a new status
+  must turn the old ETag's 304 back into a 200
+
+Fails if the server thread uses more than CPU_LIMIT of one core while
+ticking.
+
+Usage: python benchmarks/bench_http.py [idle streams]
+"""
+import asyncio
+import os
+import selectors
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.http_status import StatusServer
+
+IDLE = 300
+TICKERS = 20
+SECONDS = 5
+REQUESTS = 5000
+CPU_LIMIT = 0.02  # fraction of one core for the server thread while ticking
+
+
+def timer_status(time_left, running=True):
+    return {"mode": "work", "time_left": time_left, "completed_sessions": 3,
+            "running": running, "paused": not running, "task": "report"}
+
+
+def server_cpu(server):
+    """CPU seconds the server's thread has used so far"""
+    async def thread_time():
+        return time.thread_time()
+    return asyncio.run_coroutine_threadsafe(thread_time(), server._loop).result()
+
+
+def open_stream(port, ticks):
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.sendall(f"GET /events{'?ticks=1' if ticks else ''} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    sock.setblocking(False)
+    return sock
+
+
+def read_streams(selector, received, until):
+    """Read whatever the streams send until the monotonic time until"""
+    while True:
+        timeout = until - time.monotonic()
+        if timeout <= 0:
+            return
+        for key, _ in selector.select(timeout):
+            data = key.fileobj.recv(65536)
+            assert data, "the server closed an event stream"
+            received[key.fileobj] += data
+
+
+def streams(server, idle_streams):
+    """(CPU fraction idle, CPU fraction ticking); asserts who got which events"""
+    selector = selectors.DefaultSelector()
+    idle = [open_stream(server.port, False) for _ in range(idle_streams)]
+    tickers = [open_stream(server.port, True) for _ in range(TICKERS)]
+    received = {}
+    for sock in idle + tickers:
+        selector.register(sock, selectors.EVENT_READ)
+        received[sock] = b""
+    read_streams(selector, received, time.monotonic() + 0.5)
+    assert all(data.count(b"event: status\n") == 1 for data in received.values()), "a stream got no status"
+    assert len(server.streams) == idle_streams + TICKERS, "not every stream was registered"
+
+    # Idle: nothing happens
+    cpu = server_cpu(server)
+    started = time.monotonic()
+    read_streams(selector, received, started + 1)
+    idle_cpu = (server_cpu(server) - cpu) / (time.monotonic() - started)
+
+    # A running timer: one tick a second, then a pause
+    cpu = server_cpu(server)
+    started = time.monotonic()
+    for second in range(1, SECONDS + 1):
+        server.publish_threadsafe(timer_status(1500 - second), "tick")
+        read_streams(selector, received, started + second)
+    ticking_cpu = (server_cpu(server) - cpu) / (time.monotonic() - started)
+    server.publish_threadsafe(timer_status(1500 - SECONDS, running=False), "pause")
+    read_streams(selector, received, time.monotonic() + 0.5)
+
+    for sock in idle:
+        assert b"event: tick" not in received[sock], "a stream got ticks it didn't ask for"
+        assert received[sock].count(b"event: pause\n") == 1, "a stream missed the pause"
+    for sock in tickers:
+        assert received[sock].count(b"event: tick\n") == SECONDS, "a stream missed ticks"
+        assert received[sock].count(b"event: pause\n") == 1, "a stream missed the pause"
+
+    selector.close()
+    for sock in idle + tickers:
+        sock.close()
+    return idle_cpu, ticking_cpu
+
+
+def read_response(sock, buffer):
+    """(status code, ETag, rest of the buffer) for one response on a keep-alive connection"""
+    while b"\r\n\r\n" not in buffer:
+        buffer += sock.recv(65536)
+    head, _, buffer = buffer.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.lower().split(": ", 1) for line in lines[1:])
+    length = int(headers.get("content-length", 0))
+    while len(buffer) < length:
+        buffer += sock.recv(65536)
+    return int(lines[0].split(" ")[1]), headers.get("etag"), buffer[length:]
+
+
+def polling(server):
+    """(requests per second answered 304, answered 200)"""
+    sock = socket.create_connection(("127.0.0.1", server.port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.sendall(b"GET /status HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    code, etag, buffer = read_response(sock, b"")
+    assert code == 200 and etag, "no ETag on /status"
+
+    rates = []
+    for request, expected in ((f"GET /status HTTP/1.1\r\nIf-None-Match: {etag}\r\n\r\n", 304),
+                              ("GET /status HTTP/1.1\r\n\r\n", 200)):
+        request = request.encode()
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            sock.sendall(request)
+            code, _, buffer = read_response(sock, buffer)
+            assert code == expected, f"expected {expected}, got {code}"
+        rates.append(REQUESTS / (time.perf_counter() - started))
+
+    # A new status makes the old ETag stale
+    server.publish_threadsafe(timer_status(1234), "tick")
+    server_cpu(server)  # the publish has run once this returns
+    sock.sendall(f"GET /status HTTP/1.1\r\nIf-None-Match: {etag}\r\n\r\n".encode())
+    code, new_etag, buffer = read_response(sock, buffer)
+    assert code == 200 and new_etag != etag, "a stale ETag still got a 304"
+    sock.close()
+    return rates
+
+
+def main(idle=IDLE):
+    server = StatusServer(0)
+    server.start_in_thread()
+    try:
+        server.publish_threadsafe(timer_status(1500, running=False))
+        idle_cpu, ticking_cpu = streams(server, idle)
+        not_modified, ok = polling(server)
+    finally:
+        server.stop_thread()
+
+    print(f"{idle} idle event streams + {TICKERS} with ticks, {SECONDS} s of ticks")
+    print(f"  server thread CPU: {idle_cpu * 100:.3f}% idle, {ticking_cpu * 100:.3f}% ticking "
+          f"({server.events_sent} events sent)")
+    print(f"  keep-alive polling: {not_modified:,.0f} req/s answered 304, {ok:,.0f} req/s answered 200")
+    status = "ok" if ticking_cpu <= CPU_LIMIT else "TOO MUCH CPU"
+    print(f"  ticking CPU {ticking_cpu * 100:.3f}% of a core (limit {CPU_LIMIT * 100:.0f}%) {status}")
+    return 0 if ticking_cpu <= CPU_LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
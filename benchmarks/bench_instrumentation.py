@@ -0,0 +1,70 @@
+"""Overhead of the timing histograms, disabled and enabled.
+
+Dispatches the same simulated ticks through SessionScheduler with metrics
+off and on, reports the difference per tick, and prints the exported
+Prometheus text for the enabled run.
+
+Usage: python benchmarks/bench_instrumentation.py [sessions]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import PomodoroSession
+from pomodoro.instrumentation import metrics
+from pomodoro.scheduler import SessionScheduler
+from pomodoro.timer_core import ManualClock
+
+SETTINGS = {
+    "work_time": 25,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "warning_time": 1,
+}
+
+
+def dispatch(count, seconds=20):
+    clock = ManualClock()
+    scheduler = SessionScheduler(clock=clock)
+    for _ in range(count):
+        session = PomodoroSession(SETTINGS, clock=clock)
+        scheduler.add(session)
+        session.start()
+    scheduler.run_pending()
+    began = time.perf_counter()
+    for _ in range(seconds):
+        clock.advance(1.0)
+        scheduler.run_pending(clock() + 0.002)  # run each tick 2 ms late
+    return (time.perf_counter() - began) / (count * seconds)
+
+
+def main(count):
+    metrics.enabled = False
+    disabled = min(dispatch(count) for _ in range(3))
+    metrics.enabled = True
+    metrics.reset()
+    enabled = min(dispatch(count) for _ in range(3))
+    print(f"per tick: disabled {disabled * 1e6:.3f} us, enabled {enabled * 1e6:.3f} us, "
+          f"overhead {(enabled - disabled) * 1e6:+.3f} us")
+
+    loops = 1000000
+    began = time.perf_counter()
+    for _ in range(loops):
+        if metrics.enabled:
+            pass
+    check = (time.perf_counter() - began) / loops
+    began = time.perf_counter()
+    observe = metrics.ui_dispatch_delay.observe
+    for _ in range(loops):
+        observe(0.003)
+    recorded = (time.perf_counter() - began) / loops
+    print(f"enabled check: {check * 1e9:.0f} ns, observe(): {recorded * 1e9:.0f} ns")
+    print()
+    print("\n".join(metrics.to_prometheus().splitlines()[:18]))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,139 @@
+"""Append cost and restore time of the timer state journal.
+
+Writes months of transitions (start/pause/skip/complete, ~30 a day) and
+times a cold restore, with the default snapshot compaction and with
+compaction effectively turned off for comparison. Also checks that the
+restored state matches the last recorded one, torn last line included,
+that an entry appended after a torn line is restored, that an interval
+that never started is restored at the length the settings give it now,
+and that one that ran out while the app was down is recorded as ending
+at its deadline.
+
+Usage: python benchmarks/bench_journal.py [days]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import PomodoroSession
+from pomodoro.journal import StateJournal
+from pomodoro.timer_core import ManualClock
+
+SETTINGS = {
+    "work_time": 25,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "warning_time": 1,
+}
+
+EVENTS_PER_DAY = 30
+
+
+def fill(journal, days):
+    clock = ManualClock()
+    session = PomodoroSession(SETTINGS, clock=clock)
+    costs = []
+    for index in range(days * EVENTS_PER_DAY):
+        step = index % 3
+        if step == 0:
+            session.start()
+            event = "start"
+        elif step == 1:
+            clock.advance(600)
+            session.pause()
+            event = "pause"
+        else:
+            session.skip()
+            event = "skip"
+        began = time.perf_counter()
+        journal.record(event, session.snapshot())
+        costs.append(time.perf_counter() - began)
+    journal.close()
+    return session.snapshot(), costs
+
+
+def run(directory, days, snapshot_every, label):
+    path = os.path.join(directory, f"journal-{snapshot_every}.log")
+    journal = StateJournal(path, snapshot_every=snapshot_every)
+    expected, costs = fill(journal, days)
+    with open(path, "a") as f:
+        f.write('{"seq": 99999999, "time": 1, "ev')  # crash mid-append
+
+    began = time.perf_counter()
+    state, _ = StateJournal(path, snapshot_every=snapshot_every).load()
+    restore_time = time.perf_counter() - began
+    assert state == expected, "restored state differs from the last recorded one"
+
+    restored = PomodoroSession(SETTINGS, clock=ManualClock())
+    restored.restore(state, elapsed=120)
+    size = os.path.getsize(path) + (os.path.getsize(path + ".snapshot") if os.path.exists(path + ".snapshot") else 0)
+    print(f"{label:>15}: {len(costs)} entries, append mean {statistics.mean(costs) * 1e6:.0f} us (fsync), "
+          f"restore {restore_time * 1000:.2f} ms, {size / 1024:.0f} KiB on disk")
+
+
+def check_changed_length():
+    """A stopped interval picks up a length changed after its last transition"""
+    session = PomodoroSession(SETTINGS, clock=ManualClock())
+    session.start()
+    session.reset()
+    stopped = session.snapshot()
+    session.start()
+    session.pause()
+    paused = session.snapshot()
+
+    longer = dict(SETTINGS, work_time=50)
+    restored = PomodoroSession(longer, clock=ManualClock())
+    restored.restore(stopped)
+    assert restored.time_left == 50 * 60, f"a stopped interval came back at {restored.time_left} s"
+    restored.restore(paused)
+    assert restored.time_left == 25 * 60, "a paused interval lost its length"
+
+
+def check_append_after_torn_line(directory):
+    """An entry written after a crash mid-append is not lost with the torn line"""
+    path = os.path.join(directory, "journal-torn.log")
+    journal = StateJournal(path)
+    journal.record("start", {"a": 1})
+    journal.record("pause", {"a": 2})
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"seq":3,"time":1,"ev')  # crash mid-append
+    journal = StateJournal(path)
+    journal.record("start", {"a": 4})
+    journal.close()
+    state, _ = StateJournal(path).load()
+    assert state == {"a": 4}, f"restored {state} after appending to a torn journal"
+
+
+def check_expired_end():
+    """An interval that ran out while the app was down ends at its deadline"""
+    clock = ManualClock(1_700_000_000)
+    session = PomodoroSession(SETTINGS, clock=clock, wall_clock=clock)
+    session.start()
+    clock.advance(600)
+    state = session.snapshot()
+    deadline = clock() + state["left"]
+
+    clock.advance(3600)  # the app was closed for an hour
+    records = []
+    restored = PomodoroSession(SETTINGS, clock=clock, wall_clock=clock,
+                               listener=lambda session, event, data: records.append(data) if event == "complete" else None)
+    restored.restore(state, elapsed=3600)
+    restored.tick()
+    assert records and records[0].ended_at == deadline, \
+        f"an expired interval ended at {records[0].ended_at if records else None}, its deadline was {deadline}"
+
+
+if __name__ == "__main__":
+    check_changed_length()
+    check_expired_end()
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 180
+    with tempfile.TemporaryDirectory() as directory:
+        check_append_after_torn_line(directory)
+        run(directory, days, 256, "with snapshots")
+        run(directory, days, 10 ** 9, "log only")
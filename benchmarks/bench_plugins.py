@@ -0,0 +1,166 @@
+"""Cost of the plugin hooks on the timer's thread, with 0, 1 and 50 plugins.
+
+* dispatch: what the session listener pays per event for the plugin check
+  (`if event in plugins.table: plugins.dispatch(...)`), for ticks (which no
+  plugin can subscribe to) and for completions, with 0, 1 and 50 no-op
+  plugins on "complete"; every plugin must then see every completion
+* slow plugin: a plugin that sleeps past its timeout next to a fast one;
+  dispatch must stay fast, the slow one must be reported and its events
+  dropped, and the fast one must still see every event
+* lazy loading: an entry point's module is only imported on its first event
+* exit: a process whose plugin never returns still exits once the
+  registry is closed
+
+Fails if a completion with no plugins costs more than LIMIT.
+
+Usage: python benchmarks/bench_plugins.py [events]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import IntervalRecord, PomodoroSession
+from pomodoro.plugins import QUEUE_LIMIT, Plugin, PluginRegistry
+
+HUNG_PLUGIN = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+from pomodoro.engine import PomodoroSession
+from pomodoro.plugins import PluginRegistry
+registry = PluginRegistry()
+registry.subscribe("start", lambda event: time.sleep(60), name="hung")
+registry.dispatch(PomodoroSession({}), "start", None)
+time.sleep(0.1)
+registry.close()
+"""
+
+EVENTS = 100_000
+LIMIT = 1e-6  # seconds per event with no plugins
+
+
+def wait_idle(registry, timeout=10):
+    """Wait until every plugin has worked through its queue"""
+    deadline = time.monotonic() + timeout
+    while any(plugin.scheduled for plugin in registry.plugins):
+        if time.monotonic() > deadline:
+            raise AssertionError("plugins never caught up")
+        time.sleep(0.001)
+
+
+def dispatch_cost(registry, session, event, data, count):
+    """Seconds per event for the listener's plugin check (and dispatch, if subscribed)"""
+    timings = []
+    done = 0
+    while done < count:
+        # In bursts no longer than a plugin's queue, so none is dropped
+        burst = min(QUEUE_LIMIT, count - done)
+        started = time.perf_counter()
+        for _ in range(burst):
+            if event in registry.table:
+                registry.dispatch(session, event, data)
+        timings.append((time.perf_counter() - started) / burst)
+        done += burst
+        wait_idle(registry)
+    return statistics.median(timings)
+
+
+def fan_out(count, session, record, events):
+    """(tick cost, completion cost) with count no-op plugins on "complete\""""
+    registry = PluginRegistry()
+    seen = [0] * count
+    for index in range(count):
+        def callback(event, index=index):
+            seen[index] += 1
+        registry.subscribe("complete", callback, name=f"noop {index}")
+    try:
+        tick = dispatch_cost(registry, session, "tick", None, events)
+        completions = events if count < 50 else events // 20
+        complete = dispatch_cost(registry, session, "complete", record, completions)
+        assert seen == [completions] * count, "a plugin missed completions"
+        return tick, complete
+    finally:
+        registry.close()
+
+
+def slow_plugin(session):
+    registry = PluginRegistry(timeout=0.05)
+    fast_seen = []
+    registry.subscribe("start", fast_seen.append, name="fast")
+    slow = registry.subscribe("start", lambda event: time.sleep(0.2), name="slow")
+    timings = []
+    events = 100
+    for _ in range(events):
+        started = time.perf_counter()
+        registry.dispatch(session, "start", None)
+        timings.append(time.perf_counter() - started)
+        time.sleep(0.005)
+    wait_idle(registry)
+    registry.close()
+    assert len(fast_seen) == events, "the fast plugin missed events"
+    assert slow.overruns >= 1 and slow.dropped > 0, "the slow plugin was never reported"
+    return max(timings), slow
+
+
+def lazy_loading(session):
+    registry = PluginRegistry()
+    loaded = threading.Event()
+
+    def load():
+        loaded.set()
+        return lambda event: None
+    registry._add(Plugin("lazy:plugin", "warning", loader=load))
+    assert not loaded.is_set(), "the plugin was imported before its first event"
+    registry.dispatch(session, "warning", None)
+    wait_idle(registry)
+    registry.close()
+    assert loaded.is_set(), "the plugin was never imported"
+
+
+def exit_with_hung_plugin():
+    """Seconds a process takes to exit after closing a registry whose plugin hangs"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", HUNG_PLUGIN, root], check=True, timeout=30)
+    elapsed = time.perf_counter() - started
+    assert elapsed < 5, f"a hung plugin kept the process alive for {elapsed:.1f} s"
+    return elapsed
+
+
+def main(events=EVENTS):
+    session = PomodoroSession({})
+    record = IntervalRecord("work", "completed", 0.0, 1500.0, 1500, 1500.0)
+
+    started = time.perf_counter()
+    for _ in range(events):
+        pass
+    empty_loop = (time.perf_counter() - started) / events
+
+    results = {}
+    for count in (0, 1, 50):
+        tick, complete = fan_out(count, session, record, events)
+        results[count] = complete
+        print(f"{count:>3} plugins: tick {max(0.0, tick - empty_loop) * 1e9:6.0f} ns, "
+              f"completion {max(0.0, complete - empty_loop) * 1e9:8.0f} ns on the timer's thread")
+
+    worst, slow = slow_plugin(session)
+    print(f"  slow plugin (sleeps 0.2 s, timeout 0.05 s): dispatch at most {worst * 1e6:.0f} us, "
+          f"{slow.overruns} overruns reported, {slow.dropped} events dropped; the fast plugin saw all")
+
+    lazy_loading(session)
+    print("  an entry point is only loaded on its first event")
+
+    print(f"  a process with a hung plugin exits {exit_with_hung_plugin():.2f} s after starting it")
+
+    cost = results[0] - empty_loop
+    status = "ok" if cost <= LIMIT else "TOO SLOW"
+    print(f"  completion with no plugins: {max(0.0, cost) * 1e9:.0f} ns (limit {LIMIT * 1e9:.0f} ns) {status}")
+    return 0 if cost <= LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,152 @@
+"""Cost per update of the interval recommender, and what it suggests.
+
+Times Recommender.add() and suggest() over RECORDS synthetic intervals
+(they must stay flat, not grow with the history), next to recomputing a
+median over the whole history on every interval. Then lets simulated users
+(pomodoro.simulate) with short and long attention spans use the default
+25-minute timer, feeding every interval and pause to a recommender, and
+checks that it suggests shorter work for the first and longer for the
+second, and that suggestions for settings at the edges of their ranges
+are still settings the app accepts. Fails if an update takes more than
+LIMIT, or if the app's learn_from() (an update and a save, written
+behind) blocks for more than LEARN_LIMIT.
+
+Usage: python benchmarks/bench_recommend.py [records]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_export import synthetic_records
+
+from app import PomodoroTimer
+from pomodoro.persistence import SettingsStore
+from pomodoro.recommend import Recommender
+from pomodoro.settings import Settings
+from pomodoro.simulate import Behaviour, Simulation
+
+RECORDS = 100_000
+LIMIT = 20e-6  # seconds per add()
+LEARN_LIMIT = 100e-6  # seconds per PomodoroTimer.learn_from() (a synchronous fsync takes longer)
+
+
+def time_updates(count):
+    recommender = Recommender()
+    records = list(synthetic_records(count, time.time() - count * 1800))
+    timings = []
+    for start in range(0, count, 1000):
+        started = time.perf_counter()
+        for record in records[start:start + 1000]:
+            recommender.add(record)
+        timings.append((time.perf_counter() - started) / 1000)
+    settings = Settings()
+    started = time.perf_counter()
+    for _ in range(1000):
+        recommender.suggest(settings)
+    per_suggest = (time.perf_counter() - started) / 1000
+
+    # The alternative: a median over everything so far, every time
+    actuals = [record.actual for record in records[:count // 10]]
+    started = time.perf_counter()
+    statistics.median(actuals)
+    recompute = time.perf_counter() - started
+    return timings, per_suggest, recompute
+
+
+def simulated_user(attention, days=60):
+    """Suggestion after a simulated user with this attention span used the default timer"""
+    recommender = Recommender()
+    simulation = Simulation({}, Behaviour(attention=attention, reset_rate=0.02), seed=attention)
+    settings = simulation.settings
+    listener = simulation.session.listener
+
+    def observe(session, event, data):
+        listener(session, event, data)
+        if data is not None:
+            recommender.add(data)
+        elif event == "pause":
+            recommender.add_pause(session.current_mode, session.timer.remaining_exact(), settings.warning_seconds)
+        elif event == "skip":
+            recommender.add_skip("short_break" if session.current_mode == "work" else "work")
+    simulation.session.listener = observe
+    simulation.run(days)
+    return recommender.suggest(settings)
+
+
+def check_edges():
+    """Suggestions stay in range, and don't shorten breaks the user made long"""
+    recommender = Recommender()
+    recommender.work_seen = 10
+    recommender.averages["completed"].value = 0.7
+    recommender.averages["late_return"].value = 8  # asks for longer breaks
+    settings = Settings()
+    settings.update({"short_break": 45, "long_break": 238})
+    suggestion = recommender.suggest(settings)
+    assert suggestion.short_break == 45, f"a 45 min break was suggested as {suggestion.short_break} min"
+    settings.update({
+        "work_time": suggestion.work_time,
+        "short_break": suggestion.short_break,
+        "long_break": suggestion.long_break,
+    })  # raises SettingsError if anything is out of range
+
+    recommender.averages["late_return"].value = None
+    recommender.averages["break_skipped"].value = 0.9  # asks for shorter breaks
+    settings.update({"short_break": 1, "long_break": 1})
+    suggestion = recommender.suggest(settings)
+    assert suggestion.short_break >= 1 and suggestion.long_break >= 1, suggestion
+
+
+def learn_cost(count=200):
+    """Seconds per PomodoroTimer.learn_from, on the Tk thread after every interval"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "recommendations.json")
+        window = types.SimpleNamespace(
+            recommender=Recommender(),
+            recommendation_store=SettingsStore(path, name="interval suggestions"),
+            post_to_ui=lambda callback: None,
+            update_recommendation=None,  # only posted, and nothing drains the posts here
+        )
+        records = list(synthetic_records(count, 1_700_000_000))
+        started = time.perf_counter()
+        for record in records:
+            PomodoroTimer.learn_from(window, record)
+        elapsed = (time.perf_counter() - started) / count
+        window.recommendation_store.close()
+        saved = Recommender.load(path)
+        assert saved.work_seen == window.recommender.work_seen, "the last update wasn't saved"
+    return elapsed
+
+
+def main(count=RECORDS):
+    check_edges()
+    timings, per_suggest, recompute = time_updates(count)
+    first, last = statistics.mean(timings[:5]), statistics.mean(timings[-5:])
+    print(f"{count} intervals: add() {first * 1e6:.2f} us at the start, {last * 1e6:.2f} us at the end; "
+          f"suggest() {per_suggest * 1e6:.2f} us")
+    print(f"  recomputing a median over {count // 10} intervals instead: {recompute * 1e6:.0f} us per update")
+
+    for attention, expect in ((12, "shorter"), (1000, "longer")):
+        suggestion = simulated_user(attention)
+        print(f"  attention span {attention:>4} min on 25 min work: suggests {suggestion.work_time} min "
+              f"work, {suggestion.short_break}/{suggestion.long_break} min breaks ({suggestion.reason})")
+        if expect == "shorter":
+            assert suggestion.work_time < 25, suggestion
+        else:
+            assert suggestion.work_time > 25, suggestion
+
+    worst = max(timings)
+    status = "ok" if worst <= LIMIT else "TOO SLOW"
+    print(f"  add() in the slowest batch of 1000: {worst * 1e6:.2f} us each (limit {LIMIT * 1e6:.0f} us) {status}")
+    learn = learn_cost()
+    status = "ok" if learn <= LEARN_LIMIT else "TOO SLOW"
+    print(f"  learn_from() in the app, saving behind: {learn * 1e6:.2f} us (limit {LEARN_LIMIT * 1e6:.0f} us) {status}")
+    return 0 if worst <= LIMIT and learn <= LEARN_LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,168 @@
+"""Cost per frame of the progress ring, with a cold and a warm frame cache.
+
+* frames: draws every step of a work interval through RingRenderer.frame()
+  with an empty cache (cold: each one drawn), then asks again for the most
+  recent ones (warm: cache hits)
+* ticks: runs a work interval, a break and another work interval tick by
+  tick through TimerViewModel and RingCanvas (on a stub canvas), running
+  the idle-time prefetches between ticks as the Tk main loop would, and
+  times what each tick costs; compares with drawing a frame on every tick
+* Tk images: time to turn a frame into an ImageTk.PhotoImage (needs a
+  display; skipped without one)
+
+Fails if a tick's p99 cost exceeds TICK_LIMIT or the cache outgrows its
+byte budget. Skipped when Pillow isn't installed.
+
+Usage: python benchmarks/bench_ring.py [size]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.ring import RingCanvas
+from pomodoro.view_model import TimerViewModel
+
+SIZE = 260
+THICKNESS = 14
+TICK_LIMIT = 0.001  # seconds per tick (p99)
+
+# (mode, seconds) of the intervals ticked through
+INTERVALS = [("work", 25 * 60), ("short_break", 5 * 60), ("work", 25 * 60)]
+
+
+class StubCanvas:
+    """Stands in for a Tk Canvas: keeps items, queues after_idle() calls"""
+
+    def __init__(self):
+        self.items = {}
+        self.idle = []
+
+    def config(self, **options):
+        pass
+
+    def _create(self, *args, **options):
+        item = len(self.items) + 1
+        self.items[item] = options
+        return item
+    create_oval = create_arc = create_image = _create
+
+    def itemconfig(self, item, **options):
+        self.items[item].update(options)
+
+    def delete(self, *items):
+        for item in items:
+            del self.items[item]
+
+    def after_idle(self, callback, *args):
+        self.idle.append((callback, args))
+
+    def run_idle(self):
+        idle, self.idle = self.idle, []
+        for callback, args in idle:
+            callback(*args)
+
+
+class StubLabel:
+    def config(self, **options):
+        pass
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def frame_costs(renderer):
+    """(seconds per cold frame, seconds per warm frame, frames compared)"""
+    steps = range(renderer.steps + 1)
+    started = time.perf_counter()
+    for step in steps:
+        renderer.frame("work", step)
+    cold = (time.perf_counter() - started) / len(steps)
+
+    recent = steps[-len(renderer):]
+    started = time.perf_counter()
+    for _ in range(10):
+        for step in recent:
+            renderer.frame("work", step)
+    warm = (time.perf_counter() - started) / (10 * len(recent))
+    return cold, warm, len(recent)
+
+
+def tick_costs(renderer):
+    """Seconds per tick, and how many frames had to be drawn during a tick"""
+    canvas = StubCanvas()
+    ring = RingCanvas(canvas, renderer.size, renderer.thickness)
+    ring.use_renderer(renderer)
+    view = TimerViewModel(StubLabel(), StubLabel(), None, ring=ring)
+    timings = []
+    drawn_in_tick = 0
+    for mode, total in INTERVALS:
+        for time_left in range(total, -1, -1):
+            misses = renderer.misses
+            started = time.perf_counter()
+            view.render(time_left, mode, total)
+            timings.append(time.perf_counter() - started)
+            drawn_in_tick += renderer.misses - misses
+            assert renderer.cached_bytes <= renderer.capacity, "the cache outgrew its budget"
+            canvas.run_idle()  # the main loop is idle until the next tick
+    return timings, drawn_in_tick
+
+
+def photo_cost(renderer):
+    """Seconds to turn a frame into a Tk image, or None without a display"""
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+        root = tk.Tk()
+    except Exception:
+        return None
+    try:
+        image = renderer.draw("work", renderer.steps // 3)
+        started = time.perf_counter()
+        for _ in range(50):
+            ImageTk.PhotoImage(image)
+        return (time.perf_counter() - started) / 50
+    finally:
+        root.destroy()
+
+
+def main(size=SIZE):
+    try:
+        from pomodoro.ring import RingRenderer
+        renderer = RingRenderer(size, THICKNESS)
+    except ImportError:
+        print("skipped (Pillow is not installed)")
+        return 0
+
+    cold, warm, compared = frame_costs(renderer)
+    print(f"{size} px ring, {renderer.steps} steps, cache of {renderer.capacity // 2 ** 20} MB "
+          f"({renderer.capacity // renderer.frame_bytes} frames)")
+    print(f"  cold frame: {cold * 1000:.2f} ms; warm frame: {warm * 1e6:.2f} us "
+          f"(last {compared} frames again)")
+
+    renderer = RingRenderer(size, THICKNESS)
+    timings, drawn_in_tick = tick_costs(renderer)
+    p99 = percentile(timings, 0.99)
+    print(f"  {len(timings)} ticks over {len(INTERVALS)} intervals: median {statistics.median(timings) * 1e6:.1f} us, "
+          f"p99 {p99 * 1e6:.1f} us, max {max(timings) * 1000:.2f} ms; "
+          f"{renderer.misses} frames drawn, {drawn_in_tick} of them during a tick")
+    print(f"  drawing a frame on every tick instead: {cold * len(timings):.1f} s of drawing "
+          f"vs {sum(timings):.2f} s in ticks")
+
+    photo = photo_cost(renderer)
+    if photo is None:
+        print("  Tk image conversion: skipped (no display)")
+    else:
+        print(f"  Tk image conversion: {photo * 1000:.2f} ms per frame (paid once per frame drawn)")
+
+    status = "ok" if p99 <= TICK_LIMIT else "TOO SLOW"
+    print(f"  p99 tick {p99 * 1e6:.1f} us (limit {TICK_LIMIT * 1e6:.0f} us) {status}")
+    return 0 if p99 <= TICK_LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
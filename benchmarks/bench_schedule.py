@@ -0,0 +1,88 @@
+"""Compile and query cost of IntervalSchedule for a day and a month.
+
+For each horizon: time to compile the plan, the cost of point-in-time
+(at), next-long-break and "work blocks before t" queries (checked against
+a step-by-step simulation), and the cost of the incremental update after
+a pause compared with compiling from scratch.
+
+Usage: python benchmarks/bench_schedule.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import PomodoroSession
+from pomodoro.schedule import IntervalSchedule
+from pomodoro.timer_core import ManualClock
+
+SETTINGS = {
+    "work_time": 25,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "warning_time": 1,
+}
+
+START = 1700000000.0
+
+
+def simulate_count(session_settings, begin, end):
+    """Step through every interval, the way move_to_next_interval would"""
+    session = PomodoroSession(session_settings, clock=ManualClock())
+    t = START
+    count = 0
+    while t < end:
+        length = session.seconds_for(session.current_mode)
+        if session.current_mode == "work" and t >= begin and t + length <= end:
+            count += 1
+        t += length
+        session.move_to_next_interval()
+    return count
+
+
+def timed(function, repeat):
+    began = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - began) / repeat, result
+
+
+def bench(label, horizon):
+    compile_time, schedule = timed(lambda: IntervalSchedule.compile(SETTINGS, START, horizon), 20)
+    print(f"{label}: {len(schedule)} intervals, compiled in {compile_time * 1000:.3f} ms")
+
+    rng = random.Random(1)
+    points = [START + rng.random() * horizon for _ in range(10000)]
+    began = time.perf_counter()
+    for t in points:
+        schedule.at(t)
+        schedule.next_start("long_break", t)
+    query = (time.perf_counter() - began) / len(points)
+    print(f"  at() + next_start(): {query * 1e6:.2f} us per query pair")
+
+    deadline = START + horizon * 0.75
+    count_time, count = timed(lambda: schedule.count_between(START, deadline), 10000)
+    simulate_time, expected = timed(lambda: simulate_count(SETTINGS, START, deadline), 3)
+    assert count == expected, (count, expected)
+    print(f"  work blocks before t: {count} in {count_time * 1e6:.2f} us (simulation: {simulate_time * 1000:.2f} ms)")
+
+    # Pause half-way through the first interval for ten minutes, then resume
+    clock = ManualClock(START)
+    session = PomodoroSession(SETTINGS, clock=clock)
+    session.start()
+    clock.advance(600)
+    session.pause()
+    clock.advance(600)
+    session.start()
+    update_time, changed = timed(lambda: (schedule.update(session, clock()), schedule.update(session, clock())), 1)
+    assert changed == (True, False)
+    assert schedule.at(clock() + 1).end == clock() + session.timer.remaining_exact()
+    print(f"  update after a pause: {update_time * 1000:.3f} ms (re-check when unchanged is a no-op)")
+
+
+if __name__ == "__main__":
+    bench("24 hours", 24 * 3600)
+    bench("30 days", 30 * 24 * 3600)
@@ -0,0 +1,91 @@
+"""Memory-per-session and tick-dispatch benchmark for SessionScheduler.
+
+* memory: tracemalloc growth while creating and starting N sessions
+* virtual dispatch: cost of one simulated second of ticks for N sessions
+  whose wakeups are spread across the second, on a ManualClock
+* real dispatch: the worker thread driving N sessions for a few seconds,
+  reporting how late ticks run against their wakeup time
+
+Usage: python benchmarks/bench_scheduler.py [max_sessions] [real_seconds]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import PomodoroSession
+from pomodoro.scheduler import SessionScheduler
+from pomodoro.timer_core import ManualClock
+
+SETTINGS = {
+    "work_time": 25,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "warning_time": 1,
+}
+
+
+def start_sessions(scheduler, clock, count):
+    """Start count sessions with their wakeups spread over one second"""
+    sessions = []
+    for index in range(count):
+        session = PomodoroSession(SETTINGS, clock=clock)
+        scheduler.add(session)
+        if isinstance(clock, ManualClock):
+            clock.now = index / count
+        session.start()
+        sessions.append(session)
+    return sessions
+
+
+def memory_per_session(count):
+    clock = ManualClock()
+    scheduler = SessionScheduler(clock=clock)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = start_sessions(scheduler, clock, count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"Memory: {(after - before) / len(sessions):.0f} bytes per running session ({count} sessions)")
+
+
+def virtual_dispatch(count, seconds=10):
+    clock = ManualClock()
+    scheduler = SessionScheduler(clock=clock)
+    start_sessions(scheduler, clock, count)
+    clock.now = 1.0
+    scheduler.run_pending()  # the immediate first ticks
+
+    started = time.perf_counter()
+    for _ in range(seconds):
+        clock.advance(1.0)
+        scheduler.run_pending()
+    elapsed = time.perf_counter() - started
+    per_tick = elapsed / (count * seconds) * 1e6
+    print(f"Virtual dispatch: {count:>6} sessions, {elapsed / seconds * 1000:8.2f} ms per second of ticks, "
+          f"{per_tick:.2f} us per tick")
+
+
+def real_dispatch(count, seconds):
+    scheduler = SessionScheduler()
+    scheduler.start()
+    start_sessions(scheduler, scheduler.clock, count)
+    time.sleep(seconds)
+    scheduler.stop()
+    mean = scheduler.total_lateness / max(1, scheduler.dispatched)
+    print(f"Real dispatch: {count} sessions for {seconds} s, {scheduler.dispatched} ticks, "
+          f"mean lateness {mean * 1000:.2f} ms, max {scheduler.max_lateness * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    max_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    real_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    memory_per_session(max_sessions)
+    count = 100
+    while count <= max_sessions:
+        virtual_dispatch(count)
+        count *= 10
+    real_dispatch(max_sessions, real_seconds)
@@ -0,0 +1,69 @@
+"""Per-wakeup settings reads, and loading damaged or old settings files.
+
+Times what the session does with its settings on every wakeup (interval
+length, warning threshold, cycles before the long break) with the old
+string-keyed dict arithmetic against the cached Settings values. Then
+loads an unversioned file holding bad values and checks that it is
+migrated and that the bad values fell back to their defaults.
+
+Usage: python benchmarks/bench_settings.py [reads]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import MODE_SETTINGS
+from pomodoro.settings import DEFAULT_SETTINGS, SETTINGS_VERSION, Settings
+
+READS = 1_000_000
+
+
+def dict_reads(settings, reads):
+    started = time.perf_counter()
+    for _ in range(reads):
+        settings[MODE_SETTINGS["work"]] * 60
+        settings["warning_time"] * 60
+        settings["cycles_before_long_break"]
+    return time.perf_counter() - started
+
+
+def settings_reads(settings, reads):
+    started = time.perf_counter()
+    for _ in range(reads):
+        settings.mode_seconds["work"]
+        settings.warning_seconds
+        settings.cycles_before_long_break
+    return time.perf_counter() - started
+
+
+def main(reads=READS):
+    old = dict_reads(dict(DEFAULT_SETTINGS), reads)
+    new = settings_reads(Settings(), reads)
+    print(f"{reads} wakeups' worth of settings reads")
+    print(f"  dict lookups: {old * 1e9 / reads:6.1f} ns per wakeup")
+    print(f"      Settings: {new * 1e9 / reads:6.1f} ns per wakeup")
+
+    # An unversioned file, as written before profiles, with two bad values
+    damaged = dict(DEFAULT_SETTINGS, work_time=40, warning_time="soon", sound_enabled="yes")
+    settings = Settings.from_json(damaged)
+    assert settings.to_json()["version"] == SETTINGS_VERSION
+    assert settings.work_time == 40 and settings.seconds_for("work") == 2400
+    assert settings.warning_time == DEFAULT_SETTINGS["warning_time"]
+    assert settings.sound_enabled == DEFAULT_SETTINGS["sound_enabled"]
+
+    # Switching profiles happens in memory and updates the cached values
+    started = time.perf_counter()
+    for profile in ("deep work", "light day", "default") * 1000:
+        settings.use_profile(profile)
+        settings.seconds_for("work")
+    elapsed = (time.perf_counter() - started) / 3000
+    assert settings.seconds_for("work") == 2400
+    print(f"  profile switch: {elapsed * 1e6:.1f} us")
+    print("  damaged unversioned file: migrated, bad values replaced by defaults")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
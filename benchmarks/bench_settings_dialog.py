@@ -0,0 +1,80 @@
+"""Open/close latency of the settings dialog over repeated openings.
+
+Opens and closes the settings dialog ROUNDS times, timing each open until
+the dialog has been drawn. It does this twice: once rebuilding the dialog
+every time (as open_settings used to, by throwing the built one away), and
+once reusing it. It also checks that reopening creates no new widgets. Needs
+a display; it is skipped without one.
+
+Usage: python benchmarks/bench_settings_dialog.py [rounds]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROUNDS = 50
+
+
+def widget_count(widget):
+    return 1 + sum(widget_count(child) for child in widget.winfo_children())
+
+
+def open_close(app, root, rounds, rebuild):
+    opens, closes = [], []
+    for _ in range(rounds):
+        if rebuild and app.settings_window is not None:
+            app.settings_window.destroy()
+            app.settings_window = None
+        started = time.perf_counter()
+        app.open_settings()
+        root.update()
+        opens.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        app.close_settings()
+        root.update()
+        closes.append(time.perf_counter() - started)
+    return opens, closes
+
+
+def report(label, opens, closes):
+    opens.sort()
+    print(f"  {label:>8}: open median {statistics.median(opens) * 1000:6.2f} ms, "
+          f"p95 {opens[int(len(opens) * 0.95) - 1] * 1000:6.2f} ms, max {opens[-1] * 1000:6.2f} ms; "
+          f"close median {statistics.median(closes) * 1000:5.2f} ms")
+
+
+def main(rounds=ROUNDS):
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        print("settings dialog: skipped (no display)")
+        return 0
+
+    import tkinter as tk
+    import app
+
+    root = tk.Tk()
+    window = app.PomodoroTimer(root)
+    root.update()
+    try:
+        print(f"{rounds} openings of the settings dialog")
+        report("rebuild", *open_close(window, root, rounds, rebuild=True))
+
+        window.settings_window.destroy()
+        window.settings_window = None
+        window.open_settings()
+        window.close_settings()
+        root.update()
+        widgets = widget_count(root)
+        report("reuse", *open_close(window, root, rounds, rebuild=False))
+        assert widget_count(root) == widgets, "reopening the dialog created widgets"
+        print("  reopening created no new widgets")
+    finally:
+        window.on_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
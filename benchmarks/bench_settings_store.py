@@ -0,0 +1,76 @@
+"""Write-count and caller-blocking benchmark for SettingsStore.
+
+Fires a burst of settings changes (as rapid clicks on the quick-interval
+buttons or the settings dialog would) and compares the old synchronous
+json.dump against the write-behind store: how long each save blocks the
+caller and how many files actually get written.
+
+Usage: python benchmarks/bench_settings_store.py [changes]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.persistence import SettingsStore
+
+SETTINGS = {
+    "work_time": 25,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "sound_enabled": True,
+    "notification_enabled": True,
+    "warning_time": 1,
+    "theme": "dark",
+    "completed_sessions": 0,
+}
+
+
+def report(name, blocked, writes):
+    blocked_us = sorted(value * 1e6 for value in blocked)
+    print(f"{name:>13}: {len(blocked)} saves, {writes} writes, blocking mean {statistics.mean(blocked_us):.1f} us, "
+          f"max {blocked_us[-1]:.1f} us, total {sum(blocked_us) / 1000:.1f} ms")
+
+
+def synchronous(path, changes):
+    settings = dict(SETTINGS)
+    blocked = []
+    for index in range(changes):
+        settings["work_time"] = 15 + index % 16
+        began = time.perf_counter()
+        with open(path, "w") as f:
+            json.dump(settings, f)
+        blocked.append(time.perf_counter() - began)
+    report("synchronous", blocked, changes)
+
+
+def write_behind(path, changes):
+    settings = dict(SETTINGS)
+    store = SettingsStore(path, delay=0.05)
+    blocked = []
+    for index in range(changes):
+        settings["work_time"] = 15 + index % 16
+        began = time.perf_counter()
+        store.save(settings)
+        blocked.append(time.perf_counter() - began)
+        time.sleep(0.001)  # changes arrive about a millisecond apart
+    began = time.perf_counter()
+    store.close()
+    flush_time = time.perf_counter() - began
+    report("write-behind", blocked, store.writes)
+    with open(path) as f:
+        assert json.load(f) == settings, "last change was not persisted"
+    print(f"{'':>13}  final flush on exit took {flush_time * 1000:.1f} ms and persisted the last change")
+
+
+if __name__ == "__main__":
+    changes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "settings.json")
+        synchronous(path, changes)
+        write_behind(path, changes)
@@ -0,0 +1,72 @@
+"""Simulated days per second, in one process and fanned out over a pool.
+
+Times one policy for DAYS days in this process, then a sweep of a policy
+grid run serially and through sweep()'s process pool. Checks that the same
+seed gives the same numbers either way, and that behaviour read back from
+a simulated history roughly matches the behaviour that produced it. Fails
+if one process manages fewer than LIMIT days a second.
+
+Usage: python benchmarks/bench_simulate.py [days]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import IntervalRecord
+from pomodoro.simulate import Behaviour, Simulation, behaviour_from_history, grid, sweep
+
+DAYS = 2000
+LIMIT = 1000  # simulated days per second, per process
+
+
+def recorded_history(behaviour, days):
+    """IntervalRecords a simulated user leaves behind, as the app would store them"""
+    simulation = Simulation({}, behaviour, seed=7)
+    records = []
+    listener = simulation.session.listener
+
+    def record(session, event, data):
+        listener(session, event, data)
+        if data is not None:
+            records.append(IntervalRecord(*data))
+    simulation.session.listener = record
+    simulation.run(days)
+    return records
+
+
+def main(days=DAYS):
+    started = time.perf_counter()
+    Simulation({}, Behaviour()).run(days)
+    rate = days / (time.perf_counter() - started)
+    print(f"one policy, {days} days: {rate:,.0f} days/s in one process")
+
+    policies = list(grid(work_time=[15, 20, 25, 30, 45, 50], cycles_before_long_break=[2, 3, 4, 5]))
+    sweep_days = days // 10
+    started = time.perf_counter()
+    serial = sweep(policies, days=sweep_days, processes=1)
+    serial_time = time.perf_counter() - started
+    started = time.perf_counter()
+    pooled = sweep(policies, days=sweep_days)
+    pooled_time = time.perf_counter() - started
+    assert serial == pooled, "the pool gave different results"
+    total = len(policies) * sweep_days
+    print(f"sweep of {len(policies)} policies x {sweep_days} days: serial {total / serial_time:,.0f} days/s, "
+          f"pool of {os.cpu_count()} {total / pooled_time:,.0f} days/s (same results)")
+
+    # Replaying recorded behaviour: the rates read back should be close to the ones used
+    used = Behaviour(reset_rate=0.1, skip_break_rate=0.2, pause_rate=0.3, attention=10_000)
+    found = behaviour_from_history(recorded_history(used, 200))
+    print(f"rates read back from a simulated history: reset {found.reset_rate:.2f} (used {used.reset_rate}), "
+          f"break skips {found.skip_break_rate:.2f}, pauses {found.pause_rate:.2f} (used {used.pause_rate})")
+    assert abs(found.reset_rate - used.reset_rate) < 0.03
+    assert abs(found.pause_rate - used.pause_rate) < 0.05
+
+    status = "ok" if rate >= LIMIT else "TOO SLOW"
+    print(f"  {rate:,.0f} days/s per process (limit {LIMIT:,}) {status}")
+    return 0 if rate >= LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
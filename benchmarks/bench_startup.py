@@ -0,0 +1,105 @@
+"""Startup-time budget: module import cost and time to first frame.
+
+* import: runs `python -X importtime -c "import app"` in a fresh
+  interpreter and reports the cumulative import time of app (and the
+  heaviest imports under it)
+* first frame: in a fresh interpreter, times import + building the window
+  until the first root.update() has drawn it (needs a display; skipped
+  without one)
+
+Exits non-zero when either number exceeds its budget, so it can guard
+against startup regressions.
+
+Usage: python benchmarks/bench_startup.py [import_budget_ms] [first_frame_budget_ms]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_MS = 60
+FIRST_FRAME_BUDGET_MS = 400
+RUNS = 5
+
+FIRST_FRAME_SCRIPT = """
+import time
+began = time.perf_counter()
+import tkinter as tk
+import app
+root = tk.Tk()
+window = app.PomodoroTimer(root)
+root.update()
+print((time.perf_counter() - began) * 1000)
+window.on_close()
+"""
+
+
+def import_time():
+    """Best-of-N cumulative import time of app in ms, plus its heaviest imports"""
+    best = None
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        # Nesting is shown by indentation; collect app's direct imports
+        children = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative_us, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            if depth == 0:
+                if name.strip() == "app":
+                    total = int(cumulative_us)
+                    break
+                children = []
+            elif depth == 1:
+                children.append((int(cumulative_us), name.strip()))
+        if best is None or total < best[0]:
+            best = (total, children)
+    total, children = best
+    return total / 1000, sorted(children, reverse=True)[:5]
+
+
+def first_frame_time():
+    """Best-of-N time from first import to first drawn frame in ms, or None without a display"""
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        return None
+    best = None
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-c", FIRST_FRAME_SCRIPT],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        value = float(result.stdout.strip().splitlines()[-1])
+        best = value if best is None else min(best, value)
+    return best
+
+
+def main(import_budget, first_frame_budget):
+    failed = False
+
+    total, heaviest = import_time()
+    status = "ok" if total <= import_budget else "OVER BUDGET"
+    failed |= total > import_budget
+    print(f"import app: {total:.1f} ms (budget {import_budget} ms) {status}")
+    for cumulative, name in heaviest:
+        print(f"  {cumulative / 1000:6.1f} ms  {name}")
+
+    frame = first_frame_time()
+    if frame is None:
+        print("first frame: skipped (no display)")
+    else:
+        status = "ok" if frame <= first_frame_budget else "OVER BUDGET"
+        failed |= frame > first_frame_budget
+        print(f"first frame: {frame:.1f} ms (budget {first_frame_budget} ms) {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    import_budget = float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET_MS
+    first_frame_budget = float(sys.argv[2]) if len(sys.argv) > 2 else FIRST_FRAME_BUDGET_MS
+    sys.exit(main(import_budget, first_frame_budget))
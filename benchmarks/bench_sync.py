@@ -0,0 +1,282 @@
+"""Convergence and merge cost of multi-device session syncing.
+
+Starts DEVICES processes sharing one sync directory. Each records
+intervals and counts sessions while merging the others at random moments,
+all at the same time. After a final round of merges every device must
+have the same counter value (the total counted) and the same set of
+intervals, and merging again must change nothing. A second phase has one
+device reset the counter while the others keep counting, and checks they
+all converge on the sessions counted after the reset. In a third, every
+device resets at once after seeing the same count; none may ever see a
+negative count, and all must converge on zero.
+
+A log with an unreadable line must be merged up to that line and no
+further, so the rest is picked up once the line is whole.
+
+Then times one device merging another's month of history (MONTH
+intervals), and a merge with nothing new, against LIMIT, and counting a
+session (the state file is written behind, so it mustn't wait for the
+disk) against COUNT_LIMIT, also while another thread merges a BIG_LOG
+-interval log.
+
+Usage: python benchmarks/bench_sync.py [devices] [rounds]
+"""
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_export import synthetic_records
+
+from pomodoro.sync import DeviceSync
+
+DEVICES = 4
+ROUNDS = 200
+MONTH = 16 * 30  # intervals a heavy user finishes in a month
+LIMIT = 0.050  # seconds to merge a month of another device's history
+COUNT_LIMIT = 0.0001  # seconds per count_session call (a synchronous fsync takes longer)
+BIG_LOG = 200_000  # intervals in the log merged while counting
+BLOCKED_LIMIT = 0.050  # longest count_session while that merge runs
+
+
+def device_process(directory, device, rounds, barrier, results):
+    sync = DeviceSync(directory, device)
+    rng = random.Random(device)
+    seen = set()
+    start = 1_700_000_000 + int(device[-1]) * 0.001  # distinct started_at per device
+
+    def merge():
+        seen.update(sync.merge())
+
+    def wait():
+        sync.flush()  # the others read our state file next
+        barrier.wait()
+
+    # Phase 1: everyone counts and merges at once
+    counted = 0
+    for index, record in enumerate(synthetic_records(rounds, start)):
+        sync.record(record)
+        seen.add(record)
+        if record.mode == "work" and record.outcome == "completed":
+            sync.count_session()
+            counted += 1
+        if rng.random() < 0.2:
+            merge()
+    wait()
+    merge()  # everyone's final counters and logs are written
+    wait()
+    merge()  # and now everyone has folded in everyone else's
+    wait()
+    phase1 = (counted, sync.sessions, frozenset(seen), sync.merge(), sync.sessions)
+    wait()
+
+    # Phase 2: the first device resets while the others keep counting
+    after_reset = 0
+    if device.endswith("0"):
+        sync.reset_sessions()
+    else:
+        for _ in range(rounds // 10):
+            sync.count_session()
+            after_reset += 1
+            if rng.random() < 0.3:
+                merge()
+    wait()
+    merge()
+    wait()
+    merge()
+    wait()
+    phase2 = (after_reset, sync.sessions)
+
+    # Phase 3: everyone counts, merges, then resets at the same time
+    for _ in range(5):
+        sync.count_session()
+    wait()
+    merge()
+    wait()
+    sync.reset_sessions()
+    lowest = sync.sessions
+    wait()
+    for _ in range(2):
+        merge()
+        lowest = min(lowest, sync.sessions)
+        wait()
+    sync.close()
+    results.put((device, phase1, phase2, (lowest, sync.sessions)))
+
+
+def check_convergence(devices, rounds):
+    with tempfile.TemporaryDirectory() as directory:
+        barrier = multiprocessing.Barrier(devices)
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=device_process, args=(directory, f"device{index}", rounds, barrier, results))
+            for index in range(devices)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        outcome = [results.get(timeout=120) for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+    total = sum(phase1[0] for _, phase1, _, _ in outcome)
+    intervals = {phase1[2] for _, phase1, _, _ in outcome}
+    print(f"{devices} devices x {rounds} intervals, merging concurrently ({elapsed:.2f} s)")
+    for device, (counted, value, seen, remerged, revalue), (after_reset, final), _ in sorted(outcome):
+        print(f"  {device}: counted {counted:>4}, sees {value:>4} sessions and {len(seen)} intervals; "
+              f"after reset {final}")
+        assert value == total, f"{device} sees {value} sessions, {total} were counted"
+        assert not remerged and revalue == value, f"merging again changed {device}"
+    assert len(intervals) == 1, "devices ended up with different histories"
+    assert len(next(iter(intervals))) == devices * rounds, "intervals went missing"
+
+    counted_after = sum(after_reset for _, _, (after_reset, _), _ in outcome)
+    finals = {final for _, _, (_, final), _ in outcome}
+    assert finals == {counted_after}, f"after the reset devices see {finals}, {counted_after} were counted"
+    print(f"  all converge on {total} sessions, then {counted_after} after the reset")
+
+    lowest = min(lowest for _, _, _, (lowest, _) in outcome)
+    finals = {final for _, _, _, (_, final) in outcome}
+    assert lowest >= 0, f"a device saw {lowest} sessions after resetting at the same time as the others"
+    assert finals == {0}, f"after resetting at the same time devices see {finals}"
+    print(f"  {devices} resets at the same time: all converge on 0, none ever below 0")
+
+
+def check_concurrent_reset():
+    """Two devices reset at once after seeing the same sessions"""
+    with tempfile.TemporaryDirectory() as directory:
+        laptop = DeviceSync(directory, "laptop")
+        desktop = DeviceSync(directory, "desktop")
+        for _ in range(5):
+            laptop.count_session()
+        laptop.flush()
+        desktop.merge()
+        assert desktop.sessions == 5
+        laptop.reset_sessions()
+        desktop.reset_sessions()
+        laptop.flush()
+        desktop.flush()
+        laptop.merge()
+        desktop.merge()
+        assert (laptop.sessions, desktop.sessions) == (0, 0), \
+            f"concurrent resets left {laptop.sessions} and {desktop.sessions} sessions"
+        laptop.close()
+        desktop.close()
+
+
+def check_unreadable_line():
+    """A bad line stops the merge there; nothing after it is lost"""
+    with tempfile.TemporaryDirectory() as directory:
+        laptop = DeviceSync(directory, "laptop")
+        for record in synthetic_records(3, 1_700_000_000):
+            laptop.record(record)
+        with open(laptop.log_path, "rb") as f:
+            whole = f.read()
+        lines = whole.split(b"\n")
+        with open(laptop.log_path, "wb") as f:
+            f.write(lines[0] + b"\n" + lines[1][:10] + b"\n" + lines[2] + b"\n")  # caught mid-sync
+
+        desktop = DeviceSync(directory, "desktop")
+        assert len(desktop.merge()) == 1, "merged past an unreadable line"
+        assert desktop.offsets["laptop"] == len(lines[0]) + 1, desktop.offsets
+        assert desktop.merge() == [] and desktop.offsets["laptop"] == len(lines[0]) + 1
+
+        with open(laptop.log_path, "wb") as f:
+            f.write(whole)  # the sync catches up
+        assert len(desktop.merge()) == 2, "the intervals after an unreadable line were lost"
+        laptop.close()
+        desktop.close()
+    print("an unreadable line holds the merge there, and the lines after it come in once it is whole")
+
+
+def time_merge(month):
+    with tempfile.TemporaryDirectory() as directory:
+        laptop = DeviceSync(directory, "laptop")
+        for record in synthetic_records(month, 1_700_000_000):
+            laptop.record(record)
+            if record.mode == "work":
+                laptop.count_session()
+        laptop.flush()
+
+        desktop = DeviceSync(directory, "desktop")
+        started = time.perf_counter()
+        merged = desktop.merge()
+        first = time.perf_counter() - started
+        assert len(merged) == month and desktop.sessions == laptop.sessions
+
+        idle = []
+        for _ in range(100):
+            started = time.perf_counter()
+            assert desktop.merge() == []
+            idle.append(time.perf_counter() - started)
+        laptop.close()
+        desktop.close()
+    print(f"merging a month of another device's history ({month} intervals): {first * 1000:.2f} ms; "
+          f"nothing new: {statistics.median(idle) * 1000:.3f} ms")
+    return first
+
+
+def time_count(sessions=1000):
+    """Seconds per count_session, with the state written behind"""
+    with tempfile.TemporaryDirectory() as directory:
+        sync = DeviceSync(directory, "laptop")
+        sync.sessions  # load the state before timing
+        started = time.perf_counter()
+        for _ in range(sessions):
+            sync.count_session()
+        elapsed = (time.perf_counter() - started) / sessions
+        sync.close()
+        assert DeviceSync(directory, "laptop").sessions == sessions, "counted sessions weren't saved"
+    print(f"counting a session: {elapsed * 1e6:.1f} us (limit {COUNT_LIMIT * 1e6:.0f} us)")
+    return elapsed
+
+
+def blocked_while_merging(count=BIG_LOG):
+    """Longest count_session while another thread merges a big log"""
+    import threading
+    with tempfile.TemporaryDirectory() as directory:
+        laptop = DeviceSync(directory, "laptop")
+        with open(laptop.log_path, "w") as f:
+            for record in synthetic_records(count, 1_700_000_000):
+                f.write(json.dumps(record._asdict(), separators=(",", ":")) + "\n")
+        desktop = DeviceSync(directory, "desktop")
+        desktop.sessions  # load the state before timing
+        merged = []
+        merger = threading.Thread(target=lambda: merged.extend(desktop.merge()))
+        merger.start()
+        worst = 0.0
+        while merger.is_alive():
+            started = time.perf_counter()
+            desktop.count_session()
+            worst = max(worst, time.perf_counter() - started)
+            time.sleep(0.001)
+        merger.join()
+        assert len(merged) == count
+        laptop.close()
+        desktop.close()
+    print(f"counting a session while {count} intervals are merged: at most {worst * 1000:.2f} ms "
+          f"(limit {BLOCKED_LIMIT * 1000:.0f} ms)")
+    return worst
+
+
+def main(devices=DEVICES, rounds=ROUNDS):
+    check_concurrent_reset()
+    check_unreadable_line()
+    check_convergence(devices, rounds)
+    first = time_merge(MONTH)
+    status = "ok" if first <= LIMIT else "TOO SLOW"
+    print(f"  limit {LIMIT * 1000:.0f} ms {status}")
+    count = time_count()
+    blocked = blocked_while_merging()
+    return 0 if first <= LIMIT and count <= COUNT_LIMIT and blocked <= BLOCKED_LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,106 @@
+"""Autocomplete latency for task names at tens of thousands of tags.
+
+Builds a TaskIndex from USES_PER_TAG uses of each of TAGS names (many
+sharing long prefixes, as "client 12: ..." ones do), then types TYPED names
+character by character, timing suggest() per keystroke against filtering
+and sorting every name in a Python loop. Every suggestion list is checked
+against the loop's answer, also after a run of new uses has been added
+incrementally. Fails if the p99 keystroke takes longer than LIMIT.
+
+Usage: python benchmarks/bench_tasks.py [tags]
+"""
+import heapq
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.tasks import LIMIT as SUGGESTIONS, TaskIndex
+
+TAGS = 50_000
+USES_PER_TAG = 4
+TYPED = 300
+ADDED = 5000
+LIMIT = 0.001  # seconds per keystroke (p99)
+
+WORDS = ("report", "review", "design", "fix", "planning", "email", "research", "refactor", "Docs", "call")
+
+
+def tag_names(count, rng):
+    names = set()
+    while len(names) < count:
+        client = rng.randrange(200)
+        names.add(f"Client {client}: {rng.choice(WORDS)} {rng.choice(WORDS)} #{rng.randrange(10_000)}")
+    return sorted(names)
+
+
+def naive(index, prefix):
+    """What a loop over every name finds"""
+    prefix = prefix.lstrip().casefold()
+    matches = [key for key in index.names if key.startswith(prefix)]
+    return [index.names[key] for key in heapq.nlargest(SUGGESTIONS, matches, key=index._rank)]
+
+
+def type_names(index, names, check):
+    """Seconds per keystroke for the index and for the loop"""
+    fast, slow = [], []
+    for name in names:
+        for end in range(len(name) + 1):
+            prefix = name[:end]
+            started = time.perf_counter()
+            suggestions = index.suggest(prefix)
+            fast.append(time.perf_counter() - started)
+            if check:
+                started = time.perf_counter()
+                expected = naive(index, prefix)
+                slow.append(time.perf_counter() - started)
+                assert suggestions == expected, (prefix, suggestions, expected)
+    return fast, slow
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(tags=TAGS):
+    rng = random.Random(18)
+    names = tag_names(tags, rng)
+    now = time.time()
+    uses = sorted(
+        ((rng.choice(names), now - rng.expovariate(1 / (90 * 86400))) for _ in range(tags * USES_PER_TAG)),
+        key=lambda use: use[1],
+    )
+
+    started = time.perf_counter()
+    index = TaskIndex.from_uses(uses, reference=now)
+    built = time.perf_counter() - started
+    print(f"{len(index)} tags from {len(uses)} uses, built in {built * 1000:.0f} ms")
+
+    typed = rng.sample(names, TYPED)
+    fast, slow = type_names(index, typed[:30], check=True)
+    print(f"  {len(fast)} keystrokes checked against a loop over every name: "
+          f"index median {statistics.median(fast) * 1e6:.1f} us, loop median {statistics.median(slow) * 1000:.2f} ms")
+
+    # New uses (some of new names) while the app runs, then check again
+    started = time.perf_counter()
+    for step in range(ADDED):
+        name = rng.choice(names) if step % 4 else f"client {rng.randrange(200)}: new {step}"
+        index.add(name, now + step)
+    per_add = (time.perf_counter() - started) / ADDED
+    type_names(index, rng.sample(names, 30), check=True)
+    print(f"  add() per use: {per_add * 1e6:.1f} us; suggestions still match the loop")
+
+    fast, _ = type_names(index, typed, check=False)
+    p99 = percentile(fast, 0.99)
+    status = "ok" if p99 <= LIMIT else "TOO SLOW"
+    print(f"  {len(fast)} keystrokes: median {statistics.median(fast) * 1e6:.1f} us, "
+          f"p99 {p99 * 1e6:.1f} us, max {max(fast) * 1e6:.1f} us (limit {LIMIT * 1e6:.0f} us) {status}")
+    return 0 if p99 <= LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,79 @@
+"""Drift and wakeup-jitter benchmark for the deadline-based timer core.
+
+Two parts:
+
+* a simulated day of Pomodoro cycles on a ManualClock, comparing the old
+  "sleep(1) then decrement" loop against the deadline-based loop while each
+  tick also does some slow work (a blocking beep, a slow UI hop, ...)
+* a short real-time run that reports how late each wakeup is against wall
+  time and how far the final deadline lands from where it should
+
+Usage: python benchmarks/bench_timer_drift.py [real_seconds]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.timer_core import ManualClock, TimerCore
+
+DAY_PLAN = [("work", 25 * 60), ("short_break", 5 * 60)] * 3 + [("work", 25 * 60), ("long_break", 15 * 60)]
+SLOW_WORK = 0.05  # seconds of extra work per tick (UI hop, logging, GIL contention)
+
+
+def simulate_legacy(plan, clock):
+    """The original loop: sleep(1) then decrement, extra work adds up"""
+    for _, seconds in plan:
+        time_left = seconds
+        while time_left > 0:
+            clock.advance(SLOW_WORK)
+            clock.advance(1)
+            time_left -= 1
+    return clock()
+
+
+def simulate_deadline(plan, clock):
+    """The deadline loop: sleep until the next visible second"""
+    for _, seconds in plan:
+        timer = TimerCore(seconds, clock=clock)
+        timer.start()
+        while not timer.expired():
+            clock.advance(SLOW_WORK)
+            clock.advance(timer.time_to_next_second())
+    return clock()
+
+
+def simulated_day():
+    planned = sum(seconds for _, seconds in DAY_PLAN) * 4  # four rounds of the plan
+    legacy_end = simulate_legacy(DAY_PLAN * 4, ManualClock())
+    started = time.perf_counter()
+    deadline_end = simulate_deadline(DAY_PLAN * 4, ManualClock())
+    elapsed = time.perf_counter() - started
+    print(f"Simulated day: {planned / 3600:.1f} h of intervals in {elapsed * 1000:.1f} ms")
+    print(f"  legacy loop drift:   {legacy_end - planned:+.1f} s")
+    print(f"  deadline loop drift: {deadline_end - planned:+.3f} s")
+
+
+def real_time(seconds):
+    timer = TimerCore(seconds)
+    wall_start = time.time()
+    timer.start()
+    lateness = []
+    while not timer.expired():
+        delay = timer.time_to_next_second()
+        expected = time.time() + delay
+        time.sleep(delay)
+        lateness.append(time.time() - expected)
+    drift = time.time() - (wall_start + seconds)
+    lateness_ms = [value * 1000 for value in lateness]
+    print(f"Real time: {seconds} s countdown, {len(lateness)} wakeups")
+    print(f"  end drift vs wall time: {drift * 1000:+.2f} ms")
+    print(f"  wakeup lateness: mean {statistics.mean(lateness_ms):.2f} ms, "
+          f"max {max(lateness_ms):.2f} ms, jitter (stdev) {statistics.pstdev(lateness_ms):.2f} ms")
+
+
+if __name__ == "__main__":
+    simulated_day()
+    real_time(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
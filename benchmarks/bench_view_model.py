@@ -0,0 +1,57 @@
+"""Tk calls and cost per tick of the timer display, with stub widgets.
+
+Renders a full 25-minute work interval through TimerViewModel against
+widgets that only count their calls, and compares with what the old
+update_timer_display issued (two config calls and a variable set on
+every tick).
+
+Usage: python benchmarks/bench_view_model.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.view_model import TimerViewModel
+
+
+class CountingWidget:
+    """Stands in for a Tk label or variable, counting calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def config(self, **options):
+        self.calls += 1
+
+    def set(self, value):
+        self.calls += 1
+
+
+def main():
+    widgets = [CountingWidget(), CountingWidget(), CountingWidget()]
+    view = TimerViewModel(*widgets)
+    total = 25 * 60
+
+    view.render(total, "work", total)
+    assert view.last_render_calls == 3, "first render must draw every widget"
+
+    began = time.perf_counter()
+    per_tick = []
+    for time_left in range(total - 1, -1, -1):
+        per_tick.append(view.render(time_left, "work", total))
+    elapsed = time.perf_counter() - began
+
+    ticks = len(per_tick)
+    assert max(per_tick) <= 2, "a tick redraws at most the time and the progress bar"
+    assert view.render(0, "work", total) == 0, "an unchanged state must issue no Tk calls"
+    assert view.render(5 * 60, "short_break", 5 * 60) == 3, "a new interval redraws everything"
+
+    print(f"{ticks} ticks: {sum(per_tick)} Tk calls ({sum(per_tick) / ticks:.2f} per tick, "
+          f"old code: {3 * ticks} / 3.00 per tick)")
+    print(f"render(): {elapsed / ticks * 1e6:.2f} us per tick")
+
+
+if __name__ == "__main__":
+    main()
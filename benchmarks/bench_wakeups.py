@@ -0,0 +1,63 @@
+"""Wakeups per hour of a running timer in each redraw mode.
+
+Runs an hour-long work interval (with a one-minute warning) on a
+ManualClock for each redraw mode and counts how often the scheduler woke
+the session up and how many "tick" events (each a redraw queued
+for the main loop in the app) it emitted. Fails if a mode wakes up more often
+than it should.
+
+Usage: python benchmarks/bench_wakeups.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pomodoro.engine import PomodoroSession
+from pomodoro.scheduler import SessionScheduler
+from pomodoro.timer_core import ManualClock
+
+SETTINGS = {
+    "work_time": 60,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "warning_time": 1,
+}
+
+# Upper bound on wakeups for an hour: redraws + warning + end (+ the first tick)
+EXPECTED_MAX = {"second": 3600 + 3, "minute": 60 + 3, "none": 3}
+
+
+def wakeups_per_hour(redraw):
+    clock = ManualClock()
+    scheduler = SessionScheduler(clock=clock)
+    events = {"tick": 0, "warning": 0, "complete": 0}
+
+    def listener(session, event, data):
+        if event in events:
+            events[event] += 1
+
+    session = PomodoroSession(SETTINGS, clock=clock, listener=listener)
+    scheduler.add(session)
+    session.set_redraw(redraw)
+    session.start()
+    while session.timer_running:
+        clock.now = scheduler.next_due()
+        scheduler.run_pending()
+    assert events["warning"] == 1 and events["complete"] == 1, events
+    return scheduler.dispatched, events["tick"]
+
+
+def main():
+    failed = False
+    for redraw, limit in EXPECTED_MAX.items():
+        wakeups, ticks = wakeups_per_hour(redraw)
+        status = "ok" if wakeups <= limit else "TOO MANY"
+        failed |= wakeups > limit
+        print(f"{redraw:>6}: {wakeups:5d} wakeups/hour, {ticks:5d} UI updates/hour (limit {limit}) {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""Headless regression suite for the timer core and the display update path.
+
+Runs without a display: Tk widgets are the stubs of bench_ring and the
+main loop is bench_actor's StubRoot on a ManualClock, notifications go to
+a RecordingBackend, and files go to a temporary directory. It measures:
+
+* display: PomodoroTimer.update_timer_display per call, through the view
+  model and progress ring (plain arcs on a stub canvas), over a work
+  interval ticked down second by second
+* next_interval: PomodoroSession.move_to_next_interval per call
+* save_settings / load_settings: PomodoroTimer.save_settings (what the
+  caller is blocked for), a save until it is durably on disk, and
+  PomodoroTimer.load_settings, against a settings file with PROFILES
+  profiles
+* day: a simulated DAY_HOURS-hour day of back-to-back intervals on a
+  virtual clock: the session's scheduler ticks it through MainLoopDriver,
+  every event is journalled, ticks redraw the display, warnings and
+  completions queue alerts and each next interval is started shortly
+  after the last one ends; wall time per simulated day
+
+Each number is the best of ROUNDS runs, in seconds; a round runs every
+measurement once, so a stretch where the machine is busy slows one round
+rather than every run of one measurement. They are written to
+a JSON baseline the first time (or with --update); later runs compare
+with it and fail if any number is more than --threshold (a fraction)
+above its baseline. Baselines belong to one machine, so the file isn't
+kept in git.
+
+The bench_*.py scripts next to this one go deeper into each part.
+
+Usage: python benchmarks/suite.py [--update] [--threshold 0.5] [--baseline PATH]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import types
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+
+from app import RING_SIZE, RING_THICKNESS, PomodoroTimer
+from bench_actor import StubRoot
+from bench_ring import StubCanvas, StubLabel
+from pomodoro.engine import PomodoroSession
+from pomodoro.journal import StateJournal
+from pomodoro.mailbox import MainLoopDriver
+from pomodoro.notifications import Notifier, RecordingBackend
+from pomodoro.persistence import SettingsStore
+from pomodoro.ring import RingCanvas
+from pomodoro.scheduler import SessionScheduler
+from pomodoro.settings import Settings
+from pomodoro.sync import DeviceSync
+from pomodoro.timer_core import ManualClock
+from pomodoro.view_model import TimerViewModel
+
+BASELINE = os.path.join(BENCHMARKS, "baseline.json")
+THRESHOLD = 0.5  # how much slower than the baseline still passes
+ROUNDS = 5
+FILE_REPEATS = 4  # single file writes and reads per round, which vary more
+
+INTERVALS = 200_000  # move_to_next_interval calls per run
+PROFILES = 2000  # in the large settings file
+SAVES = 200  # save_settings calls per run
+DAY_HOURS = 16
+START_DELAY = 20  # seconds from an interval's end to starting the next one
+
+
+def stub_window(session):
+    """What update_timer_display needs of a PomodoroTimer, on stub widgets"""
+    ring = RingCanvas(StubCanvas(), RING_SIZE, RING_THICKNESS)
+    return types.SimpleNamespace(session=session, view=TimerViewModel(StubLabel(), StubLabel(), None, ring=ring))
+
+
+def display_cost():
+    """Seconds per update_timer_display over a work interval, second by second"""
+    session = PomodoroSession({})
+    window = stub_window(session)
+    total = session.time_left
+    started = time.perf_counter()
+    for time_left in range(total, -1, -1):
+        session.time_left = time_left
+        PomodoroTimer.update_timer_display(window)
+    return (time.perf_counter() - started) / (total + 1)
+
+
+def next_interval_cost():
+    """Seconds per move_to_next_interval"""
+    session = PomodoroSession({})
+    started = time.perf_counter()
+    for _ in range(INTERVALS):
+        session.move_to_next_interval()
+    return (time.perf_counter() - started) / INTERVALS
+
+
+def large_settings():
+    settings = Settings()
+    for index in range(PROFILES):
+        settings.work_time = 15 + index % 45
+        settings.save_profile(f"profile {index}")
+    settings.use_profile("profile 0")
+    return settings
+
+
+def settings_window(directory, settings):
+    """What save_settings and load_settings need of a PomodoroTimer"""
+    return types.SimpleNamespace(
+        settings=settings,
+        settings_store=SettingsStore(os.path.join(directory, "settings.json")),
+        sync=DeviceSync(os.path.join(directory, "devices")),
+    )
+
+
+def settings_costs(directory):
+    """(seconds per save_settings call, per durable save, per load_settings)"""
+    window = settings_window(directory, large_settings())
+    store = window.settings_store
+
+    def blocking():
+        started = time.perf_counter()
+        for _ in range(SAVES):
+            PomodoroTimer.save_settings(window)
+        elapsed = (time.perf_counter() - started) / SAVES
+        store.flush()
+        return elapsed
+
+    def durable():
+        started = time.perf_counter()
+        PomodoroTimer.save_settings(window)
+        store.flush()
+        return time.perf_counter() - started
+
+    save = blocking()
+    write = min(durable() for _ in range(FILE_REPEATS))
+    store.close()
+
+    loaded = settings_window(directory, Settings())
+
+    def load():
+        started = time.perf_counter()
+        PomodoroTimer.load_settings(loaded)
+        return time.perf_counter() - started
+
+    read = min(load() for _ in range(FILE_REPEATS))
+    loaded.settings_store.close()
+    assert len(loaded.settings.profiles) >= PROFILES, "the settings file lost profiles"
+    assert loaded.settings.profile == "profile 0", "the settings file lost the active profile"
+    return save, write, read
+
+
+def day_cost(directory):
+    """Wall seconds for one simulated day; checks what the day produced"""
+    clock = ManualClock()
+    root = StubRoot(clock)
+    scheduler = SessionScheduler(clock=clock)
+    journal = StateJournal(os.path.join(directory, f"journal-{time.perf_counter_ns()}.log"), wall_clock=clock)
+    backend = RecordingBackend()
+    notifier = Notifier([backend], clock=clock)
+    events = {"start": 0, "tick": 0, "warning": 0, "complete": 0}
+
+    def on_session_event(session, event, data):
+        # As PomodoroTimer.on_session_event does, less the history and dialogs
+        events[event] = events.get(event, 0) + 1
+        if event != "tick":
+            journal.record(event, session.snapshot())
+        if event == "tick":
+            driver.post(PomodoroTimer.update_timer_display, window)
+        elif event == "warning":
+            notifier.notify("Warning", "Interval ending soon", duration=3, sound="warning")
+        elif event == "complete":
+            notifier.notify("Done", f"{data.mode} finished", sound="complete")
+            root.after(START_DELAY * 1000, lambda: driver.post(session.start))
+
+    session = PomodoroSession({}, clock=clock, listener=on_session_event, wall_clock=clock)
+    window = stub_window(session)
+    scheduler.add(session)
+    driver = MainLoopDriver(root.after, root.after_cancel, scheduler)
+    driver.start()
+    driver.post(session.start)
+
+    started = time.perf_counter()
+    end = DAY_HOURS * 3600
+    while clock() < end and root.run_one():
+        pass
+    elapsed = time.perf_counter() - started
+    driver.stop()
+    journal.close()
+    notifier.close()
+
+    # Every second of every interval drawn, every interval warned about and completed
+    running = DAY_HOURS * 3600 - events["complete"] * START_DELAY
+    assert abs(events["tick"] - running) <= 2 * events["start"], f"{events['tick']} ticks in {running} s"
+    assert events["warning"] >= events["complete"] >= 1, events
+    assert events["start"] == events["complete"] + 1, events
+    assert notifier.dropped == 0, "alerts were dropped"
+    return elapsed
+
+
+def measure_round(directory):
+    save, write, read = settings_costs(directory)
+    return {
+        "display.update_timer_display": display_cost(),
+        "session.move_to_next_interval": next_interval_cost(),
+        "settings.save_settings": save,
+        "settings.save_durable": write,
+        "settings.load_settings": read,
+        "day.simulated_day": day_cost(directory),
+    }
+
+
+def measure(rounds=ROUNDS):
+    """{metric: seconds} for this machine, the best of rounds rounds"""
+    results = {}
+    for _ in range(rounds):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, seconds in measure_round(directory).items():
+                results[name] = min(seconds, results.get(name, seconds))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print each metric against its baseline; returns the names that regressed"""
+    regressed = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<32} {seconds * 1e6:12.2f} us  (new)")
+            continue
+        change = seconds / before - 1 if before else 0.0
+        status = "ok"
+        if change > threshold:
+            status = "REGRESSED"
+            regressed.append(name)
+        print(f"  {name:<32} {seconds * 1e6:12.2f} us  baseline {before * 1e6:12.2f} us  {change:+7.1%} {status}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmark and regression suite")
+    parser.add_argument("--update", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="fraction slower than the baseline that fails (default: %(default)s)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = measure()
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if baseline is None:
+        for name, seconds in results.items():
+            print(f"  {name:<32} {seconds * 1e6:12.2f} us")
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            }, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    print(f"against the baseline of {baseline.get('recorded_at', '?')} (fails above {args.threshold:+.0%})")
+    regressed = compare(results, baseline["results"], args.threshold)
+    if regressed:
+        print(f"{len(regressed)} regressed: {', '.join(regressed)}")
+        return 1
+    print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
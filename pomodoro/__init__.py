@@ -0,0 +1 @@
+"""Core (UI-free) pieces of the ADHD-Friendly Pomodoro Timer"""
@@ -0,0 +1,15 @@
+"""Wording of the timer's alerts, shared by every front end"""
+
+
+def completion_alert(finished_mode):
+    """Title and message announcing the end of an interval"""
+    if finished_mode == "work":
+        return "Work session complete!", "Time to take a break! Great job focusing!"
+    return "Break time over!", "Ready to focus again?"
+
+
+def warning_alert(mode, minutes):
+    """Title and message warning that an interval is about to end"""
+    if mode == "work":
+        return "Almost done!", f"{minutes} minute(s) left in work session"
+    return "Break ending soon", f"{minutes} minute(s) left in break"
@@ -0,0 +1,273 @@
+"""Focus statistics over the interval history.
+
+FocusStats answers the dashboard's questions:
+
+* focus minutes per day and an hour-of-day by weekday heatmap
+* the current and longest streak of days with a completed work session
+* how often intervals are completed, skipped or reset
+* average planned versus actual length per mode
+
+It is built once from column arrays of the whole history. With NumPy the
+aggregation is vectorized (bincount/unique over the arrays); without it the
+same sums are computed row by row. After that, add() folds each new
+interval into the running totals in O(1), so the numbers stay current
+without another pass over the history.
+
+The column arrays come from a columnar cache file (see history_io) next to
+the database, which only has to be caught up with the rows added since the
+last time. Reading it is far cheaper than fetching every row from SQLite.
+The cache relies on history only ever being appended to; if the database
+has fewer rows than the cache, the cache is rebuilt.
+"""
+import array
+import datetime
+import threading
+import time
+
+from pomodoro.engine import OUTCOMES
+from pomodoro.history_io import COLUMNS, append_columnar, read_columnar_blocks, write_columnar
+from pomodoro.schedule import MODES
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # same results, computed with plain loops
+
+WORK = MODES.index("work")
+COMPLETED = OUTCOMES.index("completed")
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()  # local days are counted from here
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def _empty_columns():
+    return {name: array.array(typecode) for name, typecode in COLUMNS}
+
+
+def load_columns(store, cache_path, rows=None):
+    """Column arrays (as in history_io.COLUMNS) of every interval in the store
+
+    Reads the cache at cache_path, then fetches only the rows added since
+    and appends them to the cache. rows, if given, stops at that many
+    intervals, for a store that other threads keep adding to.
+    """
+    columns = _empty_columns()
+    try:
+        with open(cache_path, "rb") as f:
+            for block in read_columnar_blocks(f):
+                for name, column in block.items():
+                    columns[name].extend(column)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Rebuilding analytics cache: {e}")
+        columns = _empty_columns()
+
+    store.flush()
+    cached = len(columns["mode"])
+    if cached > len(store):
+        columns, cached = _empty_columns(), 0  # history was replaced
+    if rows is not None and cached > rows:
+        for column in columns.values():
+            del column[rows:]
+        cached = rows
+    new = list(store.records(offset=cached))
+    if rows is not None:
+        del new[rows - cached:]
+    if new or not cached:
+        mode = "r+b" if cached else "wb"
+        with open(cache_path, mode) as f:
+            (append_columnar if cached else write_columnar)(new, f)
+        mode_codes = {name: code for code, name in enumerate(MODES)}
+        outcome_codes = {name: code for code, name in enumerate(OUTCOMES)}
+        columns["mode"].extend(mode_codes[record.mode] for record in new)
+        columns["outcome"].extend(outcome_codes[record.outcome] for record in new)
+        for name in ("started_at", "ended_at", "planned", "actual"):
+            columns[name].extend(getattr(record, name) for record in new)
+    return columns
+
+
+def _utc_offset(timestamp):
+    return time.localtime(timestamp).tm_gmtoff
+
+
+def local_day_hour(timestamp):
+    """(local day number since 1970-01-01, hour of day) of an epoch timestamp"""
+    local = timestamp + _utc_offset(timestamp)
+    day = int(local // 86400)
+    return day, int((local - day * 86400) // 3600)
+
+
+def _local_day_hour_numpy(started):
+    """local_day_hour() over an array of timestamps
+
+    The UTC offset is looked up once per UTC day (at its start and end);
+    only the rows on days when it changes (DST) are looked up one by one.
+    """
+    utc_days = numpy.floor(started / 86400)
+    days, inverse = numpy.unique(utc_days, return_inverse=True)
+    first = numpy.array([_utc_offset(day * 86400) for day in days.tolist()], dtype=float)
+    last = numpy.array([_utc_offset(day * 86400 + 86399) for day in days.tolist()], dtype=float)
+    offsets = first[inverse]
+    changing = numpy.flatnonzero((first != last)[inverse])
+    if len(changing):
+        offsets[changing] = [_utc_offset(t) for t in started[changing].tolist()]
+    local = started + offsets
+    day = numpy.floor(local / 86400)
+    hour = (local - day * 86400) // 3600
+    return day.astype(numpy.int64), hour.astype(numpy.int64)
+
+
+class FocusStats:
+    """Running totals behind the statistics dashboard"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.outcomes = [0] * (len(MODES) * len(OUTCOMES))  # mode * 3 + outcome -> count
+        self.planned_sums = [0.0] * len(MODES)  # seconds
+        self.actual_sums = [0.0] * len(MODES)
+        self.day_focus = {}  # local day number -> seconds of work
+        self.heatmap = [0.0] * (7 * 24)  # weekday * 24 + hour -> seconds of work
+        self.focus_days = set()  # local days with a completed work session
+        self._longest = None  # cached longest streak, None when stale
+
+    @classmethod
+    def from_history(cls, store, cache_path, vectorized=None, rows=None):
+        """Build from everything in the store, or its first rows (vectorized defaults to "NumPy is available")"""
+        return cls.from_columns(load_columns(store, cache_path, rows), vectorized)
+
+    @classmethod
+    def from_columns(cls, columns, vectorized=None):
+        stats = cls()
+        if vectorized is None:
+            vectorized = numpy is not None
+        if vectorized and len(columns["mode"]):
+            stats._aggregate(columns)
+        else:
+            add_row = stats._add_row
+            for row in zip(columns["mode"], columns["outcome"], columns["started_at"],
+                           columns["planned"], columns["actual"]):
+                mode, outcome, started_at, planned, actual = row
+                add_row(mode, outcome, *local_day_hour(started_at), planned, actual)
+        return stats
+
+    def _aggregate(self, columns):
+        """Fill the totals from whole columns at once"""
+        mode = numpy.frombuffer(columns["mode"], dtype=numpy.uint8).astype(numpy.int64)
+        outcome = numpy.frombuffer(columns["outcome"], dtype=numpy.uint8).astype(numpy.int64)
+        started = numpy.frombuffer(columns["started_at"], dtype=numpy.float64)
+        planned = numpy.frombuffer(columns["planned"], dtype=numpy.float32).astype(numpy.float64)
+        actual = numpy.frombuffer(columns["actual"], dtype=numpy.float32).astype(numpy.float64)
+        day, hour = _local_day_hour_numpy(started)
+
+        modes = len(MODES)
+        self.outcomes = numpy.bincount(mode * len(OUTCOMES) + outcome, minlength=len(self.outcomes)).tolist()
+        self.planned_sums = numpy.bincount(mode, weights=planned, minlength=modes).tolist()
+        self.actual_sums = numpy.bincount(mode, weights=actual, minlength=modes).tolist()
+
+        work = mode == WORK
+        work_days, work_actual = day[work], actual[work]
+        days, inverse = numpy.unique(work_days, return_inverse=True)
+        self.day_focus = dict(zip(days.tolist(), numpy.bincount(inverse, weights=work_actual).tolist()))
+        cells = ((work_days + 3) % 7) * 24 + hour[work]  # 1970-01-01 was a Thursday
+        self.heatmap = numpy.bincount(cells, weights=work_actual, minlength=7 * 24).tolist()
+        self.focus_days = set(numpy.unique(work_days[outcome[work] == COMPLETED]).tolist())
+
+    def _add_row(self, mode, outcome, day, hour, planned, actual):
+        self.outcomes[mode * len(OUTCOMES) + outcome] += 1
+        self.planned_sums[mode] += planned
+        self.actual_sums[mode] += actual
+        if mode == WORK:
+            self.day_focus[day] = self.day_focus.get(day, 0.0) + actual
+            self.heatmap[((day + 3) % 7) * 24 + hour] += actual
+            if outcome == COMPLETED and day not in self.focus_days:
+                self.focus_days.add(day)
+                self._longest = None
+
+    def add(self, record):
+        """Fold a newly finished IntervalRecord into the totals"""
+        day, hour = local_day_hour(record.started_at)
+        with self._lock:
+            self._add_row(
+                MODES.index(record.mode), OUTCOMES.index(record.outcome),
+                day, hour, record.planned, record.actual
+            )
+
+    # Queries
+
+    def focus_minutes(self, first_day, last_day):
+        """[(date, minutes of work)] for every day from first_day to last_day"""
+        first = first_day.toordinal() - EPOCH_ORDINAL
+        last = last_day.toordinal() - EPOCH_ORDINAL
+        with self._lock:
+            return [
+                (datetime.date.fromordinal(EPOCH_ORDINAL + day), self.day_focus.get(day, 0.0) / 60)
+                for day in range(first, last + 1)
+            ]
+
+    def heatmap_minutes(self):
+        """Minutes of work by [weekday (Monday first)][hour of day]"""
+        with self._lock:
+            return [[seconds / 60 for seconds in self.heatmap[row * 24:row * 24 + 24]] for row in range(7)]
+
+    def streaks(self, today=None):
+        """(current, longest) runs of consecutive days with a completed work session
+
+        Today not having one yet doesn't break the current streak.
+        """
+        if today is None:
+            today = datetime.date.today()
+        day = today.toordinal() - EPOCH_ORDINAL
+        with self._lock:
+            days = self.focus_days
+            if self._longest is None:
+                self._longest = 0
+                for start in days:
+                    if start - 1 not in days:
+                        end = start
+                        while end + 1 in days:
+                            end += 1
+                        self._longest = max(self._longest, end - start + 1)
+            if day not in days:
+                day -= 1
+            current = 0
+            while day in days:
+                current += 1
+                day -= 1
+            return current, self._longest
+
+    def outcome_rates(self, mode="work"):
+        """Fraction of intervals of mode that were completed, skipped and reset"""
+        base = MODES.index(mode) * len(OUTCOMES)
+        with self._lock:
+            counts = self.outcomes[base:base + len(OUTCOMES)]
+        total = sum(counts)
+        return {outcome: (count / total if total else 0.0) for outcome, count in zip(OUTCOMES, counts)}
+
+    def average_lengths(self):
+        """{mode: (average planned minutes, average actual minutes)} over every interval"""
+        averages = {}
+        with self._lock:
+            for index, mode in enumerate(MODES):
+                count = sum(self.outcomes[index * len(OUTCOMES):(index + 1) * len(OUTCOMES)])
+                if count:
+                    averages[mode] = (self.planned_sums[index] / count / 60, self.actual_sums[index] / count / 60)
+        return averages
+
+    def completed_sessions(self):
+        with self._lock:
+            return self.outcomes[WORK * len(OUTCOMES) + COMPLETED]
+
+    def summary(self, today=None, days=14):
+        """Everything the dashboard shows, in one dict"""
+        if today is None:
+            today = datetime.date.today()
+        current, longest = self.streaks(today)
+        return {
+            "focus": self.focus_minutes(today - datetime.timedelta(days=days - 1), today),
+            "heatmap": self.heatmap_minutes(),
+            "streak": current,
+            "longest_streak": longest,
+            "rates": self.outcome_rates("work"),
+            "lengths": self.average_lengths(),
+            "sessions": self.completed_sessions(),
+        }
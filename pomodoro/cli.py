@@ -0,0 +1,92 @@
+"""Command-line client for the timer daemon.
+
+    python -m pomodoro.cli status            one line: mode, time left, state
+    python -m pomodoro.cli start|pause|reset|skip
+    python -m pomodoro.cli start "quarterly report"   start, tagged with a task
+    python -m pomodoro.cli watch [--no-ticks] print a status line per event
+    python -m pomodoro.cli set work_time=20 sound_enabled=false
+    python -m pomodoro.cli profile "deep work"
+    python -m pomodoro.cli reset-sessions    zero the completed-sessions counter
+"""
+import argparse
+import json
+import sys
+
+from pomodoro.client import DaemonClient, DaemonError
+from pomodoro.view_model import MODE_LABELS, format_time
+
+
+def status_line(state):
+    if state["running"]:
+        status = "paused" if state["paused"] else "running"
+    else:
+        status = "stopped"
+    settings = state["settings"]
+    task = f" [{state['task']}]" if state["task"] and state["mode"] == "work" else ""
+    return (
+        f"{MODE_LABELS[state['mode']][0]} {format_time(state['time_left'])}{task} "
+        f"({status}, {state['sessions']} completed, {settings['profile']})"
+    )
+
+
+def parse_assignment(text):
+    key, _, value = text.partition("=")
+    if not key or not value:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {text!r}")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Control the shared Pomodoro timer")
+    parser.add_argument("--socket", help="daemon socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("status", "pause", "reset", "skip"):
+        commands.add_parser(name)
+    start = commands.add_parser("start", help="start or resume the timer")
+    start.add_argument("task", nargs="?", help="what this work interval is for")
+    watch = commands.add_parser("watch", help="print a line for every event")
+    watch.add_argument("--no-ticks", action="store_true", help="only state changes, no per-second ticks")
+    set_parser = commands.add_parser("set", help="change settings")
+    set_parser.add_argument("assignments", nargs="+", type=parse_assignment, metavar="key=value")
+    profile = commands.add_parser("profile", help="switch to a named profile")
+    profile.add_argument("name")
+    commands.add_parser("reset-sessions", help="zero the completed-sessions counter")
+    args = parser.parse_args(argv)
+
+    try:
+        client = DaemonClient(args.socket)
+    except OSError as e:
+        print(f"Cannot reach the Pomodoro daemon: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        if args.command == "watch":
+            for message in client.events(ticks=not args.no_ticks):
+                print(f"{message['event']:>8}  {status_line(message['state'])}", flush=True)
+            return 0
+        if args.command == "set":
+            reply = client.request("settings", settings=dict(args.assignments))
+        elif args.command == "profile":
+            reply = client.request("profile", name=args.name)
+        elif args.command == "reset-sessions":
+            reply = client.request("reset_sessions")
+        elif args.command == "start" and args.task is not None:
+            reply = client.request("start", task=args.task)
+        else:
+            reply = client.request(args.command)
+        print(status_line(reply["state"]))
+        return 0
+    except DaemonError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
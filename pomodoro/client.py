@@ -0,0 +1,182 @@
+"""Clients for the timer daemon (see pomodoro.daemon for the protocol).
+
+* DaemonClient - blocking request/response and event stream, for scripts
+  and the CLI
+* RemoteSession - stands in for a PomodoroSession in the Tk window: it
+  mirrors the daemon's state, forwards commands and calls the listener
+  for every pushed event, on the thread that owns it (see post)
+"""
+import json
+import socket
+import threading
+
+from pomodoro.daemon import default_socket_path
+from pomodoro.settings import Settings
+from pomodoro.timer_core import TimerCore
+
+
+class DaemonError(Exception):
+    """The daemon rejected a command"""
+
+
+class DaemonClient:
+    """One connection to the daemon"""
+
+    def __init__(self, socket_path=None, timeout=5.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(self.socket_path)
+        self._file = self.sock.makefile("rb")
+
+    def send(self, command, **fields):
+        fields["cmd"] = command
+        self.sock.sendall((json.dumps(fields) + "\n").encode())
+
+    def receive(self):
+        """Next message from the daemon, or None when it hung up"""
+        line = self._file.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def request(self, command, **fields):
+        """Send a command and return its reply, skipping pushed events"""
+        self.send(command, **fields)
+        while True:
+            message = self.receive()
+            if message is None:
+                raise ConnectionError("daemon closed the connection")
+            if "event" in message:
+                continue
+            if not message.get("ok"):
+                raise DaemonError(message.get("error", "command failed"))
+            return message
+
+    def events(self, ticks=True):
+        """Subscribe and yield pushed events until the daemon goes away"""
+        self.request("subscribe", ticks=ticks)
+        self.sock.settimeout(None)
+        while True:
+            message = self.receive()
+            if message is None:
+                return
+            if "event" in message:
+                yield message
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+
+class RemoteSession:
+    """A PomodoroSession look-alike backed by the daemon's session"""
+
+    def __init__(self, socket_path=None, settings=None, listener=None, post=None):
+        self.settings = settings if settings is not None else Settings()
+        self._settings_document = None
+        self.listener = listener
+        # post(function, *args) runs a call on the thread that owns the mirrored
+        # state (a Mailbox's post, in the window); pushed events are applied
+        # and passed to the listener there. Without it, on the reader thread
+        self.post = post
+        self.timer = TimerCore(0)
+        self.clock = self.timer.clock
+        self.current_mode = "work"
+        self.completed_cycles = 0
+        self.sessions = 0  # completed work sessions, across the user's devices
+        self.warning_shown = False
+        self.timer_running = False
+        self.timer_paused = False
+        self.interval_started_at = None
+        self.task = ""
+        self._seq = 0
+        self._lock = threading.Lock()
+
+        self._commands = DaemonClient(socket_path)
+        self._apply(self._commands.request("status")["state"])
+        self._events = DaemonClient(socket_path)
+        self._reader = threading.Thread(target=self._read_events, name="pomodoro-daemon-events")
+        self._reader.daemon = True  # Allow the thread to be terminated when the main program exits
+        self._reader.start()
+
+    def _apply(self, state):
+        with self._lock:
+            # Replies and events race each other; keep only the newest state
+            if state["seq"] <= self._seq:
+                return
+            self._seq = state["seq"]
+            if state["settings"] != self._settings_document:
+                self._settings_document = state["settings"]
+                self.settings.restore(state["settings"])
+            self.current_mode = state["mode"]
+            self.completed_cycles = state["cycles"]
+            self.sessions = state["sessions"]
+            self.warning_shown = state["warned"]
+            self.timer_running = state["running"]
+            self.timer_paused = state["paused"]
+            self.interval_started_at = state["started_at"]
+            self.task = state["task"]
+            # Count down locally from the daemon's figure so redraws stay smooth
+            self.timer.restore(state["planned"], state["left"])
+            if self.active:
+                self.timer.start()
+
+    def _read_events(self):
+        for message in self._events.events():
+            if self.post is None:
+                self._deliver(message)
+            else:
+                self.post(self._deliver, message)
+
+    def _deliver(self, message):
+        self._apply(message["state"])
+        if self.listener is not None:
+            self.listener(self, message["event"], message["data"])
+
+    @property
+    def active(self):
+        return self.timer_running and not self.timer_paused
+
+    @property
+    def time_left(self):
+        return self.timer.remaining()
+
+    @time_left.setter
+    def time_left(self, seconds):
+        pass  # the daemon decides; settings changes are sent with update_settings()
+
+    def seconds_for(self, mode):
+        return self.settings.seconds_for(mode)
+
+    def _command(self, command, **fields):
+        self._apply(self._commands.request(command, **fields)["state"])
+
+    def start(self, task=None):
+        self._command("start", task=task)
+
+    def pause(self):
+        self._command("pause")
+
+    def reset(self):
+        self._command("reset")
+
+    def skip(self):
+        self._command("skip")
+
+    def update_settings(self, settings):
+        self._command("settings", settings=dict(settings))
+
+    def use_profile(self, name):
+        self._command("profile", name=name)
+
+    def reset_sessions(self):
+        self._command("reset_sessions")
+
+    def set_redraw(self, redraw):
+        pass  # ticks are pushed by the daemon either way
+
+    def close(self):
+        self._commands.close()
+        self._events.sock.shutdown(socket.SHUT_RDWR)
+        self._events.close()
@@ -0,0 +1,389 @@
+"""Background timer daemon shared by several front ends over a Unix socket.
+
+The daemon owns the one PomodoroSession and everything that reacts to it:
+settings, the history store, the state journal, notifications and plugins
+(pomodoro.plugins). Front ends (the Tk window started with --connect, the
+CLI in pomodoro.cli, status bars...) connect to a Unix domain socket and
+speak newline-delimited JSON:
+
+    -> {"cmd": "start", "task": "report"}    start/pause/reset/skip/status
+    -> {"cmd": "settings", "settings": {...}}
+    -> {"cmd": "profile", "name": "deep work"}
+    -> {"cmd": "reset_sessions"}             zero the completed-sessions counter
+    -> {"cmd": "subscribe", "ticks": true}   push events to this connection
+    <- {"ok": true, "state": {...}}          reply to every command
+    <- {"event": "tick", "data": null, "state": {...}}
+
+Events are pushed, never polled for: each one is encoded once and written
+to every subscriber's transport buffer. A subscriber that stops reading is
+disconnected once its buffer passes MAX_BUFFER instead of growing memory.
+
+Everything runs on one asyncio event loop; the session is driven by
+LoopScheduler (call_later handles) so no other thread ever touches it.
+Every MERGE_INTERVAL seconds it also merges in the sessions recorded on
+the user's other devices (see pomodoro.sync), reading their files on an
+executor thread so the loop keeps serving meanwhile. With --http it also serves
+the status over HTTP on localhost (see pomodoro.http_status), on the same
+loop.
+
+Run with: python -m pomodoro.daemon [--socket PATH] [--data-dir DIR] [--http PORT]
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import tempfile
+import time
+
+from pomodoro.alerts import completion_alert, warning_alert
+from pomodoro.engine import PomodoroSession
+from pomodoro.http_status import status_of
+from pomodoro.journal import StateJournal
+from pomodoro.persistence import SettingsStore
+from pomodoro.plugins import PluginRegistry
+from pomodoro.settings import Settings
+from pomodoro.sync import DeviceSync
+
+# Where settings, history and the journal live: next to app.py, shared with the Tk app
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MAX_BUFFER = 256 * 1024  # bytes a subscriber may fall behind before it is dropped
+MERGE_INTERVAL = 60  # seconds between merges of other devices' sessions
+
+COMMANDS = ("start", "pause", "reset", "skip", "status", "settings", "profile", "reset_sessions",
+            "subscribe", "unsubscribe")
+
+
+def default_socket_path():
+    """Per-user socket path, in XDG_RUNTIME_DIR when available"""
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    name = "pomodoro.sock" if "XDG_RUNTIME_DIR" in os.environ else f"pomodoro-{os.getuid()}.sock"
+    return os.path.join(directory, name)
+
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class LoopScheduler:
+    """Drive sessions from an asyncio event loop instead of a worker thread"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self._handles = {}
+
+    def add(self, session):
+        session.scheduler = self
+        self.reschedule(session)
+
+    def reschedule(self, session, when=None):
+        """Replace the session's pending wakeup with a new one (or none)"""
+        if when is None:
+            when = session.next_wakeup()
+        handle = self._handles.pop(session, None)
+        if handle is not None:
+            handle.cancel()
+        if when is not None:
+            delay = max(0.0, when - session.clock())
+            self._handles[session] = self.loop.call_later(delay, self._tick, session)
+
+    def _tick(self, session):
+        del self._handles[session]
+        next_wakeup = session.tick()
+        # The listener may already have rescheduled (e.g. a restart on completion)
+        if next_wakeup is not None and session not in self._handles:
+            self.reschedule(session, next_wakeup)
+
+
+class TimerDaemon:
+    """One shared timer served over a Unix domain socket"""
+
+    def __init__(self, socket_path=None, data_dir=DATA_DIR, notifier=None, http_port=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.data_dir = data_dir
+        self.settings = Settings()
+        self.settings_store = SettingsStore(os.path.join(data_dir, "settings.json"))
+        self.sync = DeviceSync(os.path.join(data_dir, "devices"))
+        try:
+            saved = self.settings_store.load()
+            if saved:
+                self.sync.adopt_count(saved.get("completed_sessions", 0))
+                self.settings.restore(saved)
+        except Exception as e:
+            print(f"Error loading settings: {e}")
+        self.journal = StateJournal(os.path.join(data_dir, "journal.log"))
+        self._history = None
+        self._notifier = notifier
+        self.plugins = PluginRegistry()
+
+        self.session = PomodoroSession(self.settings, listener=self.on_session_event)
+        self.subscribers = {}  # writer -> whether it wants tick events
+        self.seq = 0  # bumped for every state sent, so clients can drop stale ones
+        self.server = None
+        self.http = None
+        if http_port is not None:
+            from pomodoro.http_status import StatusServer
+            self.http = StatusServer(http_port)
+        self._merge_handle = None
+
+    @property
+    def history(self):
+        if self._history is None:
+            from pomodoro.history import HistoryStore
+            self._history = HistoryStore(os.path.join(self.data_dir, "history.sqlite3"))
+        return self._history
+
+    @property
+    def notifier(self):
+        if self._notifier is None:
+            from pomodoro.notifications import Notifier
+            self._notifier = Notifier()
+        return self._notifier
+
+    def state(self):
+        """Session snapshot plus what front ends display"""
+        self.seq += 1
+        state = self.session.snapshot()
+        state["seq"] = self.seq
+        state["time_left"] = self.session.time_left
+        state["settings"] = self.settings.to_json()
+        state["sessions"] = self.sync.sessions
+        return state
+
+    # Timer side effects (all on the event loop)
+
+    def on_session_event(self, session, event, data):
+        # Front ends first: writes go straight to the sockets, while the
+        # journal fsync and history below can take a millisecond or more
+        self.broadcast(event, data._asdict() if data is not None else None)
+
+        if event != "tick":
+            try:
+                self.journal.record(event, session.snapshot())
+            except OSError as e:
+                print(f"Error writing timer journal: {e}")
+
+        if event == "warning":
+            self.alert(warning_alert(session.current_mode, self.settings.warning_time), "warning", 3)
+        elif event == "complete":
+            self.record(data)
+            self.alert(completion_alert(data.mode), "complete", 5)
+            if data.mode == "work":
+                try:
+                    self.sync.count_session()
+                except OSError as e:
+                    print(f"Error saving session count: {e}")
+        elif event in ("skip", "reset") and data is not None:
+            self.record(data)
+
+        if event in self.plugins.table:
+            self.plugins.dispatch(session, event, data)
+
+        # Last, so a completion's status already counts the session
+        self.publish_status(event)
+
+    def record(self, interval):
+        self.history.append(interval)
+        try:
+            self.sync.record(interval)
+        except OSError as e:
+            print(f"Error writing device history: {e}")
+
+    def merge_devices(self):
+        """Add what other devices recorded since the last merge, then check again later"""
+        self._merge_handle = None
+        sessions = self.sync.sessions
+        future = asyncio.get_running_loop().run_in_executor(None, self._merge, self.history)
+        future.add_done_callback(lambda future: self._merged(future.result(), sessions))
+
+    def _merge(self, history):
+        """Fold in the other devices (on an executor thread); returns whether any intervals came"""
+        try:
+            new = self.sync.merge()
+            if new:
+                history.import_records(new)
+            return bool(new)
+        except (OSError, ValueError) as e:
+            print(f"Error merging other devices' sessions: {e}")
+            return False
+
+    def _merged(self, new, sessions):
+        if self.server is None:
+            return  # closed while merging
+        if new or self.sync.sessions != sessions:
+            self.broadcast("sessions")
+            self.publish_status("sessions")
+        loop = asyncio.get_running_loop()
+        self._merge_handle = loop.call_later(MERGE_INTERVAL, self.merge_devices)
+
+    def alert(self, text, sound, duration):
+        sound = sound if self.settings.sound_enabled else None
+        if self.settings.notification_enabled:
+            title, message = text
+            self.notifier.notify(title, message, duration=duration, sound=sound)
+        elif sound:
+            self.notifier.notify(sound=sound)
+
+    def publish_status(self, event="status"):
+        """Hand the status to the HTTP endpoint, if serving one (it pushes only changes)"""
+        if self.http is not None:
+            self.http.publish(status_of(self.session, self.sync.sessions), event)
+
+    def broadcast(self, event, data=None):
+        """Push an event to every subscriber; returns how many got it"""
+        if not self.subscribers:
+            return 0
+        message = encode({"event": event, "data": data, "state": self.state()})
+        sent = 0
+        for writer, ticks in list(self.subscribers.items()):
+            if event == "tick" and not ticks:
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_BUFFER:
+                # Not reading; drop it rather than buffer without bound
+                del self.subscribers[writer]
+                writer.close()
+                continue
+            writer.write(message)
+            sent += 1
+        return sent
+
+    # Commands
+
+    def update_settings(self, changes, profile=None):
+        """Apply validated setting changes (SettingsError leaves all unchanged)"""
+        if profile is not None:
+            self.settings.use_profile(profile)
+        self.settings.update(changes)
+        self.settings_store.save(self.settings.to_json())
+        # As in the settings dialog: a stopped timer picks up the new length
+        if not self.session.timer_running:
+            self.session.time_left = self.session.seconds_for(self.session.current_mode)
+        self.broadcast("settings")
+        self.publish_status("settings")
+
+    def execute(self, request, writer):
+        command = request.get("cmd")
+        if command not in COMMANDS:
+            raise ValueError(f"unknown command: {command!r}")
+        if command == "start":
+            task = request.get("task")
+            if task is not None and not isinstance(task, str):
+                raise ValueError("task must be text")
+            self.session.start(task=task)
+        elif command in ("pause", "reset", "skip"):
+            getattr(self.session, command)()
+        elif command == "settings":
+            self.update_settings(request.get("settings") or {})
+        elif command == "profile":
+            self.update_settings({}, profile=request.get("name"))
+        elif command == "reset_sessions":
+            self.sync.reset_sessions()
+            self.broadcast("sessions")
+            self.publish_status("sessions")
+        elif command == "subscribe":
+            self.subscribers[writer] = bool(request.get("ticks", True))
+        elif command == "unsubscribe":
+            self.subscribers.pop(writer, None)
+        return {"ok": True, "state": self.state()}
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = self.execute(json.loads(line), writer)
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(encode(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.subscribers.pop(writer, None)
+            writer.close()
+
+    # Lifecycle
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        LoopScheduler(loop).add(self.session)
+
+        # Pick up where the last run left off
+        saved = self.journal.load()
+        if saved:
+            state, recorded_at = saved
+            self.session.restore(state, elapsed=time.time() - recorded_at)
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # stale socket from a previous run
+        self.server = await asyncio.start_unix_server(self.handle_client, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        if self.http is not None:
+            await self.http.start()
+            self.publish_status()
+        loop.call_soon(self.merge_devices)
+        loop.call_soon(self.load_plugins)
+
+    def load_plugins(self):
+        try:
+            count = self.plugins.load_entry_points()
+        except Exception as e:
+            print(f"Error loading plugins: {e}")
+            return
+        if count:
+            print(f"Loaded {count} plugin hook{'s' if count != 1 else ''}")
+
+    def close(self):
+        if self._merge_handle is not None:
+            self._merge_handle.cancel()
+            self._merge_handle = None
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        for writer in list(self.subscribers):
+            writer.close()
+        self.subscribers.clear()
+        if self.http is not None:
+            self.http.close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+        self.settings_store.close()
+        self.sync.close()
+        self.plugins.close()
+        self.journal.close()
+        if self._history is not None:
+            self._history.close()
+        if self._notifier is not None:
+            self._notifier.close()
+
+    async def serve_forever(self):
+        await self.start()
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        print(f"Pomodoro daemon listening on {self.socket_path}")
+        if self.http is not None:
+            print(f"Timer status at http://127.0.0.1:{self.http.port}/status and /events")
+        try:
+            await stop.wait()
+        finally:
+            self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the shared Pomodoro timer daemon")
+    parser.add_argument("--socket", help="Unix socket path (default: %(default)s)", default=default_socket_path())
+    parser.add_argument("--data-dir", help="directory for settings, history and journal (default: %(default)s)", default=DATA_DIR)
+    parser.add_argument("--http", type=int, metavar="PORT", help="also serve the timer status on http://127.0.0.1:PORT/status")
+    args = parser.parse_args(argv)
+    asyncio.run(TimerDaemon(args.socket, args.data_dir, http_port=args.http).serve_forever())
+
+
+if __name__ == "__main__":
+    main()
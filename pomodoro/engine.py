@@ -0,0 +1,263 @@
+"""UI-free Pomodoro state machine.
+
+A PomodoroSession holds everything the Tk window used to keep on itself
+(mode, cycle count, pause/run flags, warning flag) and the deadline-based
+countdown. It never sleeps or spawns threads: a scheduler calls tick() when
+the session's next wakeup is due, and the session reports what happened
+through a listener callback.
+"""
+import collections
+import time
+
+from pomodoro.settings import Settings
+from pomodoro.timer_core import TimerCore
+
+# Settings key holding the length (in minutes) of each mode
+MODE_SETTINGS = {
+    "work": "work_time",
+    "short_break": "short_break",
+    "long_break": "long_break",
+}
+
+# Events passed to the listener as listener(session, event, data); "complete",
+# "skip" and "reset" carry the IntervalRecord of the interval that ended (or
+# None for a reset/skip of an interval that never ran)
+EVENTS = ("start", "pause", "reset", "skip", "tick", "warning", "complete")
+
+# How an interval ended
+OUTCOMES = ("completed", "skipped", "reset")
+
+# How often a running session wakes up to redraw: every second while the
+# window is visible, every minute while it is covered, and not at all
+# (only for the warning and the end of the interval) while it is hidden
+REDRAW_STEPS = {"second": 1.0, "minute": 60.0, "none": None}
+
+# One finished interval; times are wall-clock epoch seconds, lengths are
+# seconds, task is what a work interval was spent on ("" if not tagged)
+IntervalRecord = collections.namedtuple(
+    "IntervalRecord", "mode outcome started_at ended_at planned actual task", defaults=("",)
+)
+
+
+def next_mode(mode, completed_cycles, cycles_before_long_break):
+    """Mode and completed-cycle count of the interval that follows mode"""
+    if mode == "work":
+        completed_cycles += 1
+        if completed_cycles >= cycles_before_long_break:
+            return "long_break", 0
+        return "short_break", completed_cycles
+    # If coming from a break, move to work mode
+    return "work", completed_cycles
+
+
+class PomodoroSession:
+    """One Pomodoro timer: work/break cycling on a deadline countdown"""
+
+    __slots__ = (
+        "settings", "clock", "listener", "timer", "current_mode",
+        "completed_cycles", "warning_shown", "timer_running", "timer_paused",
+        "scheduler", "generation", "wall_clock", "interval_started_at",
+        "redraw_step", "task", "expired_at",
+    )
+
+    def __init__(self, settings, clock=time.monotonic, listener=None, wall_clock=time.time):
+        self.settings = Settings.coerce(settings)
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.interval_started_at = None  # wall time the current interval first started
+        self.expired_at = None  # wall time a restored interval ran out while the app was down
+        self.task = ""  # what work intervals are spent on
+        self.listener = listener
+        self.current_mode = "work"  # "work", "short_break", "long_break"
+        self.completed_cycles = 0
+        self.warning_shown = False
+        self.timer_running = False
+        self.timer_paused = False
+        self.timer = TimerCore(self.seconds_for("work"), clock=clock)
+        self.scheduler = None  # set by SessionScheduler.add()
+        self.generation = 0  # bumped on every reschedule to retire stale wakeups
+        self.redraw_step = 1.0  # seconds between "tick" events, None for no ticks
+
+    def seconds_for(self, mode):
+        """Full length of an interval in the given mode, in seconds"""
+        return self.settings.mode_seconds[mode]
+
+    @property
+    def time_left(self):
+        """Whole seconds left in the current interval"""
+        return self.timer.remaining()
+
+    @time_left.setter
+    def time_left(self, seconds):
+        # Assigning a new time left always starts a fresh interval
+        self.timer.reset(seconds)
+
+    @property
+    def active(self):
+        """True while the countdown is actually running"""
+        return self.timer_running and not self.timer_paused
+
+    def _emit(self, event, data=None):
+        if self.listener is not None:
+            self.listener(self, event, data)
+
+    def _finish_interval(self, outcome):
+        """Build the record for the interval that just ended, if it ever ran"""
+        started_at = self.interval_started_at
+        if started_at is None:
+            return None
+        self.interval_started_at = None
+        ended_at = self.wall_clock() if self.expired_at is None else self.expired_at
+        self.expired_at = None
+        planned = self.timer.duration
+        return IntervalRecord(
+            self.current_mode, outcome, started_at, ended_at,
+            planned, planned - self.timer.remaining_exact(),
+            self.task if self.current_mode == "work" else ""
+        )
+
+    def _reschedule(self, when=None):
+        if self.scheduler is not None:
+            self.scheduler.reschedule(self, when)
+
+    def move_to_next_interval(self):
+        """Decide what the next interval should be"""
+        self.current_mode, self.completed_cycles = next_mode(
+            self.current_mode, self.completed_cycles, self.settings.cycles_before_long_break
+        )
+        self.time_left = self.seconds_for(self.current_mode)
+
+        # Reset warning flag for next interval
+        self.warning_shown = False
+
+    def start(self, task=None):
+        """Start or resume the timer
+
+        task, if given, tags the interval when it starts fresh; resuming
+        keeps the task it was started with.
+        """
+        if not self.timer_running:
+            self.timer_running = True
+        self.timer_paused = False
+        if self.interval_started_at is None:
+            self.interval_started_at = self.wall_clock()
+            if task is not None:
+                self.task = task
+        self.timer.start()
+        # Tick right away so a warning due at the very start isn't a second late
+        self._reschedule(self.clock())
+        self._emit("start")
+
+    def pause(self):
+        """Pause the current timer"""
+        if self.timer_running and not self.timer_paused:
+            self.timer_paused = True
+            self.timer.pause()
+            self._reschedule()
+            self._emit("pause")
+
+    def reset(self):
+        """Stop and rewind the current interval to its beginning"""
+        record = self._finish_interval("reset")
+        self.timer_running = False
+        self.timer_paused = False
+        self.time_left = self.seconds_for(self.current_mode)
+        self.warning_shown = False
+        self._reschedule()
+        self._emit("reset", record)
+
+    def skip(self):
+        """Stop the current interval and move to the next one"""
+        record = self._finish_interval("skipped")
+        self.timer_running = False
+        self.timer_paused = False
+        self.move_to_next_interval()
+        self._reschedule()
+        self._emit("skip", record)
+
+    def snapshot(self):
+        """Plain-dict copy of the session state, for journaling"""
+        return {
+            "mode": self.current_mode,
+            "cycles": self.completed_cycles,
+            "warned": self.warning_shown,
+            "running": self.timer_running,
+            "paused": self.timer_paused,
+            "planned": self.timer.duration,
+            "left": self.timer.remaining_exact(),
+            "started_at": self.interval_started_at,
+            "task": self.task,
+        }
+
+    def restore(self, state, elapsed=0.0):
+        """Load a snapshot() taken elapsed seconds ago
+
+        A countdown that was running keeps running, minus the time that passed
+        in between; if that already used it up, the next tick completes the
+        interval as usual, recorded as ending when it ran out. An interval that never started takes its length
+        from the current settings, which may have changed since.
+        """
+        self.current_mode = state["mode"]
+        self.completed_cycles = state["cycles"]
+        self.warning_shown = state["warned"]
+        self.timer_running = state["running"]
+        self.timer_paused = state["paused"]
+        self.interval_started_at = state["started_at"]
+        self.task = state.get("task", "")  # journals from before task tagging
+        self.expired_at = None
+        planned, left = state["planned"], state["left"]
+        if not self.timer_running and self.interval_started_at is None:
+            planned = left = self.seconds_for(self.current_mode)
+        elif self.active:
+            left -= max(0.0, elapsed)
+            if left <= 0:
+                self.expired_at = self.wall_clock() + left  # its deadline, as journaled
+        self.timer.restore(planned, left)
+        if self.active:
+            self.timer.start()
+            self._reschedule(self.clock())
+        else:
+            self._reschedule()
+
+    def set_redraw(self, redraw):
+        """Change how often ticks are emitted ("second", "minute" or "none")"""
+        self.redraw_step = REDRAW_STEPS[redraw]
+        if self.active:
+            self._reschedule()
+
+    def next_wakeup(self):
+        """Clock time of the next event that matters, or None when idle
+
+        That is the earliest of the next redraw, the warning threshold and
+        the end of the interval.
+        """
+        if not self.active:
+            return None
+        timer = self.timer
+        delay = timer.remaining_exact()  # end of the interval
+        if not self.warning_shown:
+            delay = max(0.0, delay - self.settings.warning_seconds)
+        if self.redraw_step is not None:
+            delay = min(delay, timer.time_to_next(self.redraw_step))
+        return self.clock() + delay
+
+    def tick(self):
+        """Advance the session; returns the next wakeup time or None"""
+        if not self.active:
+            return None
+
+        if self.timer.expired():
+            record = self._finish_interval("completed")
+            self.timer_running = False
+            self.move_to_next_interval()
+            self._emit("complete", record)
+            return None
+
+        # Check if we need to show a warning
+        if not self.warning_shown and self.time_left <= self.settings.warning_seconds:
+            self.warning_shown = True
+            self._emit("warning")
+
+        if self.redraw_step is not None:
+            self._emit("tick")
+        return self.next_wakeup()
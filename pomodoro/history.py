@@ -0,0 +1,244 @@
+"""Append-only history of every interval, kept in SQLite (WAL mode).
+
+Each finished interval (completed, skipped or reset) becomes one row with
+its start/end wall-clock times and its planned and actual lengths. Rows are
+indexed by day and by mode/outcome so questions like "work sessions this
+week" are answered from the index rather than by scanning. Work intervals
+may carry a task name, indexed too, for time-per-task reports.
+
+append() only puts the record on a queue; a background writer thread
+batches queued records into one transaction, so callers on the Tk main loop
+or the scheduler thread never wait on disk.
+"""
+import datetime
+import queue
+import sqlite3
+import threading
+
+from pomodoro.engine import IntervalRecord
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS intervals (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    planned REAL NOT NULL,
+    actual REAL NOT NULL,
+    task TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS intervals_by_day ON intervals (day);
+CREATE INDEX IF NOT EXISTS intervals_by_mode ON intervals (mode, outcome, day);
+CREATE INDEX IF NOT EXISTS intervals_by_start ON intervals (started_at);
+"""
+
+# Created once the task column is known to exist (see _upgrade)
+TASK_INDEX = "CREATE INDEX IF NOT EXISTS intervals_by_task ON intervals (task, day)"
+
+INSERT = (
+    "INSERT INTO intervals (day, mode, outcome, started_at, ended_at, planned, actual, task) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Insert unless an interval of the same mode starting at the same time exists
+INSERT_NEW = (
+    "INSERT INTO intervals (day, mode, outcome, started_at, ended_at, planned, actual, task) "
+    "SELECT ?, ?, ?, ?, ?, ?, ?, ? WHERE NOT EXISTS "
+    "(SELECT 1 FROM intervals WHERE started_at = ? AND mode = ?)"
+)
+
+_STOP = object()
+
+
+def day_of(timestamp):
+    """Local calendar day (YYYY-MM-DD) an epoch timestamp falls on"""
+    return datetime.date.fromtimestamp(timestamp).isoformat()
+
+
+def _day_range(first_day=None, last_day=None):
+    """SQL conditions and parameters for a day range; either end may be left open"""
+    conditions, params = [], []
+    if first_day is not None:
+        conditions.append("day >= ?")
+        params.append(str(first_day))
+    if last_day is not None:
+        conditions.append("day <= ?")
+        params.append(str(last_day))
+    return conditions, params
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL keeps the database consistent with NORMAL; only the last few
+    # commits can be lost on power failure
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def _upgrade(connection):
+    """Add what databases from older versions lack"""
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(intervals)")}
+    if "task" not in columns:
+        connection.execute("ALTER TABLE intervals ADD COLUMN task TEXT NOT NULL DEFAULT ''")
+    connection.execute(TASK_INDEX)
+
+
+class HistoryStore:
+    """Interval history with a write-behind appender and indexed queries"""
+
+    def __init__(self, path, batch_size=256):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+
+        # Readers use their own connection; WAL lets them run alongside the writer
+        self._reader = _connect(path)
+        self._reader.executescript(SCHEMA)
+        _upgrade(self._reader)
+        self._reader.commit()
+
+    def append(self, record):
+        """Queue an IntervalRecord for writing; never touches the disk"""
+        if self._writer is None:
+            self._start_writer()
+        self._queue.put(record)
+
+    def _start_writer(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="pomodoro-history")
+                self._writer.daemon = True  # close() flushes; don't hold up exit otherwise
+                self._writer.start()
+
+    def _write_loop(self):
+        connection = _connect(self.path)
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # Drain whatever else is already waiting into the same transaction
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = False
+                rows = []
+                for item in batch:
+                    if item is _STOP:
+                        stop = True
+                    else:
+                        rows.append((day_of(item.started_at),) + tuple(item))
+                if rows:
+                    with connection:
+                        connection.executemany(INSERT, rows)
+                for _ in batch:
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Block until every queued record has been written"""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write out pending records and release the database"""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        self._reader.close()
+
+    def import_records(self, records, batch_size=10000):
+        """Insert records that are not stored yet; returns (read, added)
+
+        records may be any iterable (e.g. a file being parsed); it is
+        consumed batch by batch, one transaction each.
+        """
+        self.flush()
+        connection = _connect(self.path)
+        read = added = 0
+        try:
+            batch = []
+            for record in records:
+                batch.append((day_of(record.started_at),) + tuple(record) + (record.started_at, record.mode))
+                if len(batch) == batch_size:
+                    added += self._insert_new(connection, batch)
+                    read += len(batch)
+                    batch = []
+            if batch:
+                added += self._insert_new(connection, batch)
+                read += len(batch)
+        finally:
+            connection.close()
+        return read, added
+
+    @staticmethod
+    def _insert_new(connection, rows):
+        before = connection.total_changes
+        with connection:
+            connection.executemany(INSERT_NEW, rows)
+        return connection.total_changes - before
+
+    def count(self, first_day, last_day=None, mode=None, outcome=None):
+        """Number of intervals between two days (inclusive), optionally filtered"""
+        if last_day is None:
+            last_day = first_day
+        query = "SELECT COUNT(*) FROM intervals WHERE day BETWEEN ? AND ?"
+        params = [str(first_day), str(last_day)]
+        if mode is not None:
+            query += " AND mode = ?"
+            params.append(mode)
+        if outcome is not None:
+            query += " AND outcome = ?"
+            params.append(outcome)
+        return self._reader.execute(query, params).fetchone()[0]
+
+    def sessions_this_week(self, today=None, mode="work", outcome="completed"):
+        """Intervals since Monday of the current week (completed work by default)"""
+        if today is None:
+            today = datetime.date.today()
+        monday = today - datetime.timedelta(days=today.weekday())
+        return self.count(monday.isoformat(), today.isoformat(), mode, outcome)
+
+    def __len__(self):
+        return self._reader.execute("SELECT COUNT(*) FROM intervals").fetchone()[0]
+
+    def records(self, first_day=None, last_day=None, offset=0):
+        """Iterate IntervalRecords in insertion order, optionally by day range
+
+        offset skips that many records first (e.g. ones already seen).
+        """
+        query = "SELECT mode, outcome, started_at, ended_at, planned, actual, task FROM intervals"
+        conditions, params = _day_range(first_day, last_day)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id"
+        if offset:
+            query += " LIMIT -1 OFFSET ?"
+            params.append(offset)
+        for row in self._reader.execute(query, params):
+            yield IntervalRecord(*row)
+
+    def task_uses(self):
+        """(task, started_at) of every tagged work interval, oldest first"""
+        yield from self._reader.execute(
+            "SELECT task, started_at FROM intervals WHERE task > '' AND mode = 'work' ORDER BY started_at"
+        )
+
+    def task_totals(self, first_day=None, last_day=None):
+        """[(task, seconds of work, intervals)] per task, most time first
+
+        Untagged work is listed under "".
+        """
+        conditions, params = _day_range(first_day, last_day)
+        query = "SELECT task, SUM(actual), COUNT(*) FROM intervals WHERE " + " AND ".join(["mode = 'work'"] + conditions)
+        query += " GROUP BY task ORDER BY SUM(actual) DESC"
+        return self._reader.execute(query, params).fetchall()
@@ -0,0 +1,246 @@
+"""Streaming export and import of interval history.
+
+Three formats, chosen by name or by file extension:
+
+* csv - a header row with the IntervalRecord fields, then one row each
+* jsonl - one JSON object per line
+* columnar (.pcol) - compact binary for analytics tools: blocks of up to
+  BLOCK_ROWS rows, each stored column by column as little-endian typed
+  arrays (float64 timestamps, float32 lengths, one byte per mode/outcome);
+  it is for numbers only and leaves out task names
+
+Everything is a generator over IntervalRecords. Writers pull records one
+at a time (the columnar writer holds a single block) and readers yield
+them as they parse, so memory stays flat however many years of history
+go through.
+
+Columnar layout:
+
+    MAGIC
+    repeated: uint32 row count n (0 ends the file), then per column of
+              COLUMNS: n values of its array type
+
+A columnar file can be appended to in place (append_columnar), which is
+how the analytics cache keeps up with the history.
+"""
+import array
+import csv
+import json
+import os
+import struct
+import sys
+
+from pomodoro.engine import OUTCOMES, IntervalRecord
+from pomodoro.schedule import MODES
+
+FORMATS = ("csv", "jsonl", "columnar")
+EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".pcol": "columnar"}
+
+MAGIC = b"PMDRCOL1"
+BLOCK_ROWS = 4096
+
+# Field -> array typecode, in file order
+COLUMNS = (
+    ("mode", "B"),
+    ("outcome", "B"),
+    ("started_at", "d"),
+    ("ended_at", "d"),
+    ("planned", "f"),
+    ("actual", "f"),
+)
+_COUNT = struct.Struct("<I")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def format_for(path, name=None):
+    """The format to use for path: name if given, else from its extension"""
+    if name is not None:
+        if name not in FORMATS:
+            raise ValueError(f"unknown format: {name}")
+        return name
+    for extension, format_name in EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return format_name
+    raise ValueError(f"cannot tell the format of {path}; pass one of {', '.join(FORMATS)}")
+
+
+def _record(mode, outcome, started_at, ended_at, planned, actual, task=""):
+    """Checked IntervalRecord from parsed values"""
+    if mode not in MODES:
+        raise ValueError(f"unknown mode: {mode!r}")
+    if outcome not in OUTCOMES:
+        raise ValueError(f"unknown outcome: {outcome!r}")
+    if not isinstance(task, str):
+        raise ValueError(f"task must be text, not {type(task).__name__}")
+    return IntervalRecord(mode, outcome, float(started_at), float(ended_at), float(planned), float(actual), task)
+
+
+# CSV
+
+def write_csv(records, f):
+    """Write records to a text file as CSV; returns the number written"""
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(IntervalRecord._fields)
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def read_csv(f):
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    # Files exported before task tagging have no task column
+    if tuple(header) not in (IntervalRecord._fields, IntervalRecord._fields[:-1]):
+        raise ValueError(f"unexpected CSV header: {','.join(header)}")
+    for line, row in enumerate(reader, 2):
+        try:
+            yield _record(*row)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"line {line}: {e}") from None
+
+
+# JSON lines
+
+def write_jsonl(records, f):
+    count = 0
+    for record in records:
+        f.write(json.dumps(record._asdict(), separators=(",", ":")))
+        f.write("\n")
+        count += 1
+    return count
+
+
+def read_jsonl(f):
+    for line, text in enumerate(f, 1):
+        if not text.strip():
+            continue
+        try:
+            yield _record(**json.loads(text))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"line {line}: {e}") from None
+
+
+# Columnar binary
+
+def _write_block(f, columns):
+    f.write(_COUNT.pack(len(columns[0])))
+    for column in columns:
+        if _BIG_ENDIAN:
+            column.byteswap()
+        f.write(column.tobytes())
+
+
+def write_columnar(records, f, block_rows=BLOCK_ROWS):
+    """Write records to a binary file in blocks of typed columns"""
+    f.write(MAGIC)
+    return _write_blocks(records, f, block_rows)
+
+
+def append_columnar(records, f, block_rows=BLOCK_ROWS):
+    """Add records to the end of a columnar file opened for update ("r+b")"""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a columnar history file")
+    f.seek(-_COUNT.size, os.SEEK_END)
+    if f.tell() < len(MAGIC) or f.read(_COUNT.size) != _COUNT.pack(0):
+        raise ValueError("truncated columnar history file")
+    f.seek(-_COUNT.size, os.SEEK_END)  # write over the end marker
+    return _write_blocks(records, f, block_rows)
+
+
+def _write_blocks(records, f, block_rows):
+    mode_codes = {mode: code for code, mode in enumerate(MODES)}
+    outcome_codes = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+    columns = [array.array(typecode) for _, typecode in COLUMNS]
+    modes, outcomes, started, ended, planned, actual = columns
+    count = 0
+    for record in records:
+        modes.append(mode_codes[record.mode])
+        outcomes.append(outcome_codes[record.outcome])
+        started.append(record.started_at)
+        ended.append(record.ended_at)
+        planned.append(record.planned)
+        actual.append(record.actual)
+        count += 1
+        if len(modes) == block_rows:
+            _write_block(f, columns)
+            columns = [array.array(typecode) for _, typecode in COLUMNS]
+            modes, outcomes, started, ended, planned, actual = columns
+    if len(modes):
+        _write_block(f, columns)
+    f.write(_COUNT.pack(0))
+    return count
+
+
+def read_columnar_blocks(f):
+    """Yield each block as a dict of field name -> array
+
+    mode and outcome stay as codes (indexes into MODES and OUTCOMES), which
+    is what columnar analytics wants.
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a columnar history file")
+    while True:
+        header = f.read(_COUNT.size)
+        if len(header) < _COUNT.size:
+            raise ValueError("truncated columnar history file")
+        (rows,) = _COUNT.unpack(header)
+        if rows == 0:
+            return
+        block = {}
+        for name, typecode in COLUMNS:
+            column = array.array(typecode)
+            data = f.read(rows * column.itemsize)
+            if len(data) < rows * column.itemsize:
+                raise ValueError("truncated columnar history file")
+            column.frombytes(data)
+            if _BIG_ENDIAN:
+                column.byteswap()
+            block[name] = column
+        yield block
+
+
+def read_columnar(f):
+    for block in read_columnar_blocks(f):
+        columns = [block[name] for name, _ in COLUMNS]
+        for mode, outcome, started_at, ended_at, planned, actual in zip(*columns):
+            try:
+                yield IntervalRecord(MODES[mode], OUTCOMES[outcome], started_at, ended_at, planned, actual)
+            except IndexError:
+                raise ValueError(f"bad mode/outcome code: {mode}/{outcome}") from None
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "columnar": write_columnar}
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "columnar": read_columnar}
+
+
+def _open(path, format_name, mode):
+    if format_name == "columnar":
+        return open(path, mode + "b")
+    return open(path, mode, newline="" if format_name == "csv" else None, encoding="utf-8")
+
+
+def export_history(store, path, format_name=None, first_day=None, last_day=None):
+    """Stream the store's intervals (optionally by day range) to path; returns the count"""
+    format_name = format_for(path, format_name)
+    with _open(path, format_name, "w") as f:
+        return WRITERS[format_name](store.records(first_day, last_day), f)
+
+
+def read_history(path, format_name=None):
+    """Iterate the IntervalRecords in an exported file"""
+    format_name = format_for(path, format_name)
+    with _open(path, format_name, "r") as f:
+        yield from READERS[format_name](f)
+
+
+def import_history(store, path, format_name=None):
+    """Add the intervals in path to the store; returns (read, added)
+
+    Intervals the store already has are skipped, so importing the same
+    file twice is harmless.
+    """
+    return store.import_records(read_history(path, format_name))
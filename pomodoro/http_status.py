@@ -0,0 +1,255 @@
+"""Local HTTP status endpoint for wall displays, status bars and shell prompts.
+
+Optional (python app.py --http, or python -m pomodoro.daemon --http); it
+listens on 127.0.0.1 only:
+
+    GET /status           {"mode": "work", "time_left": 1234, "completed_sessions": 3,
+                           "running": true, "paused": false, "task": "report"}
+                          with an ETag; a request whose If-None-Match holds the
+                          current one gets an empty 304
+    GET /events           Server-Sent Events: the status on connecting, then one
+                          event (named after what happened: start, pause,
+                          complete, skip, reset, settings, sessions...) per change
+    GET /events?ticks=1   the same, plus a "tick" event every second while the
+                          timer runs
+
+Everything runs on one asyncio event loop, the daemon's or (in the app) one
+on its own thread. Each status is encoded once when it changes, together
+with its 200 and 304 responses and its event, and then only written out;
+an idle connection costs nothing but its socket, and one timer sends every
+stream a keep-alive comment now and then.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+KEEPALIVE = 15  # seconds between comments on idle event streams
+MAX_BUFFER = 256 * 1024  # bytes an event stream may fall behind before it is dropped
+MAX_HEAD = 8 * 1024  # bytes of request line and headers accepted
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 431: "Request Header Fields Too Large"}
+
+# Start of every event stream (no Content-Length: it lasts until either side closes)
+STREAM_HEAD = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+    b"Access-Control-Allow-Origin: *\r\n\r\nretry: 2000\n\n"
+)
+
+
+def status_of(session, completed_sessions):
+    """The status document for a PomodoroSession (or the client's mirror of one)"""
+    return {
+        "mode": session.current_mode,
+        "time_left": session.time_left,
+        "completed_sessions": completed_sessions,
+        "running": session.timer_running,
+        "paused": session.timer_paused,
+        "task": session.task,
+    }
+
+
+def response(code, headers=(), body=b""):
+    head = [f"HTTP/1.1 {code} {REASONS[code]}"]
+    head.extend(f"{name}: {value}" for name, value in headers)
+    if code != 304:
+        head.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(head) + "\r\n\r\n").encode("ascii") + body
+
+
+class StatusServer:
+    """HTTP status and event stream for one timer"""
+
+    def __init__(self, port=DEFAULT_PORT, host=HOST):
+        self.host = host
+        self.port = port
+        self.server = None
+        self.streams = {}  # writer -> whether it wants ticks
+        self.connections = set()  # writers of every open connection
+        self._versions = itertools.count(1)
+        self._boot = format(int(time.time() * 1000), "x")  # so ETags don't repeat across restarts
+        self._body = None
+        self._etag = None
+        self._ok = self._not_modified = None  # the encoded responses for the status
+        self._keepalive = None
+        self._loop = None
+        self._thread = None
+
+        self.requests = 0
+        self.not_modified = 0
+        self.events_sent = 0
+        self.publish({"mode": "work", "time_left": 0, "completed_sessions": 0,
+                      "running": False, "paused": False, "task": ""})
+
+    # State (on the loop's thread)
+
+    def publish(self, status, event="status"):
+        """Take a new status; if it differs, push it to the streams as event
+
+        "tick" events only go to streams that asked for ticks.
+        """
+        body = json.dumps(status, separators=(",", ":")).encode("utf-8")
+        if body == self._body:
+            return 0
+        self._body = body
+        self._etag = f'"{self._boot}-{next(self._versions)}"'
+        headers = [("Content-Type", "application/json"), ("ETag", self._etag),
+                   ("Cache-Control", "no-cache"), ("Access-Control-Allow-Origin", "*")]
+        self._ok = response(200, headers, body)
+        self._not_modified = response(304, headers[1:])
+        if not self.streams:
+            return 0
+        message = b"event: " + event.encode("ascii") + b"\ndata: " + body + b"\n\n"
+        sent = 0
+        for writer, ticks in list(self.streams.items()):
+            if event == "tick" and not ticks:
+                continue
+            if self._send(writer, message):
+                sent += 1
+        self.events_sent += sent
+        return sent
+
+    def _send(self, writer, data):
+        if writer.transport.get_write_buffer_size() > MAX_BUFFER:
+            # Not reading; drop it rather than buffer without bound
+            del self.streams[writer]
+            writer.close()
+            return False
+        writer.write(data)
+        return True
+
+    def _ping(self):
+        for writer in list(self.streams):
+            self._send(writer, b": keep-alive\n\n")
+        self._keepalive = asyncio.get_running_loop().call_later(KEEPALIVE, self._ping)
+
+    # Serving
+
+    async def start(self):
+        """Start listening (on the running loop); port 0 picks a free port"""
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_HEAD)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._keepalive = asyncio.get_running_loop().call_later(KEEPALIVE, self._ping)
+
+    async def handle(self, reader, writer):
+        self.connections.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.LimitOverrunError:
+                    writer.write(response(431, [("Connection", "close")]))
+                    break
+                keep_open = self.respond(head, writer)
+                if keep_open == "stream":
+                    # Nothing more is read from an event stream; wait for it to close
+                    while await reader.read(1024):
+                        pass
+                    break
+                if not keep_open:
+                    break
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.streams.pop(writer, None)
+            self.connections.discard(writer)
+            writer.close()
+
+    def respond(self, head, writer):
+        """Answer one request; returns True to keep the connection, "stream" for an event stream"""
+        self.requests += 1
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            writer.write(response(400, [("Connection", "close")]))
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_open = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+        url = urlsplit(target)
+        if url.path not in ("/status", "/events"):
+            writer.write(response(404, [("Content-Type", "text/plain")], b"not found\n"))
+        elif method != "GET":
+            writer.write(response(405, [("Allow", "GET"), ("Content-Type", "text/plain")], b"GET only\n"))
+        elif url.path == "/status":
+            if self._etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+                self.not_modified += 1
+                writer.write(self._not_modified)
+            else:
+                writer.write(self._ok)
+        else:
+            ticks = parse_qs(url.query).get("ticks", ["0"])[-1] not in ("0", "", "false", "no")
+            writer.write(STREAM_HEAD + b"event: status\ndata: " + self._body + b"\n\n")
+            self.streams[writer] = ticks
+            return "stream"
+        return keep_open
+
+    def close(self):
+        """Stop listening and end every stream (on the loop's thread)"""
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            self._keepalive = None
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        for writer in list(self.connections):
+            writer.close()
+        self.streams.clear()
+
+    # On a thread of its own (for the Tk app)
+
+    def start_in_thread(self):
+        """Serve from a new event loop on a background thread; returns once listening"""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+        failed = []
+
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except OSError as e:
+                failed.append(e)
+                return
+            finally:
+                started.set()
+            loop.run_forever()
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="pomodoro-http", daemon=True)
+        self._thread.start()
+        started.wait()
+        if failed:
+            raise failed[0]
+        self._loop = loop
+
+    def publish_threadsafe(self, status, event="status"):
+        """publish() from another thread"""
+        self._loop.call_soon_threadsafe(self.publish, status, event)
+
+    def stop_thread(self):
+        """Close and stop the thread started by start_in_thread()"""
+        if self._loop is None:
+            return
+
+        async def stop():
+            self.close()
+            # Closing the connections ends their handlers
+            handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            if handlers:
+                await asyncio.wait(handlers, timeout=1)
+            asyncio.get_running_loop().stop()
+        asyncio.run_coroutine_threadsafe(stop(), self._loop)
+        self._thread.join(timeout=2)
+        self._loop = None
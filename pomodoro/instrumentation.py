@@ -0,0 +1,140 @@
+"""Built-in timing histograms for the timer, exportable as JSON or Prometheus text.
+
+Three histograms are kept:
+
+* tick_lateness - how late the scheduler ran a tick compared to its wakeup
+* ui_dispatch_delay - time from a UI update being queued in the main
+  loop's mailbox until a poll runs it
+* alert_latency - time from an interval completing (or its warning firing)
+  until the notification backend has delivered the alert
+
+Recording is off unless POMODORO_METRICS=1 is set (or metrics.enabled is
+set to True). Call sites check metrics.enabled before taking any
+timestamps, so a disabled registry costs one attribute lookup per event.
+Histograms are updated without locks: each one has a single writer thread.
+"""
+import bisect
+import json
+import os
+import time
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds"""
+
+    __slots__ = ("name", "help", "bounds", "counts", "sum", "count", "max")
+
+    def __init__(self, name, help, bounds=BUCKETS):
+        self.name = name
+        self.help = help
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (approximate)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {str(bound): count for bound, count in zip(self.bounds + ("+Inf",), self.counts)},
+        }
+
+    def prometheus_lines(self, prefix):
+        name = f"{prefix}_{self.name}_seconds"
+        lines = [f"# HELP {name} {self.help}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum!r}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class Metrics:
+    """Registry of the timer's histograms"""
+
+    def __init__(self, enabled=False, prefix="pomodoro"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.tick_lateness = Histogram("tick_lateness", "Delay between a tick's scheduled wakeup and its dispatch.")
+        self.ui_dispatch_delay = Histogram(
+            "ui_dispatch_delay", "Delay between queueing a UI update and the Tk main loop running it."
+        )
+        self.alert_latency = Histogram(
+            "alert_latency", "Delay between an interval completing or warning and the alert being delivered."
+        )
+        self.histograms = [self.tick_lateness, self.ui_dispatch_delay, self.alert_latency]
+
+    def reset(self):
+        for histogram in self.histograms:
+            histogram.reset()
+
+    def to_dict(self):
+        return {
+            "timestamp": time.time(),
+            "histograms": {histogram.name: histogram.to_dict() for histogram in self.histograms},
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self):
+        lines = []
+        for histogram in self.histograms:
+            lines.extend(histogram.prometheus_lines(self.prefix))
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory, basename="metrics"):
+        """Write <basename>.json and <basename>.prom (textfile collector format)
+
+        Each file is written to a temporary name and renamed into place, so a
+        scraper never reads a half-written file. Returns the two paths.
+        """
+        paths = []
+        for extension, text in (("json", self.to_json()), ("prom", self.to_prometheus())):
+            path = os.path.join(directory, f"{basename}.{extension}")
+            temp_path = path + ".tmp"
+            with open(temp_path, "w") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+            paths.append(path)
+        return paths
+
+
+# The process-wide registry used by the scheduler, notifier hook and UI
+metrics = Metrics(enabled=os.environ.get("POMODORO_METRICS") == "1")
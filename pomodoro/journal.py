@@ -0,0 +1,115 @@
+"""Crash-safe journal of timer state transitions.
+
+Every start, pause, reset, skip, warning and completion appends one JSON
+line holding the wall-clock time and the session's snapshot() (a few dozen
+bytes, fsynced). Ticks are never journaled: the countdown is fully
+described by the time left at the last transition plus the time since.
+
+Every snapshot_every entries the latest state is written to a snapshot
+file (atomically) and the log is truncated, so restoring reads one small
+file and at most snapshot_every lines no matter how long the timer has been
+in use. A torn last line from a crash mid-append is ignored, and cut off
+before the next entry is appended so the two don't run together.
+"""
+import json
+import os
+import threading
+import time
+
+from pomodoro.persistence import write_json_atomic
+
+
+class StateJournal:
+    """Append-only transition log with periodic snapshot compaction"""
+
+    def __init__(self, path, snapshot_every=256, wall_clock=time.time):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.snapshot_every = snapshot_every
+        self.wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._file = None
+        self._seq = None  # sequence number of the last entry written
+        self._entries = 0  # entries in the log since the last snapshot
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read_log(self):
+        try:
+            with open(self.path, "r") as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # torn write from a crash mid-append
+        return entries
+
+    def load(self):
+        """Return (state, wall time it was recorded) of the latest entry, or None"""
+        with self._lock:
+            latest = self._read_snapshot()
+            entries = [entry for entry in self._read_log() if latest is None or entry["seq"] > latest["seq"]]
+            if entries:
+                latest = entries[-1]
+            self._seq = latest["seq"] if latest else 0
+            self._entries = len(entries)
+        if latest is None:
+            return None
+        return latest["state"], latest["time"]
+
+    def record(self, event, state):
+        """Append a transition; compacts into the snapshot every so often"""
+        with self._lock:
+            if self._seq is None:
+                # Continue numbering from whatever is on disk
+                snapshot = self._read_snapshot()
+                entries = self._read_log()
+                self._seq = max([snapshot["seq"] if snapshot else 0] + [entry["seq"] for entry in entries])
+                self._entries = len(entries)
+            self._seq += 1
+            entry = {"seq": self._seq, "time": self.wall_clock(), "event": event, "state": state}
+
+            if self._file is None:
+                self._file = self._open_log()
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._file.flush()
+            # Transitions happen a few times an hour, so an fsync each is cheap
+            os.fsync(self._file.fileno())
+            self._entries += 1
+
+            if self._entries >= self.snapshot_every:
+                self._compact(entry)
+
+    def _open_log(self):
+        """Open the log for appending, first cutting off a torn last line"""
+        try:
+            with open(self.path, "r+b") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+        return open(self.path, "a")
+
+    def _compact(self, entry):
+        # Snapshot first: entries up to its seq are skipped on load, so a
+        # crash before the truncate below loses nothing
+        write_json_atomic(self.snapshot_path, entry)
+        self._file.close()
+        self._file = open(self.path, "w")
+        self._entries = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
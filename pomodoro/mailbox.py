@@ -0,0 +1,124 @@
+"""Single-owner command queue for state driven from a GUI main loop.
+
+The timer state has one owner, the Tk main loop: button handlers, the
+session's ticks and the events they raise all run there, one at a time,
+so nothing needs a lock. Work reaches the owner through a Mailbox, a
+queue of calls drained in batches. Posting appends to a collections.deque
+(append() and popleft() are atomic), so any thread can post without
+taking a lock or waiting for the owner.
+
+MainLoopDriver keeps a single after() callback pending on the main loop.
+Each poll drains the mailbox, runs the scheduler's due ticks and drains
+whatever those posted, then sets the next poll for the earliest wakeup.
+"""
+import collections
+import math
+
+BATCH = 256  # calls run per drain before the main loop gets to handle input again
+
+
+class Mailbox:
+    """Calls posted from any thread, run in order by the thread that owns the state"""
+
+    __slots__ = ("_calls",)
+
+    def __init__(self):
+        self._calls = collections.deque()
+
+    def __len__(self):
+        return len(self._calls)
+
+    def post(self, function, *args):
+        """Queue function(*args) for the owner; safe from any thread"""
+        self._calls.append((function, args))
+
+    def drain(self, limit=BATCH):
+        """Run up to limit queued calls, oldest first; returns how many ran
+
+        Only the owner may drain. Calls posted while draining run in the
+        same batch, as long as it has room.
+        """
+        calls = self._calls
+        ran = 0
+        while ran < limit:
+            try:
+                function, args = calls.popleft()
+            except IndexError:
+                break
+            ran += 1
+            function(*args)
+        return ran
+
+
+class MainLoopDriver:
+    """Drive a SessionScheduler and a Mailbox from a main loop's after()
+
+    after and after_cancel are Tk's (or anything with the same signature):
+    after(milliseconds, callback) returns an id for after_cancel(id).
+    interval (seconds), if set, is the longest gap between polls, for
+    mailboxes that other threads post to; without it the driver only wakes
+    for due ticks and for posts made on the main loop.
+    """
+
+    def __init__(self, after, after_cancel, scheduler, mailbox=None, interval=None):
+        self._after = after
+        self._after_cancel = after_cancel
+        self.scheduler = scheduler
+        self.clock = scheduler.clock
+        self.mailbox = Mailbox() if mailbox is None else mailbox
+        self.interval = interval
+        self._pending = None  # after() id of the next poll
+        self._due = None  # clock time it is set for
+        self._polling = False
+        self.polls = 0
+        scheduler.wake = self.wake
+
+    def post(self, function, *args):
+        """Queue function(*args) and poll as soon as the main loop is free (main loop only)"""
+        self.mailbox.post(function, *args)
+        self.wake()
+
+    def wake(self, when=None):
+        """Make sure a poll is set for clock time when (default now) or earlier"""
+        if self._polling:
+            return  # the poll under way sets the next one as it ends
+        if when is None:
+            when = self.clock()
+        if self._pending is not None:
+            if self._due <= when:
+                return
+            self._after_cancel(self._pending)
+        self._due = when
+        delay = max(0, math.ceil((when - self.clock()) * 1000))
+        self._pending = self._after(delay, self.poll)
+
+    def start(self):
+        """Set the first poll; later ones are set by each poll and by wake()"""
+        self.wake()
+
+    def poll(self):
+        """Run queued calls and due ticks, then set the next poll"""
+        self._pending = None
+        self._polling = True
+        self.polls += 1
+        try:
+            self.mailbox.drain()
+            self.scheduler.run_pending()
+            self.mailbox.drain()
+        finally:
+            self._polling = False
+            # A call that raised leaves the rest queued for the next poll
+            if self.mailbox:
+                self.wake()
+            when = self.scheduler.next_due()
+            if self.interval is not None:
+                latest = self.clock() + self.interval
+                when = latest if when is None else min(when, latest)
+            if when is not None:
+                self.wake(when)
+
+    def stop(self):
+        """Cancel the pending poll"""
+        if self._pending is not None:
+            self._after_cancel(self._pending)
+            self._pending = None
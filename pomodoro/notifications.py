@@ -0,0 +1,254 @@
+"""Non-blocking notification and sound dispatch.
+
+The timer never talks to a toast library or a sound API directly. It calls
+Notifier.notify(), which puts an Alert on a bounded queue and returns; one
+worker thread owns the backends and delivers alerts in order. When the
+queue is full the alert is dropped and counted rather than stalling the
+caller.
+
+Alert sounds are rendered once into in-memory WAV (PCM) buffers and reused,
+so playing one is only a buffer hand-off to the platform player.
+
+Backends (all optional, picked per platform by default_backends()):
+
+* WindowsToastBackend - win10toast toasts on Windows
+* LibnotifyBackend - notify-send (libnotify) on Linux desktops
+* TerminalBellBackend - terminal bell plus a line on stderr, works anywhere
+* RecordingBackend - keeps every alert in a list, for tests and benchmarks
+"""
+import array
+import collections
+import functools
+import io
+import math
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+from pomodoro.instrumentation import metrics
+
+SAMPLE_RATE = 22050
+
+# Alert sounds as (frequency Hz, length ms) notes played back to back
+SOUNDS = {
+    "warning": [(440, 200)],  # gentle beep
+    "complete": [(660, 150), (880, 250)],  # rising chime
+}
+
+# enqueued_at is when notify() was called; origin is the moment the alert is
+# about (e.g. when the interval completed), for end-to-end latency
+Alert = collections.namedtuple("Alert", "title message duration sound enqueued_at origin")
+
+_STOP = object()
+
+
+@functools.lru_cache(maxsize=None)
+def render_sound(name, sample_rate=SAMPLE_RATE):
+    """Render a named sound to WAV bytes (16-bit mono PCM), cached"""
+    samples = array.array("h")
+    for frequency, length_ms in SOUNDS[name]:
+        count = int(sample_rate * length_ms / 1000)
+        fade = max(1, min(count // 10, sample_rate // 200))  # ~5 ms fade avoids clicks
+        step = 2 * math.pi * frequency / sample_rate
+        for i in range(count):
+            envelope = min(1.0, i / fade, (count - i) / fade)
+            samples.append(int(12000 * envelope * math.sin(step * i)))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+class WindowsToastBackend:
+    """Windows 10 toasts via win10toast, plus sounds via winsound"""
+
+    def __init__(self):
+        from win10toast import ToastNotifier
+        import winsound
+        self._toaster = ToastNotifier()
+        self._winsound = winsound
+
+    def show(self, alert):
+        self._toaster.show_toast(alert.title, alert.message, duration=alert.duration, threaded=True)
+
+    def play(self, name):
+        # winsound can't play memory images asynchronously; we're on the worker anyway
+        self._winsound.PlaySound(render_sound(name), self._winsound.SND_MEMORY)
+
+
+class LibnotifyBackend:
+    """Desktop notifications through notify-send, sounds through paplay/aplay"""
+
+    def __init__(self):
+        self._notify_send = shutil.which("notify-send")
+        if self._notify_send is None:
+            raise RuntimeError("notify-send not found")
+        self._player = shutil.which("paplay") or shutil.which("aplay")
+        self._children = []
+
+    def _spawn(self, args, data=None):
+        # Reap finished children without ever waiting on a running one
+        self._children = [child for child in self._children if child.poll() is None]
+        child = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE if data is not None else subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if data is not None:
+            child.stdin.write(data)
+            child.stdin.close()
+        self._children.append(child)
+
+    def show(self, alert):
+        self._spawn([self._notify_send, "-t", str(int(alert.duration * 1000)), alert.title, alert.message])
+
+    def play(self, name):
+        if self._player is None:
+            sys.stderr.write("\a")
+            sys.stderr.flush()
+        else:
+            self._spawn([self._player], render_sound(name))
+
+
+class TerminalBellBackend:
+    """Ring the terminal bell and print the alert; the fallback everywhere"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def show(self, alert):
+        print(f"[{alert.title}] {alert.message}", file=self.stream)
+
+    def play(self, name):
+        self.stream.write("\a")
+        self.stream.flush()
+
+
+class RecordingBackend:
+    """Remember every delivered alert and sound instead of showing them"""
+
+    def __init__(self):
+        self.alerts = []
+        self.sounds = []
+
+    def show(self, alert):
+        self.alerts.append(alert)
+
+    def play(self, name):
+        self.sounds.append(name)
+
+
+def default_backends():
+    """The best available backend for this platform, falling back to the bell"""
+    candidates = []
+    if sys.platform == "win32":
+        candidates.append(WindowsToastBackend)
+    elif sys.platform.startswith("linux"):
+        candidates.append(LibnotifyBackend)
+    for backend in candidates:
+        try:
+            return [backend()]
+        except Exception as e:
+            print(f"Notification backend {backend.__name__} unavailable: {e}")
+    return [TerminalBellBackend()]
+
+
+class Notifier:
+    """Bounded alert queue delivered by one worker thread that owns the backends"""
+
+    def __init__(self, backends=None, maxsize=32, clock=time.monotonic):
+        # Backends are created on the worker unless given, so slow imports
+        # and setup never run on the caller's thread
+        self._backends = backends
+        self.clock = clock
+        self._queue = queue.Queue(maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.delivered = 0
+        self.dropped = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.on_delivered = None  # optional callback(alert, latency) on the worker
+
+    def notify(self, title=None, message=None, duration=5, sound=None, since=None):
+        """Queue a toast (when title is given) and/or a sound; never blocks
+
+        since is the clock time of the event being announced, if earlier than
+        now. Returns False if the queue was full and the alert was dropped.
+        """
+        if self._thread is None:
+            self._start()
+        now = self.clock()
+        try:
+            self._queue.put_nowait(Alert(title, message, duration, sound, now, now if since is None else since))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pomodoro-notifier")
+                self._thread.daemon = True  # Allow the thread to be terminated when the main program exits
+                self._thread.start()
+
+    def _run(self):
+        if self._backends is None:
+            self._backends = default_backends()
+        for name in SOUNDS:
+            render_sound(name)  # pre-render so the first alert isn't slower
+
+        while True:
+            alert = self._queue.get()
+            if alert is _STOP:
+                return
+            for backend in self._backends:
+                try:
+                    if alert.title is not None:
+                        backend.show(alert)
+                    if alert.sound is not None:
+                        backend.play(alert.sound)
+                except Exception as e:
+                    print(f"Error delivering notification: {e}")
+            now = self.clock()
+            latency = now - alert.enqueued_at
+            if metrics.enabled:
+                metrics.alert_latency.observe(now - alert.origin)
+            self.delivered += 1
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+            if self.on_delivered is not None:
+                self.on_delivered(alert, latency)
+
+    def metrics(self):
+        """Delivery counters and enqueue-to-delivery latency in seconds"""
+        return {
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "mean_latency": self.total_latency / self.delivered if self.delivered else 0.0,
+            "max_latency": self.max_latency,
+        }
+
+    def close(self, timeout=2.0):
+        """Deliver what is queued (up to timeout) and stop the worker"""
+        if self._thread is not None:
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                return
+            self._thread.join(timeout)
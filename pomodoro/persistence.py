@@ -0,0 +1,129 @@
+"""Write-behind, atomic JSON persistence for the settings and other state files.
+
+save() only records a snapshot of the settings and returns; a background
+thread waits briefly for further changes, so a burst of saves turns into a
+single write. Each write goes to a temporary file in the same directory,
+is fsynced and then renamed over the real file, so a crash leaves either
+the old or the new settings on disk, never a truncated file.
+"""
+import json
+import os
+import threading
+import time
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON to path via temp file, fsync and atomic rename"""
+    import tempfile  # only needed on the writer thread; keeps startup imports light
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Make the rename itself durable (not possible on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class SettingsStore:
+    """Coalescing background writer for a JSON settings file
+
+    name says what the file holds, in the writer thread's name and errors.
+    """
+
+    def __init__(self, path, delay=0.25, name="settings"):
+        self.path = path
+        self.name = name
+        self.delay = delay  # how long to wait for more changes before writing
+        self._condition = threading.Condition()
+        self._pending = None  # latest unsaved snapshot
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+        self._thread = None
+        self.writes = 0  # number of files actually written
+        self.saves = 0  # number of save() calls
+
+    def load(self):
+        """Return the saved settings document, or None if there is none"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, document):
+        """Schedule a write of a snapshot of document; returns immediately
+
+        Pass Settings.to_json(), which is already a fresh copy.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"{self.name} store is closed")
+            self._pending = dict(document)
+            self.saves += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"pomodoro-{self.name}")
+                self._thread.daemon = True  # close() flushes; don't hold up exit otherwise
+                self._thread.start()
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                # Let a burst of changes settle; flush() and close() cut it short
+                deadline = time.monotonic() + self.delay
+                while not (self._closed or self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                snapshot, self._pending = self._pending, None
+                self._writing = True
+            try:
+                write_json_atomic(self.path, snapshot)
+                self.writes += 1
+            except Exception as e:
+                print(f"Error saving {self.name}: {e}")
+            finally:
+                with self._condition:
+                    self._writing = False
+                    if self._pending is None:
+                        self._flush_requested = False
+                    self._condition.notify_all()
+
+    def flush(self):
+        """Block until every save() so far is durably on disk"""
+        with self._condition:
+            if self._pending is None and not self._writing:
+                return
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._pending is not None or self._writing:
+                self._condition.wait()
+
+    def close(self):
+        """Flush pending changes and stop the writer thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,289 @@
+"""Plugins: your own code run when the timer starts, pauses, warns, completes or skips.
+
+Installed packages add plugins through the "pomodoro.plugins" entry point
+group. Each entry point is named after the hook it subscribes to and
+points to a callable taking one typed event, e.g. in a plugin's
+pyproject.toml:
+
+    [project.entry-points."pomodoro.plugins"]
+    complete = "door_light:interval_completed"
+    start = "door_light:timer_started"
+
+Hooks and their events:
+
+    start     TimerStarted(mode, task, time_left)   an interval started or resumed
+    pause     TimerPaused(mode, task, time_left)
+    warning   WarningShown(mode, time_left)         the end-of-interval warning
+    complete  IntervalCompleted(record, next_mode)  record is an IntervalRecord
+    skip      IntervalSkipped(record, next_mode)    record is None if it never ran
+
+Entry points are read after the window is up, and a plugin's module is
+only imported the first time one of its events happens.
+
+The timer never waits for a plugin. PluginRegistry.table maps each hook
+that has subscribers to a tuple of them, rebuilt whenever they change, so
+the listener only checks whether an event is in it; with no plugins the
+table is empty. Events are queued per plugin (at most QUEUE_LIMIT, oldest
+dropped) and run on at most WORKERS daemon threads, each plugin's in
+order and never two at once. A call running longer than the plugin's
+timeout is reported, and that plugin's events are dropped until it
+returns (Python can't stop the call); being daemon threads, a plugin that
+never returns doesn't keep the app from quitting.
+"""
+import collections
+import queue
+import threading
+import time
+
+ENTRY_POINT_GROUP = "pomodoro.plugins"
+WORKERS = 4  # threads plugins run on
+TIMEOUT = 5.0  # seconds a plugin call may take, unless the plugin sets its own
+QUEUE_LIMIT = 100  # events waiting per plugin
+
+
+class TimerStarted(collections.namedtuple("TimerStarted", "mode task time_left")):
+    """An interval started, or resumed after a pause"""
+    __slots__ = ()
+    hook = "start"
+
+    @classmethod
+    def from_session(cls, session, data):
+        return cls(session.current_mode, session.task, session.time_left)
+
+
+class TimerPaused(collections.namedtuple("TimerPaused", "mode task time_left")):
+    """The running interval was paused"""
+    __slots__ = ()
+    hook = "pause"
+
+    @classmethod
+    def from_session(cls, session, data):
+        return cls(session.current_mode, session.task, session.time_left)
+
+
+class WarningShown(collections.namedtuple("WarningShown", "mode time_left")):
+    """The interval is about to end"""
+    __slots__ = ()
+    hook = "warning"
+
+    @classmethod
+    def from_session(cls, session, data):
+        return cls(session.current_mode, session.time_left)
+
+
+class IntervalCompleted(collections.namedtuple("IntervalCompleted", "record next_mode")):
+    """An interval ran to the end"""
+    __slots__ = ()
+    hook = "complete"
+
+    @classmethod
+    def from_session(cls, session, data):
+        return cls(data, session.current_mode)
+
+
+class IntervalSkipped(collections.namedtuple("IntervalSkipped", "record next_mode")):
+    """An interval was skipped (record is None if it never started)"""
+    __slots__ = ()
+    hook = "skip"
+
+    @classmethod
+    def from_session(cls, session, data):
+        return cls(data, session.current_mode)
+
+
+# Hook (the session event it follows) -> event type
+HOOKS = {event.hook: event for event in (TimerStarted, TimerPaused, WarningShown, IntervalCompleted, IntervalSkipped)}
+
+
+class Plugin:
+    """One subscriber to one hook, with its queue of events and counters"""
+
+    __slots__ = (
+        "name", "hook", "callback", "loader", "timeout", "queue", "scheduled",
+        "running_since", "overrun", "calls", "dropped", "errors", "overruns",
+    )
+
+    def __init__(self, name, hook, callback=None, loader=None, timeout=None):
+        self.name = name
+        self.hook = hook
+        self.callback = callback
+        self.loader = loader  # imports the callback on first use (entry points)
+        self.timeout = timeout
+        self.queue = collections.deque(maxlen=QUEUE_LIMIT)
+        self.scheduled = False  # a worker has (or will) run the queue
+        self.running_since = None  # monotonic time the current call began
+        self.overrun = False  # the current call has run past the timeout
+
+        self.calls = 0
+        self.dropped = 0
+        self.errors = 0
+        self.overruns = 0
+
+    def __repr__(self):
+        return f"<Plugin {self.name} on {self.hook}>"
+
+
+class PluginRegistry:
+    """Plugins by hook, and the worker pool they run on"""
+
+    def __init__(self, workers=WORKERS, timeout=TIMEOUT, group=ENTRY_POINT_GROUP):
+        self.workers = workers
+        self.timeout = timeout
+        self.group = group
+        self.plugins = []
+        self.table = {}  # hook -> tuple of its plugins; only hooks with any
+        self._lock = threading.Lock()
+        self._ready = queue.SimpleQueue()  # plugins with events to run, for the workers
+        self._threads = []
+
+    def __len__(self):
+        return len(self.plugins)
+
+    # Subscribing
+
+    def subscribe(self, hook, callback, name=None, timeout=None):
+        """Call callback(event) on the worker pool after every hook event; returns the Plugin"""
+        return self._add(Plugin(name or getattr(callback, "__qualname__", repr(callback)), hook, callback,
+                                timeout=timeout))
+
+    def unsubscribe(self, plugin):
+        with self._lock:
+            if plugin in self.plugins:
+                self.plugins.remove(plugin)
+                self._rebuild()
+
+    def _add(self, plugin):
+        if plugin.hook not in HOOKS:
+            raise ValueError(f"unknown plugin hook {plugin.hook!r} (expected one of {', '.join(HOOKS)})")
+        with self._lock:
+            self.plugins.append(plugin)
+            self._rebuild()
+        return plugin
+
+    def _rebuild(self):
+        # A new dict each time, so the listener never sees one half-built
+        table = {}
+        for plugin in self.plugins:
+            table[plugin.hook] = table.get(plugin.hook, ()) + (plugin,)
+        self.table = table
+
+    def load_entry_points(self):
+        """Subscribe every plugin installed under the entry point group; returns how many
+
+        Only the entry points are read here; each plugin's module is
+        imported by a worker the first time its hook fires.
+        """
+        from importlib.metadata import entry_points
+        found = entry_points()
+        if hasattr(found, "select"):
+            found = found.select(group=self.group)
+        else:
+            found = found.get(self.group, ())  # Python 3.8 and 3.9
+        added = 0
+        for entry_point in found:
+            try:
+                self._add(Plugin(entry_point.value, entry_point.name, loader=entry_point.load))
+                added += 1
+            except ValueError as e:
+                print(f"Skipping plugin {entry_point.value}: {e}")
+        return added
+
+    # Dispatch (on the thread that owns the timer)
+
+    def dispatch(self, session, event, data):
+        """Pass a session listener event to the plugins on its hook
+
+        Callers check `event in registry.table` first, so an event nobody
+        subscribed to never gets this far.
+        """
+        plugins = self.table.get(event)
+        if plugins:
+            self.emit(HOOKS[event].from_session(session, data), plugins)
+
+    def emit(self, event, plugins=None):
+        """Queue a typed event for its plugins (without waiting for any of them)"""
+        if plugins is None:
+            plugins = self.table.get(event.hook, ())
+        now = None
+        for plugin in plugins:
+            if plugin.running_since is not None:
+                now = now or time.monotonic()
+                if now - plugin.running_since > (plugin.timeout or self.timeout):
+                    # Stuck past its timeout: drop rather than pile up behind it
+                    if not plugin.overrun:
+                        plugin.overrun = True
+                        plugin.overruns += 1
+                        print(f"Plugin {plugin.name} has run for {now - plugin.running_since:.1f} s; "
+                              f"dropping its events until it returns")
+                    plugin.dropped += 1
+                    continue
+            if len(plugin.queue) == QUEUE_LIMIT:
+                plugin.dropped += 1  # the oldest goes
+            plugin.queue.append(event)
+            if not plugin.scheduled:
+                with self._lock:
+                    if plugin.scheduled:
+                        continue
+                    plugin.scheduled = True
+                self._ready.put(plugin)
+                if len(self._threads) < self.workers:
+                    self._start_worker()
+
+    def _start_worker(self):
+        # Daemon threads: concurrent.futures would join a hung plugin at exit
+        thread = threading.Thread(target=self._work, name=f"pomodoro-plugin-{len(self._threads)}", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _work(self):
+        while True:
+            plugin = self._ready.get()
+            if plugin is None:
+                return
+            self._run(plugin)
+
+    def _run(self, plugin):
+        """Work through one plugin's queue (on a worker thread)"""
+        if plugin.callback is None:
+            try:
+                plugin.callback = plugin.loader()
+            except Exception as e:
+                print(f"Plugin {plugin.name} could not be loaded, dropping it: {e}")
+                self.unsubscribe(plugin)
+                return
+            plugin.timeout = plugin.timeout or getattr(plugin.callback, "timeout", None)
+
+        while True:
+            try:
+                event = plugin.queue.popleft()
+            except IndexError:
+                # Let go, then look again: an event queued after that look
+                # finds the plugin unscheduled and schedules it itself
+                plugin.scheduled = False
+                if not plugin.queue:
+                    return
+                with self._lock:
+                    if plugin.scheduled:
+                        return
+                    plugin.scheduled = True
+                continue
+
+            try:
+                plugin.running_since = time.monotonic()
+                plugin.callback(event)
+            except Exception as e:
+                plugin.errors += 1
+                print(f"Plugin {plugin.name} failed on {event.hook}: {e}")
+            finally:
+                plugin.running_since = None
+                plugin.overrun = False
+                plugin.calls += 1
+
+    def close(self):
+        """Stop taking events; calls already running are left to finish (or not)"""
+        with self._lock:
+            self.plugins = []
+            self.table = {}
+        for _ in self._threads:
+            self._ready.put(None)
+        self._threads = []
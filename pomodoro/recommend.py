@@ -0,0 +1,266 @@
+"""Interval lengths suggested from how the user's sessions actually end.
+
+Recommender watches intervals finish and keeps a few running statistics,
+each updated in O(1) per interval, never by going back over the history:
+
+* EWMAs (exponentially weighted moving averages) of how often work
+  intervals are completed, how often they were paused close to the end,
+  how often breaks are skipped, and how late the user comes back from a
+  break. Recent habits count most.
+* A P-square streaming estimate of the median time into a work interval at
+  which the user gives up on it (resets or skips), i.e. their usual
+  focus span.
+
+suggest() turns those into work and break lengths (whole minutes, work in
+steps of 5) and a short reason to show alongside. The state is a small
+JSON document, saved after every interval, so nothing is recomputed on
+start either.
+"""
+import bisect
+import collections
+import json
+import math
+import threading
+
+from pomodoro.persistence import write_json_atomic
+from pomodoro.settings import SCHEMA
+
+ALPHA = 0.1  # weight of the newest interval in the EWMAs (about the last 20 count)
+MIN_INTERVALS = 5  # work intervals seen before suggesting anything
+SEED_INTERVALS = 500  # recent history fed to a new recommender
+LONGEST_GAP = 3600  # seconds after a break beyond which the user is done for the day, not late
+
+Suggestion = collections.namedtuple("Suggestion", "work_time short_break long_break reason")
+
+
+class EWMA:
+    """Exponentially weighted moving average"""
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha=ALPHA, value=None):
+        self.alpha = alpha
+        self.value = value  # None until the first sample
+
+    def update(self, sample):
+        if self.value is None:
+            self.value = float(sample)
+        else:
+            self.value += self.alpha * (sample - self.value)
+
+
+class P2Quantile:
+    """Streaming quantile estimate in constant space (Jain and Chlamtac's P-square)
+
+    Five markers track the minimum, the p/2, p and (1+p)/2 quantiles and
+    the maximum; each sample moves them by a parabolic (or linear)
+    interpolation step.
+    """
+
+    __slots__ = ("p", "heights", "positions", "desired", "count")
+
+    def __init__(self, p=0.5):
+        self.p = p
+        self.heights = []  # marker heights; the first samples, sorted, until there are five
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.count = 0
+
+    def update(self, sample):
+        self.count += 1
+        heights = self.heights
+        if self.count <= 5:
+            bisect.insort(heights, float(sample))
+            return
+
+        if sample < heights[0]:
+            heights[0] = sample
+            cell = 0
+        elif sample >= heights[4]:
+            heights[4] = sample
+            cell = 3
+        else:
+            cell = bisect.bisect_right(heights, sample) - 1
+        positions, desired, p = self.positions, self.desired, self.p
+        for index in range(cell + 1, 5):
+            positions[index] += 1
+        for index, step in enumerate((0, p / 2, p, (1 + p) / 2, 1)):
+            desired[index] += step
+
+        for index in (1, 2, 3):
+            offset = desired[index] - positions[index]
+            if (offset >= 1 and positions[index + 1] - positions[index] > 1) or \
+                    (offset <= -1 and positions[index - 1] - positions[index] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = heights[index] + step * (heights[index + step] - heights[index]) / (
+                        positions[index + step] - positions[index])
+                heights[index] = height
+                positions[index] += step
+
+    def _parabolic(self, i, step):
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self):
+        """The estimate, or None before any sample"""
+        if not self.heights:
+            return None
+        if self.count < 5:
+            return self.heights[min(len(self.heights) - 1, int(self.p * len(self.heights)))]
+        return self.heights[2]
+
+    def to_json(self):
+        return {"p": self.p, "heights": self.heights, "positions": self.positions,
+                "desired": self.desired, "count": self.count}
+
+    @classmethod
+    def from_json(cls, data):
+        estimate = cls(data["p"])
+        estimate.heights = [float(height) for height in data["heights"]]
+        estimate.positions = list(data["positions"])
+        estimate.desired = [float(position) for position in data["desired"]]
+        estimate.count = int(data["count"])
+        return estimate
+
+
+def _clamp(name, minutes):
+    """minutes brought into the range the settings accept for name"""
+    low, high = SCHEMA[name][1:]
+    return min(max(minutes, low), high)
+
+
+class Recommender:
+    """Running statistics of finished intervals, and the lengths they point to"""
+
+    # EWMAs kept, by name
+    AVERAGES = ("completed", "late_pause", "break_skipped", "late_return")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.averages = {name: EWMA() for name in self.AVERAGES}
+        self.focus_span = P2Quantile(0.5)  # minutes into a work interval when it is given up
+        self.work_seen = 0
+        self._paused_late = False  # the running work interval was paused near its end
+        self._break_ended_at = None
+
+    # Observations
+
+    def add(self, record):
+        """Take in a finished IntervalRecord"""
+        with self._lock:
+            averages = self.averages
+            if record.mode == "work":
+                self.work_seen += 1
+                averages["completed"].update(record.outcome == "completed")
+                averages["late_pause"].update(self._paused_late)
+                self._paused_late = False
+                if record.outcome != "completed":
+                    self.focus_span.update(record.actual / 60)
+                if self._break_ended_at is not None:
+                    gap = record.started_at - self._break_ended_at
+                    if 0 <= gap < LONGEST_GAP:
+                        averages["late_return"].update(gap / 60)
+                    self._break_ended_at = None
+            else:
+                averages["break_skipped"].update(record.outcome == "skipped")
+                self._break_ended_at = record.ended_at if record.outcome == "completed" else None
+
+    def add_skip(self, mode):
+        """A skip of an interval that never started (it leaves no record)"""
+        if mode != "work":
+            with self._lock:
+                self.averages["break_skipped"].update(1)
+                self._break_ended_at = None
+
+    def add_pause(self, mode, seconds_left, warning_seconds):
+        """A pause; in a work interval close to the warning, it hints the interval is too long"""
+        if mode == "work" and seconds_left <= max(2 * warning_seconds, 120):
+            with self._lock:
+                self._paused_late = True
+
+    # Suggestions
+
+    def suggest(self, settings):
+        """Suggestion for the given Settings, or None until there is enough to go on"""
+        with self._lock:
+            if self.work_seen < MIN_INTERVALS:
+                return None
+            completed = self.averages["completed"].value
+            late_pause = self.averages["late_pause"].value
+            skipped = self.averages["break_skipped"].value
+            late = self.averages["late_return"].value
+            span = self.focus_span.value
+
+        work, reasons = settings.work_time, []
+        if completed < 0.6 and span is not None:
+            work = min(work, max(10, 5 * math.floor(span / 5)))
+            reasons.append(f"you usually stop after about {span:.0f} min")
+        elif late_pause is not None and late_pause >= 0.3:
+            work = max(10, work - 5)
+            reasons.append("you often pause near the end")
+        elif completed >= 0.85 and work < 50:
+            work = 5 * (work // 5) + 5
+            reasons.append(f"you finish {completed:.0%} of sessions")
+
+        change = 0
+        if skipped is not None and skipped >= 0.5:
+            change = -min(2, settings.short_break - 1)
+            reasons.append("you skip most breaks")
+        elif late is not None and late >= 3:
+            change = min(round(late), 10)
+            reasons.append(f"you come back about {late:.0f} min after breaks end")
+        short_break = settings.short_break + change
+        if change > 0:
+            # Longer breaks up to 30 min; one already longer stays as it is
+            short_break = min(short_break, max(30, settings.short_break))
+        long_break = max(short_break, settings.long_break + change)
+
+        if not reasons:
+            reasons.append("your sessions fit your current settings")
+        return Suggestion(
+            _clamp("work_time", work), _clamp("short_break", short_break),
+            _clamp("long_break", long_break), "; ".join(reasons),
+        )
+
+    # Persistence
+
+    def to_json(self):
+        with self._lock:
+            return {
+                "averages": {name: average.value for name, average in self.averages.items()},
+                "focus_span": self.focus_span.to_json(),
+                "work_seen": self.work_seen,
+                "break_ended_at": self._break_ended_at,
+            }
+
+    @classmethod
+    def from_json(cls, data):
+        recommender = cls()
+        for name, value in data["averages"].items():
+            if name in recommender.averages:
+                recommender.averages[name].value = value
+        recommender.focus_span = P2Quantile.from_json(data["focus_span"])
+        recommender.work_seen = int(data["work_seen"])
+        recommender._break_ended_at = data.get("break_ended_at")
+        return recommender
+
+    @classmethod
+    def load(cls, path):
+        """Recommender saved at path, or a new one (seen nothing yet) if there is none"""
+        try:
+            with open(path, "r") as f:
+                return cls.from_json(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error loading interval suggestions, starting over: {e}")
+        return cls()
+
+    def save(self, path):
+        write_json_atomic(path, self.to_json())
@@ -0,0 +1,175 @@
+"""Circular progress ring around the timer, drawn with Pillow when available.
+
+RingRenderer draws anti-aliased ring frames (a track plus an arc in the
+mode's colour) at the size the window actually shows, with one frame per
+pixel the arc's end moves along the ring and no more. Drawing one takes a
+few milliseconds, so frames are drawn the first time they are needed and
+kept in an LRU cache bounded in bytes, keyed by mode, theme and progress
+step. RingCanvas shows them by swapping the image of one Canvas item, and
+draws the next frame while the main loop is idle so the tick that needs
+it only swaps.
+
+Pillow is optional (and imported only when a RingRenderer is created, so
+it isn't part of startup): until one is attached, and without Pillow at
+all, RingCanvas draws the ring with plain Canvas arcs.
+"""
+import collections
+import math
+
+from pomodoro.view_model import MODE_LABELS
+
+DEFAULT_THEME = "dark"
+
+# Theme -> (background, track colour)
+THEMES = {
+    "dark": ("#2E2E2E", "#444444"),
+    "light": ("#F5F5F5", "#DDDDDD"),
+}
+
+SUPERSAMPLE = 4  # frames are drawn this many times larger, then scaled down for anti-aliasing
+CACHE_BYTES = 32 * 1024 * 1024  # frames kept, in bytes of pixel data
+
+
+def ring_steps(size, thickness):
+    """Progress steps worth drawing: one per pixel along the middle of the ring"""
+    return max(1, round(math.pi * (size - thickness)))
+
+
+class RingRenderer:
+    """Ring frames as images, drawn on first use and kept in an LRU cache
+
+    convert, if given, turns each drawn Pillow image into what is cached
+    and returned (ImageTk.PhotoImage in the app, which must then only be
+    used on the Tk thread).
+    """
+
+    def __init__(self, size, thickness, capacity=CACHE_BYTES, convert=None):
+        from PIL import Image, ImageDraw
+        self._image = Image
+        self._draw = ImageDraw
+        self.size = size
+        self.thickness = thickness
+        self.steps = ring_steps(size, thickness)
+        self.capacity = capacity
+        self.convert = convert
+        self.frame_bytes = size * size * 3
+        self._frames = collections.OrderedDict()  # (mode, theme, step) -> frame, least recently used first
+        self._tracks = {}  # theme -> the empty ring, drawn large
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    @property
+    def cached_bytes(self):
+        return len(self._frames) * self.frame_bytes
+
+    def frame(self, mode, step, theme=DEFAULT_THEME):
+        """The frame for step (0 to steps) of an interval in mode"""
+        key = (mode, theme, step)
+        frames = self._frames
+        frame = frames.get(key)
+        if frame is not None:
+            frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+        self.misses += 1
+        frame = self.draw(mode, step, theme)
+        if self.convert is not None:
+            frame = self.convert(frame)
+        if self.frame_bytes <= self.capacity:
+            frames[key] = frame
+            while len(frames) * self.frame_bytes > self.capacity:
+                frames.popitem(last=False)
+        return frame
+
+    def cached(self, mode, step, theme=DEFAULT_THEME):
+        return (mode, theme, step) in self._frames
+
+    def draw(self, mode, step, theme=DEFAULT_THEME):
+        """Draw one frame (uncached) as a Pillow image"""
+        track = self._tracks.get(theme)
+        if track is None:
+            track = self._tracks[theme] = self._draw_track(theme)
+        image = track.copy()
+        if step > 0:
+            scale = SUPERSAMPLE
+            inset = scale * self.thickness // 2
+            box = (inset, inset, scale * self.size - inset - 1, scale * self.size - inset - 1)
+            colour = MODE_LABELS[mode][1]
+            if step >= self.steps:
+                self._draw.Draw(image).ellipse(box, outline=colour, width=scale * self.thickness)
+            else:
+                self._draw.Draw(image).arc(
+                    box, -90, -90 + 360 * step / self.steps, fill=colour, width=scale * self.thickness
+                )
+        return image.reduce(SUPERSAMPLE)
+
+    def _draw_track(self, theme):
+        background, track = THEMES.get(theme, THEMES[DEFAULT_THEME])
+        scale = SUPERSAMPLE
+        image = self._image.new("RGB", (scale * self.size, scale * self.size), background)
+        inset = scale * self.thickness // 2
+        box = (inset, inset, scale * self.size - inset - 1, scale * self.size - inset - 1)
+        self._draw.Draw(image).ellipse(box, outline=track, width=scale * self.thickness)
+        return image
+
+
+class RingCanvas:
+    """The progress ring on a Tk Canvas, from RingRenderer frames or plain arcs"""
+
+    def __init__(self, canvas, size, thickness, theme=DEFAULT_THEME):
+        self.canvas = canvas
+        self.size = size
+        self.thickness = thickness
+        self.theme = theme if theme in THEMES else DEFAULT_THEME
+        self.steps = ring_steps(size, thickness)
+        self.renderer = None
+        self._shown = None  # (mode, step) on screen
+
+        # Plain arcs until a renderer is attached
+        background, track = THEMES[self.theme]
+        canvas.config(width=size, height=size, bg=background, highlightthickness=0)
+        inset = thickness / 2
+        box = (inset, inset, size - inset, size - inset)
+        self._track = canvas.create_oval(*box, outline=track, width=thickness)
+        self._arc = canvas.create_arc(*box, start=90, extent=0, style="arc", outline=track, width=thickness)
+        self._image = None
+        self._frame = None
+
+    def use_renderer(self, renderer):
+        """Show frames from renderer (of the same size and steps) instead of arcs"""
+        self.renderer = renderer
+        self.canvas.delete(self._track, self._arc)
+        self._image = self.canvas.create_image(self.size // 2, self.size // 2)
+        if self._shown is not None:
+            shown, self._shown = self._shown, None
+            self.show(*shown)
+
+    def show(self, mode, step, upcoming=None):
+        """Show step (0 to steps) of an interval in mode
+
+        upcoming is the step the next tick will likely need; it is drawn
+        while the main loop is idle, so that tick finds it cached.
+        """
+        if (mode, step) == self._shown:
+            return
+        self._shown = (mode, step)
+        renderer = self.renderer
+        if renderer is None:
+            extent = -359.9 if step >= self.steps else -360 * step / self.steps
+            self.canvas.itemconfig(self._arc, extent=extent, outline=MODE_LABELS[mode][1])
+            return
+
+        # Hold on to the shown frame: Tk blanks an image once Python drops it,
+        # and the cache may evict this one
+        self._frame = renderer.frame(mode, step, self.theme)
+        self.canvas.itemconfig(self._image, image=self._frame)
+        if upcoming is not None and upcoming != step and not renderer.cached(mode, upcoming, self.theme):
+            self.canvas.after_idle(self._prefetch, mode, upcoming)
+
+    def _prefetch(self, mode, step):
+        if self._shown is not None and self._shown[0] == mode:
+            self.renderer.frame(mode, step, self.theme)
@@ -0,0 +1,176 @@
+"""Precompiled interval schedule ("where will I be at time t?").
+
+IntervalSchedule lays the work/break cycle out from the current interval
+onward, assuming each interval starts as soon as the previous one ends, as
+flat arrays of start and end times (wall-clock epoch seconds). Queries are
+binary searches over those arrays:
+
+* at(t) - the interval running at time t
+* next_start(mode, after) - e.g. when the next long break begins
+* count_between(a, b, mode) - how many work blocks fit entirely in [a, b]
+
+update(session) keeps the plan in line with the live session. If the
+current interval still ends where the plan says, nothing happens. After a
+pause, skip, reset or settings change, the plan is cut at the current
+interval and only the rest is laid out again; earlier entries stay.
+"""
+import array
+import bisect
+import collections
+import time
+
+from pomodoro.engine import next_mode
+from pomodoro.settings import Settings
+
+MODES = ("work", "short_break", "long_break")
+MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+
+Interval = collections.namedtuple("Interval", "mode start end")
+
+
+class IntervalSchedule:
+    """Interval boundaries over a time horizon, with O(log n) queries"""
+
+    def __init__(self, settings, horizon=24 * 3600):
+        self.settings = Settings.coerce(settings)
+        self.horizon = horizon
+        self._signature = None  # settings the rest of the plan was built with
+
+        self.starts = array.array("d")
+        self.ends = array.array("d")
+        self.modes = array.array("b")
+        self.cycles = array.array("h")  # completed work cycles during each interval
+        # Per-mode start/end times, for next_start() and count_between()
+        self.mode_starts = {mode: array.array("d") for mode in MODES}
+        self.mode_ends = {mode: array.array("d") for mode in MODES}
+
+    @classmethod
+    def compile(cls, settings, start, horizon=24 * 3600, mode="work", completed_cycles=0, first_end=None):
+        """Lay out the plan from an interval starting at start
+
+        first_end overrides where the first interval ends (for a partly run one).
+        """
+        schedule = cls(settings, horizon)
+        if first_end is None:
+            first_end = start + schedule.settings.seconds_for(mode)
+        schedule._extend(start, first_end, mode, completed_cycles, start + horizon)
+        return schedule
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _settings_signature(self):
+        settings = self.settings
+        return tuple(settings.seconds_for(mode) for mode in MODES) + (settings.cycles_before_long_break,)
+
+    def _extend(self, start, end, mode, cycles, until):
+        settings = self.settings
+        lengths = {mode: settings.seconds_for(mode) for mode in MODES}
+        cycles_before_long_break = settings.cycles_before_long_break
+        self._signature = self._settings_signature()
+
+        starts, ends, modes, all_cycles = self.starts, self.ends, self.modes, self.cycles
+        mode_starts, mode_ends = self.mode_starts, self.mode_ends
+        while True:
+            starts.append(start)
+            ends.append(end)
+            modes.append(MODE_CODES[mode])
+            all_cycles.append(cycles)
+            mode_starts[mode].append(start)
+            mode_ends[mode].append(end)
+            if end >= until:
+                return
+            mode, cycles = next_mode(mode, cycles, cycles_before_long_break)
+            start, end = end, end + lengths[mode]
+
+    def _continue(self, until):
+        """Lay out more intervals after the last one"""
+        mode, cycles = next_mode(
+            MODES[self.modes[-1]], self.cycles[-1], self.settings.cycles_before_long_break
+        )
+        start = self.ends[-1]
+        self._extend(start, start + self.settings.seconds_for(mode), mode, cycles, until)
+
+    def _truncate(self, index):
+        """Drop the intervals from index onward"""
+        if index >= len(self.starts):
+            return
+        cut = self.starts[index]
+        for mode in MODES:
+            keep = bisect.bisect_left(self.mode_starts[mode], cut)
+            del self.mode_starts[mode][keep:]
+            del self.mode_ends[mode][keep:]
+        del self.starts[index:]
+        del self.ends[index:]
+        del self.modes[index:]
+        del self.cycles[index:]
+
+    def index_at(self, t):
+        """Index of the interval running at time t, or None"""
+        index = bisect.bisect_right(self.starts, t) - 1
+        if index >= 0 and t < self.ends[index]:
+            return index
+        return None
+
+    def at(self, t):
+        """The Interval running at time t, or None outside the plan"""
+        index = self.index_at(t)
+        if index is None:
+            return None
+        return Interval(MODES[self.modes[index]], self.starts[index], self.ends[index])
+
+    def next_start(self, mode, after):
+        """Start time of the first interval of mode beginning after time after, or None"""
+        starts = self.mode_starts[mode]
+        index = bisect.bisect_right(starts, after)
+        return starts[index] if index < len(starts) else None
+
+    def count_between(self, begin, end, mode="work"):
+        """Number of intervals of mode lying entirely within [begin, end]"""
+        first = bisect.bisect_left(self.mode_starts[mode], begin)
+        last = bisect.bisect_right(self.mode_ends[mode], end)
+        return max(0, last - first)
+
+    def update(self, session, now=None):
+        """Bring the plan in line with the session; returns True if it changed
+
+        The session's current interval is placed to end when its countdown
+        will (now plus the time left), and the plan after it is rebuilt.
+        """
+        if now is None:
+            now = time.time()
+        end = now + session.timer.remaining_exact()
+        start = end - session.timer.duration
+        mode = session.current_mode
+        cycles = session.completed_cycles
+
+        index = bisect.bisect_right(self.starts, now) - 1
+        if index < 0:
+            index = 0
+        elif self.ends[index] <= now:
+            index += 1
+
+        if (
+            index < len(self.starts)
+            and self.modes[index] == MODE_CODES[mode]
+            and self.cycles[index] == cycles
+            and abs(self.ends[index] - end) < 1.0
+            and self._signature == self._settings_signature()
+        ):
+            # Still on plan; just keep a full horizon laid out ahead
+            if self.ends[-1] < now + self.horizon:
+                self._continue(now + self.horizon)
+            return False
+
+        self._truncate(index)
+        if self.ends and start < self.ends[-1]:
+            start = self.ends[-1]  # don't overlap what already happened
+        self._extend(start, end, mode, cycles, now + self.horizon)
+        return True
+
+    def intervals(self, begin=None, end=None):
+        """Iterate the Intervals overlapping [begin, end]"""
+        first = 0 if begin is None else max(0, bisect.bisect_right(self.ends, begin))
+        last = len(self.starts) if end is None else bisect.bisect_left(self.starts, end)
+        for index in range(first, last):
+            yield Interval(MODES[self.modes[index]], self.starts[index], self.ends[index])
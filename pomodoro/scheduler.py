@@ -0,0 +1,139 @@
+"""Single-threaded scheduler driving many PomodoroSessions.
+
+All sessions share one min-heap of (wakeup time, sequence, generation,
+session) entries and one worker thread that sleeps until the earliest
+wakeup. Alternatively a GUI main loop can drive the heap without the worker
+(see pomodoro.mailbox.MainLoopDriver), so ticks run on the thread that owns
+the sessions. Rescheduling a session bumps its generation instead of searching the
+heap, so entries left behind by a pause or reset are dropped when popped.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from pomodoro.instrumentation import metrics
+
+
+class SessionScheduler:
+    """Drive any number of sessions from one heap and one worker thread"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.sessions = set()
+        self.wake = None  # wake(when), called when the earliest wakeup moves earlier, for main loop drivers
+
+        # Dispatch statistics: how late ticks run compared to their wakeup time
+        self.dispatched = 0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+
+    def add(self, session):
+        """Attach a session; it is scheduled whenever it starts running"""
+        session.scheduler = self
+        session.clock = self.clock
+        session.timer.clock = self.clock
+        self.sessions.add(session)
+        self.reschedule(session)
+
+    def remove(self, session):
+        """Detach a session; any pending wakeup is discarded"""
+        with self._condition:
+            session.generation += 1
+            session.scheduler = None
+            self.sessions.discard(session)
+
+    def reschedule(self, session, when=None):
+        """Replace the session's pending wakeup with a new one (or none)"""
+        if when is None:
+            when = session.next_wakeup()
+        earliest = False
+        with self._condition:
+            session.generation += 1
+            if when is not None:
+                heapq.heappush(self._heap, (when, next(self._sequence), session.generation, session))
+                if self._heap[0][3] is session:
+                    earliest = True
+                    self._condition.notify()
+        if earliest and self.wake is not None:
+            self.wake(when)
+
+    def next_due(self):
+        """Clock time of the earliest pending wakeup, or None"""
+        with self._condition:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap and heap[0][2] != heap[0][3].generation:
+            heapq.heappop(heap)
+
+    def _pop_due(self, now):
+        due = []
+        heap = self._heap
+        with self._condition:
+            while heap and heap[0][0] <= now:
+                when, _, generation, session = heapq.heappop(heap)
+                if generation == session.generation:
+                    due.append((when, session))
+        return due
+
+    def run_pending(self, now=None):
+        """Tick every session whose wakeup is due; returns how many ran"""
+        if now is None:
+            now = self.clock()
+        due = self._pop_due(now)
+        for when, session in due:
+            lateness = now - when
+            self.dispatched += 1
+            self.total_lateness += lateness
+            if lateness > self.max_lateness:
+                self.max_lateness = lateness
+            if metrics.enabled:
+                metrics.tick_lateness.observe(lateness)
+
+            # Sessions are ticked outside the lock so listeners may call back
+            # into the session (and so into reschedule) freely
+            generation = session.generation
+            next_wakeup = session.tick()
+            if next_wakeup is not None and session.generation == generation:
+                self.reschedule(session, next_wakeup)
+        return len(due)
+
+    def start(self):
+        """Start the worker thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="pomodoro-scheduler")
+            self._thread.daemon = True  # Allow the thread to be terminated when the main program exits
+            self._thread.start()
+
+    def stop(self):
+        """Stop the worker thread and wait for it to finish"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    self._discard_stale()
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    delay = self._heap[0][0] - self.clock()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if self._stopped:
+                    return
+            self.run_pending()
@@ -0,0 +1,289 @@
+"""Typed, validated settings with named profiles.
+
+Settings keeps every value in a slot, so the timer reads attributes
+instead of looking up string keys in a dict. Derived values that the timer
+needs on every wakeup (mode_seconds, the length of each mode, and
+warning_seconds) are plain attributes too, recomputed only when a timing
+setting changes.
+
+Every value is checked against SCHEMA when it is set, whether by the
+settings dialog, the daemon or a settings file. A bad value in a file is
+reported and replaced by its default instead of surfacing later in the
+middle of a tick.
+
+The timing values (PROFILE_FIELDS) belong to a named profile, such as
+"deep work" or "light day". use_profile() switches between profiles in
+memory. The rest (sound, notifications, theme) is shared by all profiles.
+
+On disk the settings are a versioned document:
+
+    {"version": 2, "profile": "default",
+     "profiles": {"default": {"work_time": 25, ...}, ...},
+     "sound_enabled": true, ...}
+
+Older files are upgraded step by step through MIGRATIONS when loaded.
+"""
+
+# Default settings
+DEFAULT_SETTINGS = {
+    "work_time": 25,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "sound_enabled": True,
+    "notification_enabled": True,
+    "warning_time": 1,  # minutes before end to show warning
+    "theme": "dark"
+}
+
+# Setting -> (type, lowest allowed, highest allowed); bounds apply to ints only
+SCHEMA = {
+    "work_time": (int, 1, 240),
+    "short_break": (int, 1, 120),
+    "long_break": (int, 1, 240),
+    "cycles_before_long_break": (int, 1, 20),
+    "warning_time": (int, 0, 60),
+    "sound_enabled": (bool, None, None),
+    "notification_enabled": (bool, None, None),
+    "theme": (str, None, None),
+}
+
+# Settings that belong to a profile; the others are shared
+PROFILE_FIELDS = ("work_time", "short_break", "long_break", "cycles_before_long_break", "warning_time")
+
+DEFAULT_PROFILE = "default"
+
+# Profiles every settings file starts out with
+BUILTIN_PROFILES = {
+    "default": {name: DEFAULT_SETTINGS[name] for name in PROFILE_FIELDS},
+    "deep work": {"work_time": 50, "short_break": 10, "long_break": 30, "cycles_before_long_break": 3, "warning_time": 2},
+    "light day": {"work_time": 15, "short_break": 5, "long_break": 15, "cycles_before_long_break": 4, "warning_time": 1},
+}
+
+SETTINGS_VERSION = 2
+
+
+class SettingsError(ValueError):
+    """A setting is unknown or its value is out of range"""
+
+
+def validate(name, value):
+    """Return value if it is allowed for setting name, else raise SettingsError"""
+    try:
+        kind, low, high = SCHEMA[name]
+    except KeyError:
+        raise SettingsError(f"unknown setting: {name}") from None
+    # bool is a subclass of int; don't let true/false pass for a number
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise SettingsError(f"{name} must be {kind.__name__}, not {type(value).__name__}")
+    if low is not None and value < low:
+        raise SettingsError(f"{name} must be at least {low}")
+    if high is not None and value > high:
+        raise SettingsError(f"{name} must be at most {high}")
+    return value
+
+
+def _migrate_0_to_1(document):
+    """Flat dict (before versioning) -> timing values in the "default" profile"""
+    profiles = {name: dict(values) for name, values in BUILTIN_PROFILES.items()}
+    profiles[DEFAULT_PROFILE].update(
+        {name: document.pop(name) for name in PROFILE_FIELDS if name in document}
+    )
+    document.update(version=1, profile=DEFAULT_PROFILE, profiles=profiles)
+    return document
+
+
+def _migrate_1_to_2(document):
+    """completed_sessions moved to the per-device counter (pomodoro.sync)
+
+    The old value is left in the document for DeviceSync.adopt_count();
+    Settings ignores it.
+    """
+    document["version"] = 2
+    return document
+
+
+# MIGRATIONS[n] turns a version n document into a version n + 1 one
+MIGRATIONS = [_migrate_0_to_1, _migrate_1_to_2]
+
+
+def migrate(document):
+    """Upgrade a saved settings document to SETTINGS_VERSION"""
+    document = dict(document)
+    version = document.get("version", 0)
+    if not isinstance(version, int) or version < 0:
+        raise SettingsError(f"bad settings version: {version!r}")
+    if version > SETTINGS_VERSION:
+        print(f"Settings file is from a newer version ({version}); unknown settings are ignored")
+    while version < SETTINGS_VERSION:
+        document = MIGRATIONS[version](document)
+        version = document["version"]
+    return document
+
+
+class Settings:
+    """Current settings, with the timing values of the active profile"""
+
+    __slots__ = tuple(SCHEMA) + ("profile", "profiles", "revision", "mode_seconds", "warning_seconds")
+
+    def __init__(self, **values):
+        for name, value in DEFAULT_SETTINGS.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "profile", DEFAULT_PROFILE)
+        object.__setattr__(self, "profiles", {name: dict(values) for name, values in BUILTIN_PROFILES.items()})
+        object.__setattr__(self, "revision", 0)  # bumped on every change
+        self._derive()
+        self.update(values)
+
+    @classmethod
+    def coerce(cls, settings):
+        """Settings as they are, or built from a plain dict of overrides"""
+        if isinstance(settings, cls):
+            return settings
+        return cls(**settings)
+
+    @classmethod
+    def from_json(cls, document):
+        settings = cls()
+        settings.restore(document)
+        return settings
+
+    def __setattr__(self, name, value):
+        if name in SCHEMA:
+            validate(name, value)
+            object.__setattr__(self, name, value)
+            if name in PROFILE_FIELDS:
+                self.profiles[self.profile][name] = value
+                self._derive()
+            object.__setattr__(self, "revision", self.revision + 1)
+        else:
+            object.__setattr__(self, name, value)
+
+    def _derive(self):
+        """Recompute the values in seconds after a timing setting changed"""
+        object.__setattr__(self, "mode_seconds", {
+            "work": self.work_time * 60,
+            "short_break": self.short_break * 60,
+            "long_break": self.long_break * 60,
+        })
+        object.__setattr__(self, "warning_seconds", self.warning_time * 60)
+
+    def seconds_for(self, mode):
+        """Full length of an interval in the given mode, in seconds"""
+        return self.mode_seconds[mode]
+
+    # Dict-style access, for code that picks settings by name
+
+    def __getitem__(self, name):
+        if name not in SCHEMA:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        if name not in SCHEMA:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return name in SCHEMA
+
+    def __iter__(self):
+        return iter(SCHEMA)
+
+    def keys(self):
+        return SCHEMA.keys()
+
+    def get(self, name, default=None):
+        return getattr(self, name) if name in SCHEMA else default
+
+    def update(self, changes):
+        """Set several settings at once; nothing changes if any value is bad"""
+        for name, value in changes.items():
+            validate(name, value)
+        for name, value in changes.items():
+            setattr(self, name, value)
+
+    def to_dict(self):
+        """The current values as a flat dict"""
+        return {name: getattr(self, name) for name in SCHEMA}
+
+    # Profiles
+
+    def use_profile(self, name):
+        """Switch to the timing values of another profile"""
+        if name not in self.profiles:
+            raise SettingsError(f"unknown profile: {name}")
+        object.__setattr__(self, "profile", name)
+        for field, value in self.profiles[name].items():
+            object.__setattr__(self, field, value)
+        self._derive()
+        object.__setattr__(self, "revision", self.revision + 1)
+
+    def save_profile(self, name):
+        """Store the current timing values as profile name and switch to it"""
+        if not name:
+            raise SettingsError("profile name must not be empty")
+        self.profiles[name] = {field: getattr(self, field) for field in PROFILE_FIELDS}
+        self.use_profile(name)
+
+    def delete_profile(self, name):
+        if name == self.profile:
+            raise SettingsError("cannot delete the profile in use")
+        self.profiles.pop(name, None)
+        object.__setattr__(self, "revision", self.revision + 1)
+
+    # Persistence
+
+    def to_json(self):
+        """Versioned document for the settings file (a fresh copy)"""
+        document = {name: getattr(self, name) for name in SCHEMA if name not in PROFILE_FIELDS}
+        document.update(
+            version=SETTINGS_VERSION,
+            profile=self.profile,
+            profiles={name: dict(values) for name, values in self.profiles.items()},
+        )
+        return document
+
+    def restore(self, document):
+        """Replace the settings with a saved document, migrating it first
+
+        A value that fails validation is reported and left at its default.
+        """
+        if not isinstance(document, dict):
+            raise SettingsError("settings file does not hold an object")
+        document = migrate(document)
+
+        fresh = Settings()
+        for name in SCHEMA:
+            if name in document and name not in PROFILE_FIELDS:
+                try:
+                    setattr(fresh, name, document[name])
+                except SettingsError as e:
+                    print(f"Ignoring saved setting: {e}")
+
+        profiles = document.get("profiles")
+        if isinstance(profiles, dict):
+            for profile_name, values in profiles.items():
+                if not isinstance(values, dict):
+                    print(f"Ignoring saved profile {profile_name!r}: not an object")
+                    continue
+                profile = dict(BUILTIN_PROFILES.get(profile_name, BUILTIN_PROFILES[DEFAULT_PROFILE]))
+                for name in PROFILE_FIELDS:
+                    if name in values:
+                        try:
+                            profile[name] = validate(name, values[name])
+                        except SettingsError as e:
+                            print(f"Ignoring saved setting in profile {profile_name!r}: {e}")
+                fresh.profiles[profile_name] = profile
+        profile_name = document.get("profile")
+        if profile_name not in fresh.profiles:
+            profile_name = DEFAULT_PROFILE
+
+        # Copy into self in place, so everything holding this object sees it
+        for name in SCHEMA:
+            object.__setattr__(self, name, getattr(fresh, name))
+        object.__setattr__(self, "profiles", fresh.profiles)
+        self.use_profile(profile_name)
+
+    def __repr__(self):
+        return f"Settings(profile={self.profile!r}, {self.to_dict()!r})"
@@ -0,0 +1,350 @@
+"""Simulated days of Pomodoro use, for comparing timing policies.
+
+A policy is a set of the timing settings (work_time, short_break,
+long_break, cycles_before_long_break, warning_time). Simulation runs the
+real PomodoroSession on a ManualClock: the session moves between
+intervals, warns, completes, skips and resets exactly as in the app, while
+a Behaviour model plays the user - when they press Start, pause, give up
+on a work interval or skip a break. Nothing waits on real time, and with
+redraw ticks off each interval costs a handful of wakeups, so a process
+simulates thousands of days a second.
+
+The behaviour model is deliberately simple. Focus wears off: "strain"
+builds up with every minute of work and is paid back by breaks and any
+other time away (recovery minutes of work per minute), and the further
+strain runs past the
+user's attention span, the likelier they are to abandon (reset) a work
+interval. Long breaks get skipped more often than short ones, and a
+warning before a break ends brings the user back sooner. Its rates can be
+taken from recorded history (behaviour_from_history) to replay how you
+actually use the timer against other policies.
+
+sweep() fans a grid of policies out over a multiprocessing pool and
+returns one row per policy: focus minutes (in completed work intervals)
+and completed sessions per day, the share of breaks actually taken, and
+abandoned work intervals per day.
+
+    python -m pomodoro.simulate --work 20,25,30,50 --cycles 3,4 --days 365
+    python -m pomodoro.simulate --history history.sqlite3   # your recorded behaviour
+"""
+import argparse
+import collections
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import sys
+
+from pomodoro.engine import PomodoroSession
+from pomodoro.settings import BUILTIN_PROFILES, PROFILE_FIELDS, Settings
+from pomodoro.timer_core import ManualClock
+
+# How the simulated user behaves; times are minutes unless named otherwise
+Behaviour = collections.namedtuple(
+    "Behaviour",
+    "day_hours start_delay attention recovery reset_rate pause_rate pause_minutes skip_break_rate late_minutes",
+    defaults=(
+        8.0,   # day_hours: length of the working day
+        1.0,   # start_delay: mean wait before pressing Start after an interval ends
+        45.0,  # attention: minutes of strain before focus starts to wear off
+        3.0,   # recovery: minutes of strain each minute of break pays back
+        0.05,  # reset_rate: chance of abandoning any work interval, however fresh
+        0.2,   # pause_rate: chance of pausing a work interval once
+        3.0,   # pause_minutes: mean length of a pause
+        0.1,   # skip_break_rate: chance of skipping a 5-minute break (more for longer ones)
+        2.0,   # late_minutes: mean time back late from a break without a warning
+    ),
+)
+
+# A pause between intervals this long (seconds) ends a working day
+DAY_GAP = 4 * 3600
+
+# Columns of a result row after the policy fields
+RESULTS = ("focus_minutes", "sessions", "breaks_taken", "resets")
+
+
+class Simulation:
+    """One policy played out day after day by one simulated user"""
+
+    def __init__(self, policy, behaviour=Behaviour(), seed=0):
+        self.settings = Settings(**policy)
+        self.behaviour = behaviour
+        self.rng = random.Random(seed)
+        self.clock = ManualClock()
+        self.session = PomodoroSession(self.settings, clock=self.clock, wall_clock=self.clock,
+                                       listener=self.on_session_event)
+        self.session.set_redraw("none")  # only the warning and the end of each interval
+        self.days = 0
+        self.focus = 0.0  # seconds of work in completed intervals
+        self.sessions = 0
+        self.breaks_due = 0
+        self.breaks_taken = 0
+        self.resets = 0
+        self.strain = 0.0  # minutes
+        self.day_over = False  # the end of the day is cutting an interval short
+
+    def on_session_event(self, session, event, data):
+        if data is None:
+            return
+        minutes = data.actual / 60
+        if data.mode == "work":
+            self.strain += minutes
+            if event == "complete":
+                self.focus += data.actual
+                self.sessions += 1
+            elif event == "reset" and not self.day_over:
+                self.resets += 1
+        else:
+            self.rest(data.actual)
+            if event == "complete":
+                self.breaks_due += 1
+                self.breaks_taken += 1
+
+    def run_until(self, until):
+        """Let the running interval go on until it ends (True) or the clock reaches until"""
+        session, clock = self.session, self.clock
+        while True:
+            wakeup = session.next_wakeup()
+            if wakeup is None:
+                return True
+            if wakeup > until:
+                clock.now = until
+                return False
+            clock.now = wakeup
+            session.tick()
+
+    def rest(self, seconds):
+        self.strain = max(0.0, self.strain - seconds / 60 * self.behaviour.recovery)
+
+    def reset_chance(self, work_minutes):
+        """Chance of abandoning the next work interval, growing with strain past the attention span"""
+        behaviour = self.behaviour
+        overrun = max(0.0, self.strain + work_minutes - behaviour.attention)
+        return min(0.95, behaviour.reset_rate + 1 - math.exp(-overrun / behaviour.attention))
+
+    def skip_chance(self, break_minutes):
+        return min(0.95, self.behaviour.skip_break_rate * max(1.0, break_minutes / 5) ** 0.5)
+
+    def run_day(self):
+        behaviour, rng, clock, session = self.behaviour, self.rng, self.clock, self.session
+        day_end = clock.now + behaviour.day_hours * 3600
+        # Every day starts fresh with a work interval
+        session.current_mode = "work"
+        session.completed_cycles = 0
+        session.warning_shown = False
+        session.time_left = session.seconds_for("work")
+        self.strain = 0.0
+        late = 0.0
+
+        while True:
+            idle = rng.expovariate(1 / (behaviour.start_delay * 60)) + late
+            clock.advance(idle)
+            self.rest(idle)
+            late = 0.0
+            if clock.now >= day_end:
+                break
+            mode = session.current_mode
+            minutes = session.seconds_for(mode) / 60
+            if mode != "work" and rng.random() < self.skip_chance(minutes):
+                self.breaks_due += 1
+                session.skip()
+                continue
+
+            session.start()
+            if mode == "work":
+                if rng.random() < self.reset_chance(minutes):
+                    gave_up = clock.now + rng.uniform(0, minutes * 60)
+                    if gave_up < day_end:
+                        self.run_until(gave_up)
+                        session.reset()
+                        continue
+                if rng.random() < behaviour.pause_rate:
+                    paused = clock.now + rng.uniform(0, minutes * 60)
+                    if not self.run_until(min(paused, day_end)) and clock.now < day_end:
+                        session.pause()
+                        pause = rng.expovariate(1 / (behaviour.pause_minutes * 60))
+                        clock.advance(pause)
+                        self.rest(pause)
+                        session.start()
+            else:
+                # A warning before the break ends brings the user back sooner
+                late = rng.expovariate(1 / (behaviour.late_minutes * 60)) / (1 + self.settings.warning_time)
+
+            if not self.run_until(day_end):
+                self.day_over = True  # mid-interval; not the user giving up
+                session.reset()
+                self.day_over = False
+                break
+        # Overnight
+        clock.now = day_end + 16 * 3600
+        self.days += 1
+
+    def run(self, days):
+        for _ in range(days):
+            self.run_day()
+        return self.result()
+
+    def result(self):
+        """(focus minutes a day, completed sessions a day, share of breaks taken, resets a day)"""
+        days = self.days or 1
+        return (
+            self.focus / 60 / days,
+            self.sessions / days,
+            self.breaks_taken / self.breaks_due if self.breaks_due else 1.0,
+            self.resets / days,
+        )
+
+
+def simulate(policy, behaviour=Behaviour(), days=365, seed=0):
+    """Result row (policy values + RESULTS) of one policy"""
+    result = Simulation(policy, behaviour, seed).run(days)
+    return tuple(policy[name] for name in PROFILE_FIELDS) + result
+
+
+def _simulate_job(job):
+    return simulate(*job)
+
+
+def grid(**choices):
+    """Every combination of the given values per setting, as policies
+
+    Settings not given keep their defaults.
+    """
+    base = dict(BUILTIN_PROFILES["default"])
+    names = list(choices)
+    for values in itertools.product(*(choices[name] for name in names)):
+        yield dict(base, **dict(zip(names, values)))
+
+
+def sweep(policies, behaviour=Behaviour(), days=365, seed=0, processes=None):
+    """Result rows of every policy, simulated in parallel (processes=1 runs them here)
+
+    Every policy is played by the same random user (same seed), so the
+    rows differ only by policy.
+    """
+    jobs = [(dict(policy), behaviour, days, seed) for policy in policies]
+    if processes == 1 or len(jobs) < 2:
+        return [_simulate_job(job) for job in jobs]
+    workers = processes or os.cpu_count() or 1
+    with multiprocessing.Pool(workers) as pool:
+        return pool.map(_simulate_job, jobs, chunksize=max(1, len(jobs) // (4 * workers)))
+
+
+def behaviour_from_history(records, **overrides):
+    """Behaviour with the rates found in recorded IntervalRecords
+
+    Takes how often work is abandoned and breaks skipped, how often and
+    how long work is paused (wall time beyond the time counted), the usual
+    wait between intervals and the length of a working day (a run of
+    intervals without a DAY_GAP between them). A break skipped before it
+    started leaves no record, so it shows as completed work followed by
+    more work. The attention model can't be read off history and keeps its
+    defaults (or overrides).
+    """
+    ordered = sorted(records, key=lambda record: record.started_at)
+    work = resets = breaks_due = breaks_skipped = timed = paused = gaps = 0
+    pause_time = gap_time = 0.0
+    day_lengths = []
+    day_start = None
+    for index, record in enumerate(ordered):
+        if day_start is None:
+            day_start = record.started_at
+        following = ordered[index + 1] if index + 1 < len(ordered) else None
+        gap = following.started_at - record.ended_at if following is not None else DAY_GAP
+        same_day = gap < DAY_GAP
+
+        if record.mode == "work" and (record.outcome != "reset" or same_day):  # not one that just ends the day
+            work += 1
+            resets += record.outcome == "reset"
+        if record.mode == "work" and record.outcome == "completed":
+            timed += 1
+            extra = (record.ended_at - record.started_at) - record.actual
+            if extra > 5:
+                paused += 1
+                pause_time += extra
+            if same_day:
+                breaks_due += 1
+                breaks_skipped += following.mode == "work" or following.outcome == "skipped"
+        if same_day:
+            gaps += 1
+            gap_time += max(0.0, gap)
+        else:
+            day_lengths.append(record.ended_at - day_start)
+            day_start = None
+
+    values = {}
+    if work:
+        values["reset_rate"] = resets / work
+    if breaks_due:
+        values["skip_break_rate"] = breaks_skipped / breaks_due
+    if timed:
+        values["pause_rate"] = paused / timed
+    if paused:
+        values["pause_minutes"] = pause_time / paused / 60
+    if gaps:
+        values["start_delay"] = max(gap_time / gaps / 60, 0.01)
+    if day_lengths:
+        values["day_hours"] = max(sum(day_lengths) / len(day_lengths) / 3600, 0.5)
+    values.update(overrides)
+    return Behaviour(**values)
+
+
+def format_table(rows):
+    """Rows as a text table, most focus time first"""
+    header = ("work", "short", "long", "cycles", "warn", "focus min/day", "sessions/day", "breaks taken", "resets/day")
+    lines = ["  ".join(f"{title:>{max(len(title), 5)}}" for title in header)]
+    for row in sorted(rows, key=lambda row: -row[len(PROFILE_FIELDS)]):
+        settings, (focus, sessions, taken, resets) = row[:len(PROFILE_FIELDS)], row[len(PROFILE_FIELDS):]
+        cells = [f"{value:>{max(len(title), 5)}}" for value, title in zip(settings, header)]
+        cells += [f"{focus:>13.1f}", f"{sessions:>12.2f}", f"{taken:>12.0%}", f"{resets:>10.2f}"]
+        lines.append("  ".join(cells))
+    return "\n".join(lines)
+
+
+def _numbers(text):
+    try:
+        return [int(value) for value in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated whole numbers, got {text!r}") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare timer settings on simulated days")
+    for option, name in (("--work", "work_time"), ("--short", "short_break"), ("--long", "long_break"),
+                         ("--cycles", "cycles_before_long_break"), ("--warning", "warning_time")):
+        parser.add_argument(option, dest=name, type=_numbers, metavar="N[,N...]", help=f"values of {name} to try")
+    parser.add_argument("--profiles", action="store_true", help="also try the built-in profiles")
+    parser.add_argument("--days", type=int, default=365, help="days per policy (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--history", help="history database to take the user's behaviour from")
+    args = parser.parse_args(argv)
+
+    choices = {name: getattr(args, name) for name in PROFILE_FIELDS if getattr(args, name)}
+    try:
+        policies = list(grid(**choices))
+        if args.profiles:
+            policies += [dict(profile) for profile in BUILTIN_PROFILES.values() if profile not in policies]
+        for policy in policies:
+            Settings(**policy)  # report bad values before starting any work
+    except ValueError as e:
+        parser.error(str(e))
+
+    behaviour = Behaviour()
+    if args.history:
+        from pomodoro.history import HistoryStore
+        store = HistoryStore(args.history)
+        try:
+            behaviour = behaviour_from_history(store.records())
+        finally:
+            store.close()
+        print("Behaviour from history: " + ", ".join(f"{name}={value:.3g}" for name, value in behaviour._asdict().items()))
+
+    rows = sweep(policies, behaviour, args.days, args.seed, args.processes)
+    print(format_table(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Conflict-free merging of session counts and history between devices.
+
+Several devices (say a desktop and a laptop syncing one home directory)
+share a directory, and each one only ever writes its own two files there:
+
+* <device>.log - append-only JSON lines, one per finished interval
+* <device>.json - the device's state (rewritten atomically by a
+  write-behind thread): its view of the completed-sessions counter and
+  how far it has read every other device's log
+
+The counter keeps, per device, the count of sessions added there and a
+floor: the most of that device's sessions any "reset the counter" has
+seen. The value is the sum of each device's sessions above its floor. A
+device only adds to its own count, and a reset raises floors to the
+counts it has seen; merging takes the larger of each entry, so concurrent
+updates on different devices never overwrite each other, concurrent
+resets never take the value below zero, and merging in any order, any
+number of times, gives the same value.
+
+merge() reads only what is new: each other device's log from the byte
+offset reached last time (up to its last complete line) and its small
+state file, without holding the lock the device's other calls take. The
+intervals it returns are the deltas to add to the local history.
+"""
+import json
+import os
+import re
+import threading
+
+from pomodoro.persistence import SettingsStore
+
+
+def device_name():
+    """This device's name: $POMODORO_DEVICE, or the host name"""
+    name = os.environ.get("POMODORO_DEVICE")
+    if not name:
+        import socket  # only needed here; keeps app start-up lean
+        name = socket.gethostname() or "device"
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name)
+
+
+class PNCounter:
+    """Counter that merges without conflicts (per-device added counts and reset floors)"""
+
+    __slots__ = ("added", "floor")
+
+    def __init__(self, added=None, floor=None):
+        self.added = dict(added or {})
+        self.floor = dict(floor or {})  # device -> its added count at the latest reset seen
+
+    @property
+    def value(self):
+        floor = self.floor
+        return sum(count - floor.get(device, 0) for device, count in self.added.items())
+
+    def increment(self, device, amount=1):
+        self.added[device] = self.added.get(device, 0) + amount
+
+    def reset(self):
+        """Bring the value to zero (as far as this device knows)
+
+        Sessions other devices counted that haven't been merged in yet
+        still count once they are.
+        """
+        floor = self.floor
+        for other, count in self.added.items():
+            if count > floor.get(other, 0):
+                floor[other] = count
+
+    def merge(self, other):
+        """Take the larger of each entry; returns True if anything changed"""
+        changed = False
+        for mine, theirs in ((self.added, other.added), (self.floor, other.floor)):
+            for device, count in theirs.items():
+                if count > mine.get(device, 0):
+                    mine[device] = count
+                    changed = True
+        return changed
+
+    def to_json(self):
+        return {"added": dict(self.added), "floor": dict(self.floor)}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data.get("added"), data.get("floor"))
+
+
+class _LineCursor:
+    """The complete lines of data as text; offset ends the last one read past
+
+    A line counts as read past once the next one is asked for, i.e. once
+    whoever reads them has taken it in without an error.
+    """
+
+    def __init__(self, data, offset):
+        self.lines = data.split(b"\n")[:-1]
+        self.offset = offset
+
+    def __iter__(self):
+        for line in self.lines:
+            yield line.decode()
+            self.offset += len(line) + 1
+
+
+class DeviceSync:
+    """This device's side of the shared directory"""
+
+    def __init__(self, directory, device=None):
+        self.directory = directory
+        self.device = device or device_name()
+        self.log_path = os.path.join(directory, self.device + ".log")
+        self.state_path = os.path.join(directory, self.device + ".json")
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.counter = PNCounter()
+        self.offsets = {}  # other device -> bytes of its log already merged
+        # Counting a session shouldn't wait for an fsync; the state is
+        # written behind, and other devices only read it on their next merge
+        self._store = SettingsStore(self.state_path, delay=0.1, name="device state")
+
+    def _load(self):
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+            self.counter = PNCounter.from_json(state["counter"])
+            self.offsets = dict(state["offsets"])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            # Our own entries come back from the other devices' copies on merge
+            print(f"Error reading device state, starting over: {e}")
+        self._loaded = True
+
+    def _save(self):
+        self._store.save({
+            "device": self.device,
+            "counter": self.counter.to_json(),
+            "offsets": dict(self.offsets),
+        })
+
+    def flush(self):
+        """Block until this device's state is durably on disk"""
+        self._store.flush()
+
+    def close(self):
+        """Write out pending state and stop the writer thread"""
+        self._store.close()
+
+    def _other_devices(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted({
+            name.rsplit(".", 1)[0] for name in names
+            if name.endswith((".json", ".log")) and not name.startswith(".")
+        } - {self.device})
+
+    # Session counter
+
+    @property
+    def sessions(self):
+        with self._lock:
+            self._load()
+            return self.counter.value
+
+    def count_session(self):
+        """Add one completed work session on this device"""
+        with self._lock:
+            self._load()
+            self.counter.increment(self.device)
+            self._save()
+
+    def reset_sessions(self):
+        with self._lock:
+            self._load()
+            self.counter.reset()
+            self._save()
+
+    def adopt_count(self, count):
+        """Start the counter from a count kept before devices were merged
+
+        Only the first device to upgrade takes it over; the others would
+        count the same sessions again.
+        """
+        with self._lock:
+            self._load()
+            if count and not self.counter.added and not self._other_devices():
+                self.counter.increment(self.device, count)
+                self._save()
+
+    # History
+
+    def record(self, record):
+        """Append a finished IntervalRecord to this device's log"""
+        line = json.dumps(record._asdict(), separators=(",", ":")) + "\n"
+        with self._lock:
+            self._load()
+            with open(self.log_path, "a") as f:
+                f.write(line)
+
+    def merge(self):
+        """Fold in the other devices' counters; return their new IntervalRecords
+
+        The other devices' files are read and parsed without holding the
+        lock, so counting and recording on this device never wait for a
+        big log; only folding in the result does. One merge at a time.
+        """
+        from pomodoro.history_io import read_jsonl
+        with self._lock:
+            self._load()
+            offsets = dict(self.offsets)
+        counters = []
+        reached = {}  # device -> offset its log has been merged up to
+        records = []
+        for device in self._other_devices():
+            base = os.path.join(self.directory, device)
+            try:
+                with open(base + ".json", "r") as f:
+                    counters.append(PNCounter.from_json(json.load(f)["counter"]))
+            except (OSError, ValueError, KeyError):
+                pass  # not written yet, or caught mid-sync; next merge picks it up
+
+            offset = offsets.get(device, 0)
+            try:
+                with open(base + ".log", "rb") as f:
+                    if os.fstat(f.fileno()).st_size < offset:
+                        offset = 0  # log was replaced; re-read it (imports skip duplicates)
+                    f.seek(offset)
+                    data = f.read()
+            except OSError:
+                continue
+            # A line still being written waits; so does everything from an
+            # unreadable line on (it may be caught mid-sync), so nothing is skipped
+            merged = _LineCursor(data, offset)
+            try:
+                records.extend(read_jsonl(merged))
+            except ValueError as e:
+                print(f"Stopping at unreadable history from {device} (byte {merged.offset}): {e}")
+            reached[device] = merged.offset
+
+        with self._lock:
+            changed = False
+            for counter in counters:
+                changed |= self.counter.merge(counter)
+            for device, offset in reached.items():
+                if self.offsets.get(device, 0) != offset:
+                    self.offsets[device] = offset
+                    changed = True
+            if changed:
+                self._save()
+        return records
@@ -0,0 +1,158 @@
+"""Task names for tagging work intervals, with instant autocomplete.
+
+TaskIndex holds every task name used so far and answers "which tasks
+start with what has been typed", ranked by frecency: each use adds a
+weight that halves every HALF_LIFE, so tasks used often stay near the top
+and a task used just now comes up even if it is new.
+
+A use at time t weighs 2 ** ((t - reference) / half_life) for a fixed
+reference time. Decaying every score by the same factor as time passes
+doesn't change their order, so scores are never re-decayed and only ever
+grow.
+
+The index is a burst trie over case-folded names. Names start out in an
+unsorted bucket; a bucket holding more than BURST names is split into a
+node per next character. Every split node keeps the LIMIT best names below
+it, and since scores only grow, a new use can only move its own name up
+those lists, which is a walk down one path. A keystroke is a walk along
+the typed prefix and, past the split nodes, a scan of one small bucket,
+however many names there are.
+"""
+import heapq
+import time
+
+HALF_LIFE = 14 * 86400  # seconds until a use counts half as much
+LIMIT = 8  # suggestions per prefix
+BURST = 64  # names a bucket holds before it is split
+
+
+def _key(name):
+    """Names are matched without regard to case or surrounding spaces"""
+    return name.strip().casefold()
+
+
+class _Node:
+    __slots__ = ("children", "keys", "top")
+
+    def __init__(self):
+        self.children = None  # next character -> _Node once split, None while a bucket
+        self.keys = []  # bucket: every key below; split: keys ending right here
+        self.top = None  # split: the best LIMIT keys below, best first
+
+
+class TaskIndex:
+    """Prefix index of task names ranked by frecency"""
+
+    def __init__(self, half_life=HALF_LIFE, limit=LIMIT, reference=None):
+        self.half_life = half_life
+        self.limit = limit
+        self.reference = time.time() if reference is None else reference
+        self.names = {}  # case-folded key -> the name as last written
+        self.scores = {}  # key -> sum of its use weights
+        self._root = _Node()
+
+    @classmethod
+    def from_uses(cls, uses, **options):
+        """Build from (task, used_at) pairs, e.g. HistoryStore.task_uses()"""
+        index = cls(**options)
+        names, scores = index.names, index.scores
+        for name, used_at in uses:
+            key = _key(name)
+            if key:
+                names[key] = name.strip()
+                scores[key] = scores.get(key, 0.0) + index._weight(used_at)
+        index._root.keys = list(scores)
+        if len(scores) > BURST:
+            index._split(index._root, 0)
+        return index
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return _key(name) in self.names
+
+    def _weight(self, used_at):
+        # Capped so a clock far in the future can't overflow the float
+        return 2.0 ** min((used_at - self.reference) / self.half_life, 1000.0)
+
+    def _rank(self, key):
+        return self.scores[key], key  # ties broken the same way every time
+
+    def _split(self, node, depth):
+        """Turn a bucket into a node per next character"""
+        keys = node.keys
+        node.children = {}
+        node.keys = []
+        for key in keys:
+            if len(key) == depth:
+                node.keys.append(key)
+            else:
+                child = node.children.get(key[depth])
+                if child is None:
+                    child = node.children[key[depth]] = _Node()
+                child.keys.append(key)
+        candidates = list(node.keys)
+        for child in node.children.values():
+            if len(child.keys) > BURST:
+                self._split(child, depth + 1)
+                candidates.extend(child.top)
+            else:
+                candidates.extend(child.keys)
+        node.top = heapq.nlargest(self.limit, candidates, key=self._rank)
+
+    def _promote(self, top, key):
+        """Move key to its place in a best-first top list after its score grew"""
+        if key in top:
+            top.remove(key)
+        elif len(top) >= self.limit and self._rank(key) <= self._rank(top[-1]):
+            return
+        rank = self._rank(key)
+        position = 0
+        while position < len(top) and self._rank(top[position]) > rank:
+            position += 1
+        top.insert(position, key)
+        del top[self.limit:]
+
+    def add(self, name, used_at=None):
+        """Record a use of a task (now, or at used_at)"""
+        key = _key(name)
+        if not key:
+            return
+        if used_at is None:
+            used_at = time.time()
+        new = key not in self.scores
+        self.names[key] = name.strip()
+        self.scores[key] = self.scores.get(key, 0.0) + self._weight(used_at)
+
+        node, depth = self._root, 0
+        while node.children is not None:
+            self._promote(node.top, key)
+            if depth == len(key):
+                if new:
+                    node.keys.append(key)
+                return
+            child = node.children.get(key[depth])
+            if child is None:
+                child = node.children[key[depth]] = _Node()
+            node, depth = child, depth + 1
+        if new:
+            node.keys.append(key)
+            if len(node.keys) > BURST:
+                self._split(node, depth)
+
+    def suggest(self, prefix):
+        """Up to limit task names starting with prefix (any case), best first"""
+        key = prefix.lstrip().casefold()
+        node, depth = self._root, 0
+        while node.children is not None and depth < len(key):
+            node = node.children.get(key[depth])
+            if node is None:
+                return []
+            depth += 1
+        if node.children is not None:
+            keys = node.top
+        else:
+            keys = heapq.nlargest(self.limit, (k for k in node.keys if k.startswith(key)), key=self._rank)
+        return [self.names[k] for k in keys]
+
@@ -0,0 +1,93 @@
+"""Deadline-based countdown used by the timer engine.
+
+Instead of sleeping a second and decrementing a counter (which drifts by
+however long the rest of the loop takes), the countdown stores an absolute
+deadline on a monotonic clock and derives the time left from it.
+"""
+import math
+import time
+
+
+class ManualClock:
+    """A clock that only moves when told to, for tests and simulations"""
+
+    def __init__(self, start=0.0):
+        self.now = float(start)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        """Move the clock forward by the given number of seconds"""
+        self.now += seconds
+        return self.now
+
+
+class TimerCore:
+    """Countdown driven by an absolute deadline on an injectable clock"""
+
+    __slots__ = ("clock", "duration", "_deadline", "_remaining")
+
+    def __init__(self, duration, clock=time.monotonic):
+        self.clock = clock
+        self.duration = duration
+        self._deadline = None  # set only while running
+        self._remaining = float(duration)  # valid only while stopped
+
+    @property
+    def running(self):
+        return self._deadline is not None
+
+    def start(self):
+        """Start or resume the countdown from the time left"""
+        if self._deadline is None:
+            self._deadline = self.clock() + self._remaining
+
+    def pause(self):
+        """Freeze the countdown, keeping the time left"""
+        if self._deadline is not None:
+            self._remaining = max(0.0, self._deadline - self.clock())
+            self._deadline = None
+
+    def reset(self, duration=None):
+        """Stop and rewind the countdown to a full interval"""
+        if duration is not None:
+            self.duration = duration
+        self._deadline = None
+        self._remaining = float(self.duration)
+
+    def restore(self, duration, remaining):
+        """Stop the countdown at an arbitrary point of an interval"""
+        self.duration = duration
+        self._deadline = None
+        self._remaining = max(0.0, float(remaining))
+
+    @property
+    def deadline(self):
+        """Absolute clock time the countdown ends at, or None when stopped"""
+        return self._deadline
+
+    def remaining_exact(self):
+        """Seconds left as a float"""
+        if self._deadline is None:
+            return self._remaining
+        return max(0.0, self._deadline - self.clock())
+
+    def remaining(self):
+        """Whole seconds left, rounded up so a fresh 25:00 shows as 25:00"""
+        return int(math.ceil(self.remaining_exact() - 1e-9))
+
+    def expired(self):
+        return self.remaining_exact() <= 0
+
+    def time_to_next_second(self):
+        """Seconds until the displayed whole-second value changes"""
+        return self.time_to_next(1.0)
+
+    def time_to_next(self, step):
+        """Seconds until the time left next reaches a whole multiple of step"""
+        exact = self.remaining_exact()
+        if exact <= 0:
+            return 0.0
+        fraction = exact % step
+        return fraction if fraction > 1e-9 else step
@@ -0,0 +1,80 @@
+"""Dirty-tracking view model for the timer window.
+
+Keeps the last values pushed to each widget and only issues a Tk call when
+a value actually changes. On a normal tick that is just the time label;
+the mode label changes once per interval and the progress bar (or ring)
+only when it moves by a whole pixel.
+"""
+
+# Text and colour of the mode label for each mode
+MODE_LABELS = {
+    "work": ("WORK TIME", "#FF6B6B"),
+    "short_break": ("SHORT BREAK", "#4CAF50"),
+    "long_break": ("LONG BREAK", "#2196F3"),
+}
+
+
+def format_time(seconds):
+    """Seconds as MM:SS"""
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class TimerViewModel:
+    """Push timer state to the widgets, skipping values that didn't change"""
+
+    def __init__(self, timer_display, mode_label, progress_var, progress_steps=400, ring=None):
+        self.timer_display = timer_display
+        self.mode_label = mode_label
+        self.progress_var = progress_var
+        # A RingCanvas shows progress instead of progress_var when given
+        self.ring = ring
+        # Progress is rounded to this many steps (the bar's width in pixels)
+        self.progress_steps = ring.steps if ring is not None else progress_steps
+
+        # Last rendered values; None forces the first render
+        self._time_text = None
+        self._mode = None
+        self._progress = None
+
+        # Tk calls issued, in total and by the most recent render()
+        self.tk_calls = 0
+        self.last_render_calls = 0
+
+    def invalidate(self):
+        """Forget the cached values so the next render redraws everything"""
+        self._time_text = self._mode = self._progress = None
+
+    def render(self, time_left, mode, total_time):
+        """Update whichever widgets show a different value; returns Tk calls made"""
+        calls = 0
+
+        time_text = format_time(time_left)
+        if time_text != self._time_text:
+            self._time_text = time_text
+            self.timer_display.config(text=time_text)
+            calls += 1
+
+        new_mode = mode != self._mode
+        if new_mode:
+            self._mode = mode
+            text, colour = MODE_LABELS[mode]
+            self.mode_label.config(text=text, fg=colour)
+            calls += 1
+
+        steps = self.progress_steps
+        step = steps - round(time_left * steps / total_time) if total_time else steps
+        if step != self._progress or (new_mode and self.ring is not None):
+            self._progress = step
+            if self.ring is not None:
+                # The ring is drawn in the mode's colour. The step the next change
+                # will show (a second from now, or the next one) is drawn ahead
+                upcoming = steps - round(max(0, time_left - 1) * steps / total_time) if total_time else steps
+                self.ring.show(mode, step, min(steps, max(step + 1, upcoming)))
+            else:
+                self.progress_var.set(step * 100 / steps)
+            calls += 1
+
+        self.tk_calls += calls
+        self.last_render_calls = calls
+        return calls